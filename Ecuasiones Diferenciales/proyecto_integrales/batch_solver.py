@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Resolución por lotes sin interfaz gráfica (sin Tk ni matplotlib)
+
+Lee integrandos de un archivo .txt (uno por línea), .csv (columna `funcion`,
+opcionales `variable` e `id`), .jsonl (objetos con esas mismas claves) o de la
+entrada estándar, los resuelve en un pool de procesos y escribe un registro
+JSON por línea en orden de finalización.
+
+    python batch_solver.py entregas.csv -o resultados.jsonl --timeout 20
+    cat integrales.txt | python batch_solver.py -
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import slow_log
+from metrics import REGISTRO
+from solver_pool import SolverPool
+from stage_timer import StageTimer
+
+
+def _entrada_de_texto(lineas, variable):
+    """Un integrando por línea; se ignoran líneas vacías y comentarios (#)"""
+    for numero, linea in enumerate(lineas, 1):
+        linea = linea.strip()
+        if linea and not linea.startswith('#'):
+            yield str(numero), linea, variable
+
+
+def _entrada_de_csv(lineas, variable):
+    """Filas con columna `funcion` (o la primera columna si no hay cabecera conocida)"""
+    lector = csv.reader(lineas)
+    cabecera = next(lector, None)
+    if cabecera is None:
+        return
+    columnas = [c.strip().lower() for c in cabecera]
+    if 'funcion' not in columnas:
+        # Sin cabecera: la primera fila ya es un dato
+        if cabecera and cabecera[0].strip():
+            yield '1', cabecera[0].strip(), variable
+        for numero, fila in enumerate(lector, 2):
+            if fila and fila[0].strip():
+                yield str(numero), fila[0].strip(), variable
+        return
+    i_funcion = columnas.index('funcion')
+    i_variable = columnas.index('variable') if 'variable' in columnas else None
+    i_id = columnas.index('id') if 'id' in columnas else None
+    for numero, fila in enumerate(lector, 2):
+        if len(fila) <= i_funcion or not fila[i_funcion].strip():
+            continue
+        var = fila[i_variable].strip() if i_variable is not None and len(fila) > i_variable else ''
+        ident = fila[i_id].strip() if i_id is not None and len(fila) > i_id else str(numero)
+        yield ident, fila[i_funcion].strip(), var or variable
+
+
+def _entrada_de_jsonl(lineas, variable):
+    """Objetos {"funcion": ..., "variable": ..., "id": ...}; una cadena también vale"""
+    for numero, linea in enumerate(lineas, 1):
+        if not linea.strip():
+            continue
+        dato = json.loads(linea)
+        if isinstance(dato, str):
+            yield str(numero), dato, variable
+        else:
+            yield (str(dato.get('id', numero)), dato['funcion'],
+                   dato.get('variable') or variable)
+
+
+LECTORES = {'txt': _entrada_de_texto, 'csv': _entrada_de_csv, 'jsonl': _entrada_de_jsonl}
+
+
+def leer_entradas(ruta, formato=None, variable='x'):
+    """Generador de (id, funcion, variable) desde un archivo o '-' (stdin)"""
+    if formato is None:
+        extension = os.path.splitext(ruta)[1].lower().lstrip('.') if ruta != '-' else ''
+        formato = {'json': 'jsonl', 'ndjson': 'jsonl'}.get(extension, extension)
+        if formato not in LECTORES:
+            formato = 'txt'
+    if ruta == '-':
+        yield from LECTORES[formato](sys.stdin, variable)
+        return
+    with open(ruta, encoding='utf-8', newline='') as f:
+        yield from LECTORES[formato](f, variable)
+
+
+def resolver_lote(entradas, pool, en_vuelo=None):
+    """Generador de registros en orden de finalización.
+    Se mantienen como mucho `en_vuelo` trabajos enviados, así la entrada se
+    lee en streaming aunque tenga miles de líneas."""
+    en_vuelo = en_vuelo or pool.procesos * 4
+    futuros = {}
+    entradas = iter(entradas)
+    agotadas = False
+    while futuros or not agotadas:
+        while not agotadas and len(futuros) < en_vuelo:
+            try:
+                ident, funcion_str, variable_str = next(entradas)
+            except StopIteration:
+                agotadas = True
+                break
+            futuros[pool.enviar(funcion_str, variable_str)] = ident
+        if not futuros:
+            break
+        hechos, _ = wait(futuros, return_when=FIRST_COMPLETED)
+        for futuro in hechos:
+            registro = {'id': futuros.pop(futuro)}
+            registro.update(futuro.result())
+            yield registro
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(
+        description="Resolver integrales por lotes y escribir los resultados en JSONL")
+    parser.add_argument('entrada', nargs='?', default='-',
+                        help="archivo .txt/.csv/.jsonl, o '-' para la entrada estándar")
+    parser.add_argument('-o', '--salida', default='-',
+                        help="archivo JSONL de salida ('-' = salida estándar)")
+    parser.add_argument('-f', '--formato', choices=sorted(LECTORES),
+                        help="formato de la entrada (por defecto, según la extensión)")
+    parser.add_argument('-p', '--procesos', type=int, default=None,
+                        help="número de procesos (por defecto, núcleos - 1)")
+    parser.add_argument('-t', '--timeout', type=float, default=30.0,
+                        help="segundos máximos por integral (por defecto 30)")
+    parser.add_argument('-v', '--variable', default='x',
+                        help="variable de integración si la entrada no la indica")
+    parser.add_argument('--metricas', metavar='ARCHIVO',
+                        help="al terminar, guardar las métricas en formato de texto de Prometheus")
+    parser.add_argument('--log-lentas', metavar='DIRECTORIO',
+                        help="guardar entrada, tiempos y perfil de cProfile de las integrales lentas")
+    parser.add_argument('--umbral-lento', type=float, default=2.0,
+                        help="segundos a partir de los cuales una integral cuenta como lenta")
+    parser.add_argument('--etapas', action='store_true',
+                        help="al final, mostrar el tiempo total por etapa (parsear, factor, integrate...)")
+    args = parser.parse_args(argv)
+    if args.log_lentas:
+        slow_log.configurar(args.log_lentas, args.umbral_lento)  # lo heredan los procesos del pool
+
+    salida = sys.stdout if args.salida == '-' else open(args.salida, 'w', encoding='utf-8')
+    conteo = {}
+    etapas = StageTimer()
+    inicio = time.perf_counter()
+    try:
+        with SolverPool(args.procesos, args.timeout) as pool:
+            entradas = leer_entradas(args.entrada, args.formato, args.variable)
+            for registro in resolver_lote(entradas, pool):
+                salida.write(json.dumps(registro, ensure_ascii=False))
+                salida.write('\n')
+                salida.flush()
+                conteo[registro['estado']] = conteo.get(registro['estado'], 0) + 1
+                if not registro.get('agrupada'):
+                    etapas.acumular(registro.get('tiempos') or {}, registro.get('llamadas'))
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error leyendo la entrada: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if salida is not sys.stdout:
+            salida.close()
+
+    total = sum(conteo.values())
+    resumen = ', '.join(f"{estado}: {n}" for estado, n in sorted(conteo.items()))
+    print(f"{total} integrales en {time.perf_counter() - inicio:.1f} s ({resumen})",
+          file=sys.stderr)
+    if args.etapas:
+        for fila in etapas.registros():
+            print(f"{fila['etapa']:>12}: {fila['segundos']:8.2f} s  ({fila['llamadas']} llamadas)",
+                  file=sys.stderr)
+    if args.metricas:
+        REGISTRO.escribir(args.metricas)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
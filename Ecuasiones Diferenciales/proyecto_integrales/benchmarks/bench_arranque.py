@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark de arranque: importación, ventana, primera resolución y primer rasterizado
+
+Cada repetición es un intérprete nuevo, como al abrir la aplicación. Mide:
+    importar/<módulo>     importar el módulo solo (como bench_importacion.py)
+    importar_main_app     importar main_app en el arranque real (con SymPy)
+    construir_main_app    crear Tk y MainApp hasta la primera ventana dibujada
+    primera_resolucion    primer resolver_integral_general (x*exp(x), en frío)
+    primer_rasterizado    primera fórmula LaTeX, incluida la carga de matplotlib
+
+MainApp necesita una pantalla: se usa $DISPLAY si existe o un Xvfb temporal si
+está instalado; si no hay ninguno, el modo es "nucleo" y construir_main_app
+no se mide. Si la línea base es de otro modo se avisa.
+
+Uso:
+    python benchmarks/bench_arranque.py [--repeticiones N] [--salida actual.json]
+                                        [--base base.json] [--umbral-tiempo 0.25]
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Agregar el directorio del proyecto al path
+sys.path.append(DIRECTORIO)
+
+import linea_base
+from bench_importacion import PRESUPUESTOS, medir_modulo
+
+FUNCION = 'x*exp(x)'
+FORMULA = r'\int x e^{x} \, dx = \left(x - 1\right) e^{x} + C'
+
+
+def arrancar(con_ventana):
+    """Arranque medido dentro del proceso hijo; devuelve ms por etapa"""
+    ms = {}
+    inicio = time.perf_counter()
+    import main_app
+    ms['importar_main_app'] = (time.perf_counter() - inicio) * 1000
+
+    if con_ventana:
+        import tkinter as tk
+        inicio = time.perf_counter()
+        try:
+            root = tk.Tk()
+        except tk.TclError:
+            con_ventana = False  # la pantalla no acepta conexiones: solo el núcleo
+    if con_ventana:
+        app = main_app.MainApp(root)
+        root.update()
+        ms['construir_main_app'] = (time.perf_counter() - inicio) * 1000
+        math_solver = app.math_solver
+    else:
+        math_solver = main_app.MathSolver()
+
+    from solution_store import SolutionArtifact
+    artefacto = SolutionArtifact(FUNCION, 'x')
+    inicio = time.perf_counter()
+    math_solver.resolver_integral_general(artefacto.funcion, artefacto.variable)
+    ms['primera_resolucion'] = (time.perf_counter() - inicio) * 1000
+
+    inicio = time.perf_counter()
+    from mathtext_raster import rasterizar_rgba
+    rasterizar_rgba(FORMULA, 150, 14)
+    ms['primer_rasterizado'] = (time.perf_counter() - inicio) * 1000
+
+    if con_ventana:
+        app.cerrar()
+        root.destroy()
+    return ms
+
+
+def iniciar_xvfb():
+    """(proceso, display) de un Xvfb temporal, o (None, None) si no está instalado"""
+    ejecutable = shutil.which('Xvfb')
+    if ejecutable is None:
+        return None, None
+    for numero in range(99, 120):
+        if os.path.exists(f'/tmp/.X11-unix/X{numero}'):
+            continue
+        proceso = subprocess.Popen([ejecutable, f':{numero}', '-screen', '0', '1400x900x24', '-nolisten', 'tcp'],
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(50):  # hasta 5 s para que acepte conexiones
+            if os.path.exists(f'/tmp/.X11-unix/X{numero}') or proceso.poll() is not None:
+                break
+            time.sleep(0.1)
+        if proceso.poll() is None:
+            return proceso, f':{numero}'
+    return None, None
+
+
+def medir_proceso(entorno, con_ventana):
+    """ms por etapa de un arranque en un intérprete limpio"""
+    comando = [sys.executable, os.path.abspath(__file__), '--hijo']
+    if con_ventana:
+        comando.append('--ventana')
+    salida = subprocess.run(comando, capture_output=True, text=True, env=entorno, cwd=DIRECTORIO)
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1])
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--sin-ventana', action='store_true',
+                        help="no construir MainApp aunque haya pantalla (modo nucleo)")
+    parser.add_argument('--salida', help="guardar las mediciones en este JSON")
+    parser.add_argument('--base', help="JSON de una corrida anterior con el que comparar")
+    parser.add_argument('--umbral-tiempo', type=float, default=0.25,
+                        help="aumento relativo de tiempo tolerado (0.25 = 25 %%)")
+    parser.add_argument('--minimo-ms', type=float, default=20.0,
+                        help="diferencias de tiempo menores no cuentan como regresión")
+    parser.add_argument('--hijo', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--ventana', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.hijo:
+        print(json.dumps(arrancar(args.ventana)))
+        return 0
+
+    entorno = dict(os.environ)
+    xvfb = None
+    if not args.sin_ventana and not entorno.get('DISPLAY'):
+        xvfb, display = iniciar_xvfb()
+        if display:
+            entorno['DISPLAY'] = display
+    modo = 'ventana' if entorno.get('DISPLAY') and not args.sin_ventana else 'nucleo'
+    print(f"modo: {modo}" + (f" (Xvfb {entorno['DISPLAY']})" if xvfb else ''))
+
+    tiempos = {}
+    try:
+        for modulo in PRESUPUESTOS:
+            try:
+                tiempos[f'importar/{modulo}'] = [medir_modulo(modulo)[0] for _ in range(args.repeticiones)]
+            except RuntimeError as e:
+                print(f"{'importar/' + modulo:>28}: no se pudo importar ({e})")
+        for _ in range(args.repeticiones):
+            for etapa, ms in medir_proceso(entorno, modo == 'ventana').items():
+                tiempos.setdefault(etapa, []).append(ms)
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+    mediciones = []
+    for identificador, valores in tiempos.items():
+        medicion = {'id': identificador, 'ms': statistics.median(valores), 'ms_min': min(valores)}
+        mediciones.append(medicion)
+        print(f"{identificador:>28}: {medicion['ms']:8.1f} ms  (mín {medicion['ms_min']:.1f})")
+
+    if args.salida:
+        linea_base.guardar(args.salida, 'arranque', mediciones, modo=modo,
+                           repeticiones=args.repeticiones)
+    if not args.base:
+        return 0
+
+    with open(args.base, encoding='utf-8') as f:
+        modo_base = json.load(f).get('modo')
+    if modo_base != modo:
+        print(f"aviso: la línea base es del modo {modo_base!r}; solo se comparan las etapas comunes")
+    regresiones = linea_base.comparar(mediciones, linea_base.cargar(args.base),
+                                      umbrales={'ms_min': args.umbral_tiempo},
+                                      minimos={'ms_min': args.minimo_ms})
+    return linea_base.informar(regresiones)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga del SolverPool: rendimiento, latencias, timeouts y CPU por proceso
+
+Reproduce un corpus de integrales contra el pool sin interfaz, como lo harían
+muchos estudiantes a la vez, para elegir número de procesos y tiempo límite.
+El corpus es el de los benchmarks (por defecto), un archivo como los de
+batch_solver.py (.txt/.csv/.jsonl, incluidos sus resultados) o un directorio
+del registro de resoluciones lentas.
+
+Dos modos de llegada:
+    --concurrencia N   N clientes; cada uno envía la siguiente al recibir la anterior
+    --tasa R           llegadas de Poisson a R peticiones por segundo, sin esperar
+Con varios valores de --procesos y --timeout se prueba cada combinación.
+
+Por corrida informa peticiones por segundo, latencia p50/p95/p99 vista por el
+cliente (cola incluida), tiempo de servicio, tasa de timeouts y errores,
+peticiones agrupadas con otra igual en curso, la tasa de aciertos de la caché
+de soluciones de los procesos y la utilización de CPU de cada proceso
+trabajador (segundos de CPU / duración de la corrida).
+
+El corpus se repite: con la caché de cada proceso, a partir de la segunda
+vuelta casi todo son aciertos y las latencias no sirven para dimensionar.
+--sin-cache la desactiva para medir resoluciones reales (la caché interna de
+SymPy sigue activa, como en el servicio).
+
+Uso:
+    python benchmarks/bench_carga.py --procesos 1 2 4 --concurrencia 8 --peticiones 200 --sin-cache
+    python benchmarks/bench_carga.py --entrada entregas.csv --tasa 5 --duracion 60 --timeout 5 10
+"""
+import argparse
+import glob
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import wait
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import linea_base
+from batch_solver import leer_entradas
+from corpus import VARIANTES, entradas
+from metrics import CACHE
+from solver_pool import SolverPool
+
+RESULTADOS_CACHE = ('acierto', 'equivalente', 'fallo')
+
+
+def cargar_corpus(ruta=None, variantes=VARIANTES):
+    """Lista de (funcion, variable) a reproducir"""
+    if ruta is None:
+        return [(funcion, 'x') for _, _, funcion, _ in entradas(variantes)]
+    if os.path.isdir(ruta):  # directorio de slow_log: una carpeta por entrada
+        corpus = []
+        for archivo in sorted(glob.glob(os.path.join(ruta, '*', 'entrada.json'))):
+            with open(archivo, encoding='utf-8') as f:
+                dato = json.load(f)
+            corpus.append((dato['funcion'], dato.get('variable') or 'x'))
+        return corpus
+    return [(funcion, variable) for _, funcion, variable in leer_entradas(ruta)]
+
+
+def percentil(valores, q):
+    """Percentil `q` (0-100) por rango más cercano; None sin valores"""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(q / 100 * len(ordenados)) - 1)]
+
+
+class Corrida:
+    """Una corrida de carga contra un pool ya iniciado; recoge un resultado por petición"""
+
+    def __init__(self, pool, corpus, peticiones, duracion, semilla):
+        self.pool = pool
+        self.peticiones = peticiones
+        self.duracion = duracion
+        self.aleatorio = random.Random(semilla)
+        orden = list(corpus)
+        self.aleatorio.shuffle(orden)
+        self._siguiente = itertools.cycle(orden)
+        self._enviadas = 0
+        self._cerrojo = threading.Lock()
+        self.resultados = []  # (latencia en s, registro)
+        self.futuros = []
+        self.inicio = self.fin = None
+        self._cache_inicio = self._cache_fin = None
+
+    def _tomar(self):
+        """Siguiente entrada del corpus, o None si ya se enviaron todas o se acabó el tiempo"""
+        with self._cerrojo:
+            if self.peticiones is not None and self._enviadas >= self.peticiones:
+                return None
+            if self.duracion is not None and time.perf_counter() - self.inicio >= self.duracion:
+                return None
+            self._enviadas += 1
+            return next(self._siguiente)
+
+    def _enviar(self, funcion, variable):
+        enviada = time.perf_counter()
+        futuro = self.pool.enviar(funcion, variable)
+
+        def terminado(f):
+            registro = f.result()
+            with self._cerrojo:
+                self.resultados.append((time.perf_counter() - enviada, registro))
+
+        futuro.add_done_callback(terminado)
+        with self._cerrojo:
+            self.futuros.append(futuro)
+        return futuro
+
+    @staticmethod
+    def _consultas_cache():
+        """Consultas a la caché de soluciones de los procesos (sumadas por el pool)"""
+        return {r: CACHE.valor(cache='soluciones', resultado=r) for r in RESULTADOS_CACHE}
+
+    def cerrada(self, concurrencia):
+        """`concurrencia` clientes que esperan su respuesta antes de enviar otra"""
+        def cliente():
+            while True:
+                entrada = self._tomar()
+                if entrada is None:
+                    return
+                self._enviar(*entrada).result()
+
+        self._cache_inicio = self._consultas_cache()
+        self.inicio = time.perf_counter()
+        clientes = [threading.Thread(target=cliente, daemon=True) for _ in range(concurrencia)]
+        for hilo in clientes:
+            hilo.start()
+        for hilo in clientes:
+            hilo.join()
+        self._terminar()
+
+    def abierta(self, tasa):
+        """Llegadas de Poisson a `tasa` por segundo, sin esperar respuestas"""
+        self._cache_inicio = self._consultas_cache()
+        self.inicio = time.perf_counter()
+        llegada = self.inicio
+        while True:
+            llegada += self.aleatorio.expovariate(tasa)
+            espera = llegada - time.perf_counter()
+            if espera > 0:
+                time.sleep(espera)
+            entrada = self._tomar()
+            if entrada is None:
+                break
+            self._enviar(*entrada)
+        self._terminar()
+
+    def _terminar(self):
+        """Esperar todas las respuestas (y sus callbacks, que corren tras despertar a wait)"""
+        wait(list(self.futuros))
+        while len(self.resultados) < len(self.futuros):
+            time.sleep(0.001)
+        self.fin = time.perf_counter()
+        self._cache_fin = self._consultas_cache()
+
+    def resumen(self):
+        """Medición agregada de la corrida"""
+        duracion = self.fin - self.inicio
+        latencias = [latencia * 1000 for latencia, _ in self.resultados]
+        servicio = [r['segundos'] * 1000 for _, r in self.resultados
+                    if 'segundos' in r and not r.get('agrupada')]
+        estados = {}
+        for _, registro in self.resultados:
+            estados[registro['estado']] = estados.get(registro['estado'], 0) + 1
+        cpu = {}
+        for _, registro in self.resultados:
+            if 'pid' in registro and not registro.get('agrupada'):
+                cpu[registro['pid']] = cpu.get(registro['pid'], 0.0) + registro['cpu_segundos']
+        total = len(self.resultados)
+        cache = {r: self._cache_fin[r] - self._cache_inicio[r] for r in RESULTADOS_CACHE}
+        consultas = sum(cache.values())
+        return {
+            'peticiones': total,
+            'duracion_s': duracion,
+            'por_segundo': total / duracion if duracion else 0.0,
+            'p50_ms': percentil(latencias, 50),
+            'p95_ms': percentil(latencias, 95),
+            'p99_ms': percentil(latencias, 99),
+            'servicio_p50_ms': percentil(servicio, 50),
+            'servicio_p95_ms': percentil(servicio, 95),
+            'tasa_timeout': estados.get('timeout', 0) / total if total else 0.0,
+            'tasa_error': estados.get('error', 0) / total if total else 0.0,
+            'agrupadas': sum(1 for _, r in self.resultados if r.get('agrupada')),
+            'tasa_cache': cache['acierto'] / consultas if consultas else 0.0,
+            'cache': cache,
+            'estados': estados,
+            'cpu_por_proceso': {str(pid): segundos / duracion for pid, segundos in sorted(cpu.items())},
+        }
+
+
+def esperar_listos(pool, limite=120):
+    """Esperar a que todos los procesos terminen de calentarse (no cuenta en la carga)"""
+    pool.iniciar()
+    fin = time.monotonic() + limite
+    while pool.listos() < pool.procesos and time.monotonic() < fin:
+        time.sleep(0.05)
+
+
+def imprimir(medicion):
+    def ms(valor):
+        return f"{valor:8.0f}" if valor is not None else '       -'
+
+    print(f"{medicion['id']:>18}: {medicion['por_segundo']:6.2f}/s  "
+          f"p50 {ms(medicion['p50_ms'])} ms  p95 {ms(medicion['p95_ms'])} ms  "
+          f"p99 {ms(medicion['p99_ms'])} ms  timeouts {medicion['tasa_timeout']:6.1%}  "
+          f"errores {medicion['tasa_error']:6.1%}  agrupadas {medicion['agrupadas']}  "
+          f"caché {medicion['tasa_cache']:6.1%}")
+    cpu = '  '.join(f"{pid}: {uso:5.1%}" for pid, uso in medicion['cpu_por_proceso'].items())
+    print(f"{'':>18}  CPU por proceso  {cpu or '-'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--entrada', help="archivo .txt/.csv/.jsonl o directorio de slow_log "
+                                          "(por defecto, el corpus de los benchmarks)")
+    parser.add_argument('--variantes', nargs='+', choices=VARIANTES, default=list(VARIANTES),
+                        help="variantes del corpus de benchmarks a usar")
+    parser.add_argument('--procesos', nargs='+', type=int, default=[None],
+                        help="tamaños de pool a probar (por defecto, núcleos - 1)")
+    parser.add_argument('--timeout', nargs='+', type=float, default=[30.0],
+                        help="tiempos límite por integral a probar, en segundos")
+    modo = parser.add_mutually_exclusive_group()
+    modo.add_argument('--concurrencia', type=int, default=None,
+                      help="clientes simultáneos (carga cerrada; por defecto 4)")
+    modo.add_argument('--tasa', type=float, default=None,
+                      help="peticiones por segundo con llegadas de Poisson (carga abierta)")
+    parser.add_argument('--peticiones', type=int, default=None,
+                        help="peticiones por corrida (por defecto 100 si no hay --duracion)")
+    parser.add_argument('--duracion', type=float, default=None,
+                        help="segundos de envío por corrida")
+    parser.add_argument('--sin-cache', action='store_true',
+                        help="sin caché de soluciones en los procesos (cada petición se resuelve)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', help="guardar las mediciones en este JSON")
+    parser.add_argument('--base', help="JSON de una corrida anterior con el que comparar")
+    parser.add_argument('--umbral-latencia', type=float, default=0.25,
+                        help="aumento relativo de p95/p99 tolerado (0.25 = 25 %%)")
+    args = parser.parse_args()
+
+    corpus = cargar_corpus(args.entrada, args.variantes)
+    if not corpus:
+        print("El corpus está vacío", file=sys.stderr)
+        return 2
+    if args.peticiones is None and args.duracion is None:
+        args.peticiones = 100
+    concurrencia = args.concurrencia or (None if args.tasa else 4)
+    carga = f"c{concurrencia}" if concurrencia else f"r{args.tasa:g}"
+    if args.sin_cache:
+        carga += '/sin-cache'
+    print(f"{len(corpus)} entradas en el corpus; carga "
+          f"{f'cerrada, {concurrencia} clientes' if concurrencia else f'abierta, {args.tasa:g}/s'}")
+
+    mediciones = []
+    for procesos, timeout in itertools.product(args.procesos, args.timeout):
+        with SolverPool(procesos, timeout, 0 if args.sin_cache else 32) as pool:
+            esperar_listos(pool)
+            corrida = Corrida(pool, corpus, args.peticiones, args.duracion, args.semilla)
+            if concurrencia:
+                corrida.cerrada(concurrencia)
+            else:
+                corrida.abierta(args.tasa)
+            medicion = {'id': f"p{pool.procesos}/t{timeout:g}/{carga}", 'procesos': pool.procesos,
+                        'timeout': timeout, **corrida.resumen()}
+        mediciones.append(medicion)
+        imprimir(medicion)
+
+    if args.salida:
+        linea_base.guardar(args.salida, 'carga', mediciones, corpus=args.entrada or 'benchmarks',
+                           entradas=len(corpus), concurrencia=concurrencia, tasa=args.tasa,
+                           sin_cache=args.sin_cache, semilla=args.semilla)
+    if not args.base:
+        return 0
+
+    regresiones = linea_base.comparar(
+        mediciones, linea_base.cargar(args.base),
+        umbrales={'p95_ms': args.umbral_latencia, 'p99_ms': args.umbral_latencia,
+                  'tasa_timeout': 0, 'tasa_error': 0},
+        minimos={'p95_ms': 20, 'p99_ms': 20})
+    return linea_base.informar(regresiones)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Presupuesto de tiempo de importación por módulo
+
+Importa cada módulo en un intérprete nuevo, mide el tiempo (mediana de
+varias repeticiones) y comprueba dos cosas: que no se supere el presupuesto
+en milisegundos y que el núcleo sin interfaz no cargue tkinter, matplotlib
+ni PIL (y que main_app no cargue matplotlib ni PIL antes de la ventana).
+Devuelve código 1 si algún módulo incumple.
+
+Uso:
+    python benchmarks/bench_importacion.py [--repeticiones N] [--escala F]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+DIRECTORIO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# módulo -> (presupuesto en ms, paquetes que no debe cargar)
+NUCLEO = ('tkinter', 'matplotlib', 'PIL')
+PRESUPUESTOS = {
+    'math_solver': (600, NUCLEO),
+    'solution_store': (600, NUCLEO),
+    'solution_serializer': (600, NUCLEO),
+    'solver_pool': (50, NUCLEO + ('sympy',)),
+    'batch_solver': (80, NUCLEO + ('sympy',)),
+    'text_exporter': (50, NUCLEO + ('sympy',)),
+    'main_app': (700, ('matplotlib', 'PIL')),
+}
+
+CODIGO = """
+import importlib, json, sys, time
+sys.path.insert(0, {directorio!r})
+inicio = time.perf_counter()
+importlib.import_module({modulo!r})
+ms = (time.perf_counter() - inicio) * 1000
+print(json.dumps({{'ms': ms, 'cargados': sorted({{m.split('.')[0] for m in sys.modules}})}}))
+"""
+
+
+def medir_modulo(modulo):
+    """(ms, paquetes cargados) importando `modulo` en un intérprete limpio"""
+    salida = subprocess.run([sys.executable, '-c', CODIGO.format(directorio=DIRECTORIO, modulo=modulo)],
+                            capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1])
+    datos = json.loads(salida.stdout)
+    return datos['ms'], set(datos['cargados'])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--escala', type=float, default=1.0,
+                        help="multiplicador de los presupuestos (máquinas lentas)")
+    args = parser.parse_args()
+
+    fallos = 0
+    for modulo, (presupuesto, prohibidos) in PRESUPUESTOS.items():
+        try:
+            mediciones = [medir_modulo(modulo) for _ in range(args.repeticiones)]
+        except RuntimeError as e:
+            print(f"{modulo:>20}: no se pudo importar ({e})")
+            continue
+        ms = statistics.median(m for m, _ in mediciones)
+        cargados = sorted(set(prohibidos) & mediciones[-1][1])
+        limite = presupuesto * args.escala
+        ok = ms <= limite and not cargados
+        fallos += not ok
+        detalle = f"  carga {', '.join(cargados)}" if cargados else ''
+        print(f"{modulo:>20}: {ms:7.1f} ms  (presupuesto {limite:6.0f} ms)  "
+              f"{'OK' if ok else 'FALLA'}{detalle}")
+    return 1 if fallos else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
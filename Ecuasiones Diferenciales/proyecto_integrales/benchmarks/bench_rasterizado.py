@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark: latencia por fórmula del rasterizado LaTeX
+
+Compara la ruta anterior (plt.figure + canvas.draw + savefig PNG + PIL)
+con la ruta directa del parser mathtext a un buffer RGBA.
+
+Uso:
+    python benchmarks/bench_rasterizado.py [--repeticiones N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from io import BytesIO
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from matplotlib.mathtext import MathTextParser
+from PIL import Image
+
+from mathtext_raster import rasterizar_rgba
+
+FORMULAS = [
+    r'\int x^{2} \, dx',
+    r'\int x^{2} \, dx = \frac{x^{3}}{3} + C',
+    r'x = 5\sin(\theta), \quad dx = 5\cos(\theta) \, d\theta',
+    r'\cos^2(\theta) = \frac{1 + \cos(2\theta)}{2}',
+    r'\frac{25}{2}\arcsin\left(\frac{x}{5}\right) + \frac{x\sqrt{5^2 - x^2}}{2} + C',
+    r'\int u \, dv = uv - \int v \, du = x\ln(x) - \int 1 \, dx',
+    r'\int x e^{x} \, dx = \left(x - 1\right) e^{x} + C',
+]
+
+
+def ruta_figura(latex_str, dpi=150, fontsize=12, pad=0.03):
+    """Ruta anterior de StepRenderer (sin el PhotoImage final)"""
+    fig = plt.figure(figsize=(0.01, 0.01), dpi=dpi)
+    fig.patch.set_alpha(0)
+    txt = fig.text(0, 0, f"${latex_str}$", fontsize=fontsize, color='white')
+    fig.canvas.draw()
+    bbox = txt.get_window_extent()
+    w, h = bbox.width / dpi, bbox.height / dpi
+    fig.set_size_inches(w + 2*pad, h + 2*pad)
+    txt.set_position((pad, pad))
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=dpi, transparent=True,
+                bbox_inches='tight', pad_inches=0.0, facecolor='none')
+    plt.close(fig)
+    buf.seek(0)
+    img = Image.open(buf)
+    img.load()
+    return img
+
+
+def ruta_directa(latex_str, dpi=150, fontsize=12):
+    """Ruta nueva: parser mathtext -> buffer RGBA"""
+    return rasterizar_rgba(latex_str, dpi, fontsize, 'white')
+
+
+def limpiar_cache_mathtext():
+    """Vaciar la caché interna de parseo de matplotlib (mide el caso en frío)"""
+    cache = getattr(MathTextParser, '_parse_cached', None)
+    if cache is not None and hasattr(cache, 'cache_clear'):
+        cache.cache_clear()
+
+
+def medir(funcion, repeticiones):
+    """Latencias en milisegundos de cada llamada"""
+    tiempos = []
+    for _ in range(repeticiones):
+        for formula in FORMULAS:
+            limpiar_cache_mathtext()
+            inicio = time.perf_counter()
+            funcion(formula)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args()
+
+    # Calentar cachés de fuentes para no medir la carga inicial
+    ruta_figura(FORMULAS[0])
+    ruta_directa(FORMULAS[0])
+
+    resultados = {}
+    for nombre, funcion in (('figura+PNG', ruta_figura), ('mathtext directo', ruta_directa)):
+        tiempos = medir(funcion, args.repeticiones)
+        resultados[nombre] = statistics.median(tiempos)
+        print(f"{nombre:>18}: mediana {statistics.median(tiempos):7.2f} ms  "
+              f"media {statistics.mean(tiempos):7.2f} ms  (n={len(tiempos)})")
+
+    print(f"{'aceleración':>18}: x{resultados['figura+PNG'] / resultados['mathtext directo']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
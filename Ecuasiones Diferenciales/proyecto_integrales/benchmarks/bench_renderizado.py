@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Benchmark de presentación: fórmulas, panel de pasos, gráficas y PDF
+
+Mide, con el backend Agg, lo que el usuario espera después de resolver:
+    formula/<n>       rasterizado de cada fórmula (lo de _latex_to_photoimage
+                      salvo el PhotoImage final, que necesita Tk), en frío
+    panel/<pasos>     mostrar 10, 100 y 1000 pasos en el StepRenderer hasta
+                      que las tarjetas visibles tienen su fórmula, y recorrer la
+                      lista de arriba abajo (necesita pantalla: $DISPLAY o Xvfb)
+    grafico/<puntos>  figura del GraphManager con ese número de muestras por
+                      curva, muestreo y dibujo incluidos
+    pdf/<páginas>     exportación PDF de una solución de ese número de páginas
+Para cada uno: mediana y mínimo en ms, rendimiento (fórmulas, pasos, puntos
+o páginas por segundo) y memoria pico de Python (tracemalloc, en una corrida
+aparte). Con --base compara contra una corrida guardada.
+
+Uso:
+    python benchmarks/bench_renderizado.py [--secciones formulas pdf] [--salida actual.json]
+                                           [--base base.json] [--repeticiones N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import matplotlib
+matplotlib.use('Agg')
+
+import linea_base
+from bench_rasterizado import FORMULAS, limpiar_cache_mathtext
+from graph_manager import GraphManager
+from math_solver import MathSolver
+from mathtext_raster import rasterizar_rgba
+from pdf_exporter import PDFExporter
+from solution_store import SolutionArtifact
+
+SECCIONES = ('formulas', 'panel', 'grafico', 'pdf')
+FUNCION = 'x*exp(x)'
+
+
+def medir(funcion, repeticiones, preparar=None):
+    """ms (mediana y mínimo) y KiB pico de `funcion`; `preparar` corre antes, sin medir"""
+    tiempos = []
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    if preparar:
+        preparar()
+    tracemalloc.start()
+    funcion()
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'ms': statistics.median(tiempos), 'ms_min': min(tiempos), 'pico_kb': pico / 1024}
+
+
+def pasos_sinteticos(n):
+    """`n` pasos con fórmulas distintas (no se reutilizan imágenes entre ellos)"""
+    return [{'titulo': f'Paso de prueba {i}',
+             'formula_latex': rf'\int x^{{{i}}} e^{{x}} \, dx = \frac{{x^{{{i + 1}}}}}{{{i + 1}}} + C',
+             'formula': f'∫ x**{i} * exp(x) dx',
+             'explicacion': 'Se aplica la regla de integración correspondiente al término.'}
+            for i in range(1, n + 1)]
+
+
+# === Secciones ===
+
+def bench_formulas(args):
+    mediciones = []
+    for n, formula in enumerate(FORMULAS):
+        medicion = medir(lambda: rasterizar_rgba(formula, 150, 12, 'white'), args.repeticiones,
+                         limpiar_cache_mathtext)
+        medicion.update({'id': f'formula/{n}', 'formula': formula,
+                         'por_segundo': 1000 / medicion['ms']})
+        mediciones.append(medicion)
+    return mediciones
+
+
+def bench_panel(args):
+    import tkinter as tk
+    from bench_arranque import iniciar_xvfb
+    from step_renderer import StepRenderer
+
+    xvfb = None
+    if not os.environ.get('DISPLAY'):
+        xvfb, display = iniciar_xvfb()
+        if display:
+            os.environ['DISPLAY'] = display
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        print("panel: omitido (no hay pantalla; instalar Xvfb o definir $DISPLAY)")
+        return []
+    root.geometry('600x900')
+    marco = tk.Frame(root, bg='#0d1117')
+    marco.pack(fill='both', expand=True)
+    renderer = StepRenderer(root)
+    renderer.crear_panel_resultados(marco)
+    renderer.raster_pool.calentar()
+    root.update()
+
+    def drenar(limite=60):
+        """Procesar eventos hasta que no quedan tarjetas ni fórmulas pendientes"""
+        fin = time.monotonic() + limite
+        while ((renderer._pendientes or renderer._actualizacion_id is not None)
+               and time.monotonic() < fin):
+            root.update()
+            time.sleep(0.001)
+        root.update()
+
+    def preparar():
+        renderer.limpiar_pasos()
+        renderer.latex_cache.limpiar()
+        drenar()
+
+    mediciones = []
+    try:
+        renderer.mostrar_pasos_detallados(pasos_sinteticos(3), None, FUNCION, 'x')
+        drenar()  # calentar el pool de rasterizado
+        for n in args.pasos:
+            pasos = pasos_sinteticos(n)
+
+            def mostrar():
+                renderer.mostrar_pasos_detallados(pasos, None, FUNCION, 'x')
+                drenar()
+
+            def recorrer():
+                canvas = renderer.steps_canvas
+                pantalla = canvas.winfo_height() / max(renderer._offsets[-1], 1)
+                fraccion = 0.0
+                while fraccion < 1.0:
+                    fraccion += pantalla
+                    canvas.yview_moveto(min(fraccion, 1.0))
+                    drenar()
+
+            medicion = medir(mostrar, args.repeticiones, preparar)
+            medicion.update({'id': f'panel/{n}', 'pasos': n,
+                             'por_segundo': n * 1000 / medicion['ms']})
+            mediciones.append(medicion)
+
+            # Recorrido: se parte de la lista ya mostrada y arriba
+            def volver_arriba():
+                renderer.steps_canvas.yview_moveto(0)
+                drenar()
+            mostrar()
+            medicion = medir(recorrer, args.repeticiones, volver_arriba)
+            medicion.update({'id': f'panel/{n}/recorrido', 'pasos': n,
+                             'por_segundo': n * 1000 / medicion['ms']})
+            mediciones.append(medicion)
+    finally:
+        renderer.cerrar()
+        root.destroy()
+        if xvfb is not None:
+            xvfb.terminate()
+    return mediciones
+
+
+def bench_grafico(args, artefacto):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    graph_manager = GraphManager(None, None)
+    mediciones = []
+    for n in args.muestras:
+        def graficar():
+            fig = graph_manager.construir_figura(artefacto, n)
+            FigureCanvasAgg(fig).draw()
+            fig.clear()
+
+        medicion = medir(graficar, args.repeticiones, artefacto.liberar_cache)
+        medicion.update({'id': f'grafico/{n}', 'muestras': n,
+                         'por_segundo': 2 * n * 1000 / medicion['ms']})
+        mediciones.append(medicion)
+    return mediciones
+
+
+def bench_pdf(args, artefacto):
+    # Pasos por página según la paginación real del exportador
+    muestra = pasos_sinteticos(40)
+    pasos_por_pagina = len(muestra) / len(PDFExporter(artefacto, muestra, 'indefinida').paginar())
+    artefacto.liberar_cache()
+
+    mediciones = []
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta = os.path.join(directorio, 'bench.pdf')
+        for paginas in args.paginas:
+            pasos = pasos_sinteticos(max(1, int((paginas - 1) * pasos_por_pagina)))
+
+            def exportar():
+                exportar.paginas = PDFExporter(artefacto, pasos, 'indefinida').exportar(ruta)
+
+            # Sin imágenes ni muestras previas, como al exportar una solución recién abierta
+            medicion = medir(exportar, args.repeticiones, artefacto.liberar_cache)
+            medicion.update({'id': f'pdf/{paginas}', 'paginas': exportar.paginas,
+                             'pasos': len(pasos), 'kb': os.path.getsize(ruta) / 1024,
+                             'por_segundo': exportar.paginas * 1000 / medicion['ms']})
+            mediciones.append(medicion)
+    return mediciones
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--secciones', nargs='+', choices=SECCIONES, default=list(SECCIONES))
+    parser.add_argument('--repeticiones', type=int, default=3)
+    parser.add_argument('--pasos', nargs='+', type=int, default=[10, 100, 1000])
+    parser.add_argument('--muestras', nargs='+', type=int, default=[100, 1000, 10000, 100000])
+    parser.add_argument('--paginas', nargs='+', type=int, default=[2, 10, 50])
+    parser.add_argument('--salida', help="guardar las mediciones en este JSON")
+    parser.add_argument('--base', help="JSON de una corrida anterior con el que comparar")
+    parser.add_argument('--umbral-tiempo', type=float, default=0.25,
+                        help="aumento relativo de tiempo tolerado (0.25 = 25 %%)")
+    parser.add_argument('--umbral-memoria', type=float, default=0.25,
+                        help="aumento relativo de memoria pico tolerado")
+    parser.add_argument('--minimo-ms', type=float, default=5.0,
+                        help="diferencias de tiempo menores no cuentan como regresión")
+    args = parser.parse_args()
+
+    # Calentar fuentes de mathtext y módulos perezosos de SymPy antes de medir
+    rasterizar_rgba(FORMULAS[0], 150, 12, 'white')
+    artefacto = SolutionArtifact(FUNCION, 'x')
+    artefacto.resolver(MathSolver(), registrar=False)
+
+    secciones = {
+        'formulas': lambda: bench_formulas(args),
+        'panel': lambda: bench_panel(args),
+        'grafico': lambda: bench_grafico(args, artefacto),
+        'pdf': lambda: bench_pdf(args, artefacto),
+    }
+    mediciones = []
+    for seccion in args.secciones:
+        for medicion in secciones[seccion]():
+            mediciones.append(medicion)
+            print(f"{medicion['id']:>22}: {medicion['ms']:9.1f} ms  {medicion['pico_kb']:9.0f} KiB  "
+                  f"{medicion['por_segundo']:10.1f}/s")
+
+    if args.salida:
+        linea_base.guardar(args.salida, 'renderizado', mediciones, backend=matplotlib.get_backend(),
+                           repeticiones=args.repeticiones)
+    if not args.base:
+        return 0
+
+    regresiones = linea_base.comparar(
+        mediciones, linea_base.cargar(args.base),
+        umbrales={'ms_min': args.umbral_tiempo, 'pico_kb': args.umbral_memoria},
+        minimos={'ms_min': args.minimo_ms, 'pico_kb': 256})
+    return linea_base.informar(regresiones)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
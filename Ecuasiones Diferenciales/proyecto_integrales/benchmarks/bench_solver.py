@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark del MathSolver: tiempo, memoria pico y pasos por rama de resolución
+
+Resuelve cada caso del corpus (variantes normal y grande) con la caché de
+SymPy vacía, y registra la mediana del tiempo, el pico de memoria de Python
+(tracemalloc, en una corrida aparte para no inflar los tiempos), el número de
+pasos y la rama que tomó realmente resolver_integral_general. Con --base
+compara contra una corrida guardada (el tiempo mínimo, que es el menos
+ruidoso) y devuelve código 1 si algo empeora más de lo tolerado.
+
+Uso:
+    python benchmarks/bench_solver.py [--repeticiones N] [--salida actual.json]
+                                      [--base base.json] [--umbral-tiempo 0.25]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sympy.core.cache import clear_cache
+
+import linea_base
+from corpus import VARIANTES, entradas
+from math_solver import MathSolver
+from solution_store import SolutionArtifact
+
+
+def medir_caso(math_solver, funcion_str, repeticiones, en_frio=True):
+    """Medición de una entrada: ms (mediana), KiB pico, pasos, rama y estado"""
+    artefacto = SolutionArtifact(funcion_str, 'x')
+    funcion, variable = artefacto.funcion, artefacto.variable
+    try:
+        rama = math_solver.identificar_rama(funcion, variable)
+    except Exception:
+        rama = 'error'  # el propio detector falla: resolver_integral_general también
+
+    tiempos = []
+    for _ in range(repeticiones):
+        if en_frio:
+            clear_cache()
+        inicio = time.perf_counter()
+        pasos, resultado = math_solver.resolver_integral_general(funcion, variable)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    if en_frio:
+        clear_cache()
+    tracemalloc.start()
+    math_solver.resolver_integral_general(funcion, variable)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'ms': statistics.median(tiempos),
+        'ms_min': min(tiempos),
+        'pico_kb': pico / 1024,
+        'pasos': len(pasos),
+        'rama': rama,
+        'fallo': int(resultado is None),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeticiones', type=int, default=5)
+    parser.add_argument('--variantes', nargs='+', choices=VARIANTES, default=list(VARIANTES))
+    parser.add_argument('--casos', nargs='+', metavar='NOMBRE',
+                        help="solo estos casos del corpus (por defecto, todos)")
+    parser.add_argument('--en-caliente', action='store_true',
+                        help="no vaciar la caché de SymPy entre repeticiones")
+    parser.add_argument('--salida', help="guardar las mediciones en este JSON")
+    parser.add_argument('--base', help="JSON de una corrida anterior con el que comparar")
+    parser.add_argument('--umbral-tiempo', type=float, default=0.25,
+                        help="aumento relativo de tiempo tolerado (0.25 = 25 %%)")
+    parser.add_argument('--umbral-memoria', type=float, default=0.25,
+                        help="aumento relativo de memoria pico tolerado")
+    parser.add_argument('--minimo-ms', type=float, default=5.0,
+                        help="diferencias de tiempo menores no cuentan como regresión")
+    args = parser.parse_args()
+
+    # Calentar: cargar los módulos perezosos de SymPy antes de medir
+    math_solver = MathSolver()
+    medir_caso(math_solver, 'x', 1)
+
+    mediciones = []
+    for nombre, variante, funcion_str, rama_esperada in entradas(args.variantes, args.casos):
+        medicion = medir_caso(math_solver, funcion_str, args.repeticiones, not args.en_caliente)
+        medicion.update({'id': f'{nombre}/{variante}', 'funcion': funcion_str,
+                         'rama_esperada': rama_esperada})
+        mediciones.append(medicion)
+        aviso = '' if medicion['rama'] == rama_esperada else f"  (rama: {medicion['rama']})"
+        print(f"{medicion['id']:>34}: {medicion['ms']:8.1f} ms  {medicion['pico_kb']:8.0f} KiB  "
+              f"{medicion['pasos']:3d} pasos  {'FALLA' if medicion['fallo'] else 'ok'}{aviso}")
+
+    if args.salida:
+        linea_base.guardar(args.salida, 'solver', mediciones, version_solver=MathSolver.VERSION,
+                           repeticiones=args.repeticiones, en_frio=not args.en_caliente)
+    if not args.base:
+        return 0
+
+    base = linea_base.cargar(args.base)
+    for medicion in mediciones:
+        anterior = base.get(medicion['id'])
+        if anterior is not None and anterior['pasos'] != medicion['pasos']:
+            print(f"aviso: {medicion['id']} pasó de {anterior['pasos']} a {medicion['pasos']} pasos")
+    regresiones = linea_base.comparar(
+        mediciones, base,
+        umbrales={'ms_min': args.umbral_tiempo, 'pico_kb': args.umbral_memoria, 'fallo': 0},
+        minimos={'ms_min': args.minimo_ms, 'pico_kb': 64})
+    return linea_base.informar(regresiones)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+"""
+Corpus de integrales para benchmarks: al menos una entrada por rama de MathSolver
+
+Cada entrada tiene una variante 'normal' y otra 'grande' (misma rama, más
+términos o mayor grado) para ver cómo escala el costo de cada método.
+"""
+
+_POLINOMIO_GRANDE = ' + '.join(f'{k}*x**{k}' for k in range(1, 41))
+_EXPONENCIALES_GRANDE = ' + '.join(f'exp({k}*x + 1)' for k in range(1, 9))
+
+# rama: la que se espera según el orden de resolver_integral_general.
+# 'cociente' nunca se alcanza hoy (todo cociente es también un Mul y
+# 'producto' se evalúa antes); se mide igual para notar si eso cambia.
+CORPUS = [
+    {'nombre': 'raiz_a2_x2', 'rama': 'sqrt_a2_menos_x2',
+     'normal': 'sqrt(9 - x**2)', 'grande': 'sqrt(25 - x**2)'},
+    {'nombre': 'potencia_u_n', 'rama': 'forma_u_n',
+     'normal': '(2*x + 1)**5', 'grande': '(2*x + 1)**40'},
+    {'nombre': 'producto', 'rama': 'producto',
+     'normal': 'x*exp(x)', 'grande': 'x**6*exp(3*x)'},
+    {'nombre': 'cociente', 'rama': 'cociente',
+     'normal': 'x/(x**2 + 1)', 'grande': '(x**3 + 2*x)/(x**4 + 4*x**2 + 1)'},
+    {'nombre': 'exponencial_compuesta', 'rama': 'exponencial_compuesta',
+     'normal': 'exp(2*x) + exp(3*x)', 'grande': _EXPONENCIALES_GRANDE},
+    {'nombre': 'trigonometrica_compuesta', 'rama': 'trigonometrica_compuesta',
+     'normal': 'sin(2*x)', 'grande': 'sin(2*x) + cos(3*x) + tan(4*x) + sin(5*x)**2'},
+    {'nombre': 'polinomio', 'rama': 'general',
+     'normal': 'x**3 + 2*x + 1', 'grande': _POLINOMIO_GRANDE},
+    {'nombre': 'logaritmica', 'rama': 'general',
+     'normal': 'log(x) + atan(x)', 'grande': 'log(x)**2 + log(3*x + 1) + atan(x)'},
+    {'nombre': 'general_sympy', 'rama': 'general',
+     'normal': 'atan(x) + asinh(x)', 'grande': 'atan(x) + asinh(x) + acosh(x) + atan(2*x)**2'},
+]
+
+VARIANTES = ('normal', 'grande')
+
+
+def entradas(variantes=VARIANTES, nombres=None):
+    """(nombre, variante, función, rama esperada) de cada caso seleccionado"""
+    for caso in CORPUS:
+        if nombres and caso['nombre'] not in nombres:
+            continue
+        for variante in variantes:
+            yield caso['nombre'], variante, caso[variante], caso['rama']
@@ -0,0 +1,69 @@
+"""
+Resultados de benchmarks en JSON y comparación contra una línea base guardada
+
+Cada benchmark produce una lista de mediciones con un 'id' estable y métricas
+numéricas. Una métrica empeora si supera a la base en más del umbral relativo
+y, además, en más de un mínimo absoluto (para no alarmarse por ruido en
+mediciones de pocos milisegundos).
+"""
+import json
+import platform
+import sys
+import time
+
+
+def entorno():
+    """Datos de la máquina y versiones, para saber si dos corridas son comparables"""
+    import sympy
+    return {
+        'fecha': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'sympy': sympy.__version__,
+        'plataforma': platform.platform(),
+    }
+
+
+def guardar(ruta, benchmark, mediciones, **extra):
+    """Escribir las mediciones (y el entorno) en un JSON legible"""
+    datos = {'benchmark': benchmark, 'entorno': entorno(), **extra, 'mediciones': mediciones}
+    with open(ruta, 'w', encoding='utf-8') as f:
+        json.dump(datos, f, ensure_ascii=False, indent=2)
+
+
+def cargar(ruta):
+    """Mediciones de un JSON guardado, indexadas por id"""
+    with open(ruta, encoding='utf-8') as f:
+        datos = json.load(f)
+    return {m['id']: m for m in datos['mediciones']}
+
+
+def comparar(mediciones, base, umbrales, minimos=None):
+    """Regresiones de `mediciones` frente a `base` (dict id -> medición).
+
+    umbrales: métrica -> aumento relativo tolerado (0.25 = 25 %)
+    minimos: métrica -> diferencia absoluta por debajo de la cual no se avisa
+    Devuelve una lista de (id, métrica, valor base, valor actual).
+    """
+    minimos = minimos or {}
+    regresiones = []
+    for medicion in mediciones:
+        anterior = base.get(medicion['id'])
+        if anterior is None:
+            continue
+        for metrica, umbral in umbrales.items():
+            actual, previo = medicion.get(metrica), anterior.get(metrica)
+            if actual is None or previo is None:
+                continue
+            if actual > previo * (1 + umbral) and actual - previo > minimos.get(metrica, 0):
+                regresiones.append((medicion['id'], metrica, previo, actual))
+    return regresiones
+
+
+def informar(regresiones, salida=sys.stdout):
+    """Imprimir las regresiones; devuelve el código de salida (1 si hay alguna)"""
+    for identificador, metrica, previo, actual in regresiones:
+        print(f"REGRESIÓN {identificador} {metrica}: {previo:.2f} -> {actual:.2f} "
+              f"(+{(actual / previo - 1) * 100 if previo else float('inf'):.0f} %)", file=salida)
+    if not regresiones:
+        print("Sin regresiones frente a la línea base", file=salida)
+    return 1 if regresiones else 0
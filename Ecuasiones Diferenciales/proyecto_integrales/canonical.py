@@ -0,0 +1,123 @@
+"""
+Forma canónica de las entradas del usuario, usada como clave de cachés y
+para agrupar peticiones idénticas en curso
+
+Dos niveles: `normalizar_entrada` limpia el texto (sin SymPy; índice de cada
+forma escrita) y `clave_de_entrada` lleva la expresión a una forma normal, de
+modo que "x**2+2*x+1", "(x+1)^2" y "1 + 2*x + x**2" comparten clave: la de la
+caché de soluciones y de la agrupación en el SolverPool (se resuelven una vez). La clave
+se busca por una huella estructural estable (blake2b de srepr) y se confirma
+con igualdad exacta de la forma normal. SymPy se importa con la primera clave.
+"""
+import re
+import threading
+from collections import OrderedDict
+
+_ESPACIOS_EN_OPERADORES = re.compile(r'\s*([-+*/^(),=])\s*')
+
+
+def normalizar_entrada(funcion_str, variable_str='x'):
+    """(función, variable) sin espacios superfluos y con ^ escrito como **.
+    Los espacios entre identificadores se conservan ("sin x" no es "sinx")."""
+    funcion = _ESPACIOS_EN_OPERADORES.sub(r'\1', funcion_str.strip())
+    funcion = re.sub(r'\s+', ' ', funcion).replace('^', '**')
+    return funcion, variable_str.strip()
+
+
+# Expandir solo polinomios pequeños: (x+1)**500 se queda factorizado
+LIMITE_GRADO_EXPANSION = 40
+
+
+def grado_estimado(expr, variable):
+    """Cota superior del grado en `variable` leída de la estructura (sin construir
+    el Poly, que expandiría (x+1)**500); None si no es un polinomio."""
+    if not expr.has(variable):
+        return 0
+    if expr == variable:
+        return 1
+    if expr.is_Add or expr.is_Mul:
+        grados = [grado_estimado(arg, variable) for arg in expr.args]
+        if None in grados:
+            return None
+        return max(grados) if expr.is_Add else sum(grados)
+    if expr.is_Pow and expr.exp.is_Integer and expr.exp >= 0:
+        grado = grado_estimado(expr.base, variable)
+        return None if grado is None else grado * int(expr.exp)
+    return None
+
+
+def forma_normal(expr, variable):
+    """Forma normal de `expr`: decimales exactos como racionales (0.5 -> 1/2) y,
+    si es un polinomio pequeño en la única variable, expandido. Add y Mul ya
+    guardan sus argumentos en el orden canónico de SymPy."""
+    from sympy import Float, Rational, expand
+
+    decimales = expr.atoms(Float)
+    if decimales:
+        expr = expr.xreplace({f: Rational(str(f)) for f in decimales})
+    if expr.free_symbols <= {variable}:
+        grado = grado_estimado(expr, variable)
+        if grado is not None and grado <= LIMITE_GRADO_EXPANSION:
+            expr = expand(expr)
+    return expr
+
+
+class ClaveCanonica:
+    """Clave de caché de una integral: huella estructural para el hash y forma
+    normal para confirmar la igualdad (dos huellas iguales no bastan)"""
+
+    __slots__ = ('forma', 'variable', 'huella', '_hash')
+
+    def __init__(self, forma, variable):
+        import hashlib
+        from sympy import srepr
+
+        self.forma = forma
+        self.variable = variable
+        digest = hashlib.blake2b(f"{variable}\0{srepr(forma)}".encode('utf-8'), digest_size=8)
+        self.huella = digest.hexdigest()  # estable entre procesos y ejecuciones
+        self._hash = int.from_bytes(digest.digest(), 'big')
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, otra):
+        return (isinstance(otra, ClaveCanonica) and self._hash == otra._hash
+                and self.variable == otra.variable and self.forma == otra.forma)
+
+    def __repr__(self):
+        return f"ClaveCanonica({self.forma!r}, {self.variable!r}, {self.huella})"
+
+
+def clave_canonica(expr, variable_str):
+    """ClaveCanonica de una expresión ya parseada"""
+    from sympy import Symbol
+
+    variable_str = variable_str.strip()
+    return ClaveCanonica(forma_normal(expr, Symbol(variable_str)), variable_str)
+
+
+_claves = OrderedDict()  # entrada normalizada -> ClaveCanonica (los textos repetidos no se parsean)
+_cerrojo = threading.Lock()
+MAX_CLAVES = 1024
+
+
+def clave_de_entrada(funcion_str, variable_str='x', expr=None):
+    """ClaveCanonica de una entrada de texto; `expr` evita volver a parsear si el
+    llamador ya tiene la expresión. Se parsea con `parsear_expresion` (sin eval y
+    con límites de tamaño). Lanza ValueError si no se puede interpretar."""
+    texto = normalizar_entrada(funcion_str, variable_str)
+    with _cerrojo:
+        clave = _claves.get(texto)
+        if clave is not None:
+            _claves.move_to_end(texto)
+            return clave
+    if expr is None:
+        from safe_parser import parsear_expresion
+        expr = parsear_expresion(texto[0])
+    clave = clave_canonica(expr, texto[1])
+    with _cerrojo:
+        _claves[texto] = clave
+        while len(_claves) > MAX_CLAVES:
+            _claves.popitem(last=False)
+    return clave
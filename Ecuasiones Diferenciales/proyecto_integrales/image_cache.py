@@ -0,0 +1,81 @@
+"""
+Caché LRU acotada para imágenes LaTeX ya rasterizadas
+"""
+from collections import OrderedDict
+
+from metrics import CACHE
+
+
+class LatexImageCache:
+    """Caché LRU de imágenes LaTeX limitada por número de entradas y por bytes"""
+
+    def __init__(self, max_entradas=256, max_bytes=32 * 1024 * 1024):
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()  # clave -> (imagen, tamaño en bytes)
+        self._bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+
+    @staticmethod
+    def crear_clave(latex_str, dpi, fontsize, color):
+        """Clave de caché: (latex, dpi, tamaño de fuente, color)"""
+        return (latex_str.strip(), dpi, fontsize, color)
+
+    def obtener(self, clave):
+        """Devolver la imagen cacheada (o None) y marcarla como usada recientemente"""
+        entrada = self._entradas.get(clave)
+        if entrada is None:
+            self.fallos += 1
+            CACHE.inc(cache='imagenes', resultado='fallo')
+            return None
+        self._entradas.move_to_end(clave)
+        self.aciertos += 1
+        CACHE.inc(cache='imagenes', resultado='acierto')
+        return entrada[0]
+
+    def guardar(self, clave, imagen, tamano):
+        """Guardar una imagen decodificada y expulsar las menos usadas si se excede el límite"""
+        if tamano > self.max_bytes:
+            return  # Una sola imagen mayor que el presupuesto no se cachea
+        anterior = self._entradas.pop(clave, None)
+        if anterior is not None:
+            self._bytes -= anterior[1]
+        self._entradas[clave] = (imagen, tamano)
+        self._bytes += tamano
+        self._expulsar()
+
+    def _expulsar(self):
+        """Eliminar entradas LRU hasta respetar ambos límites"""
+        while self._entradas and (len(self._entradas) > self.max_entradas
+                                  or self._bytes > self.max_bytes):
+            _, (_, tamano) = self._entradas.popitem(last=False)
+            self._bytes -= tamano
+
+    def ajustar_limites(self, max_entradas=None, max_bytes=None):
+        """Cambiar los límites y expulsar lo que sobre de inmediato"""
+        if max_entradas is not None:
+            self.max_entradas = max_entradas
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._expulsar()
+
+    def limpiar(self):
+        """Vaciar la caché"""
+        self._entradas.clear()
+        self._bytes = 0
+
+    def estadisticas(self):
+        """Resumen de uso de la caché"""
+        return {
+            'entradas': len(self._entradas),
+            'bytes': self._bytes,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+        }
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def __contains__(self, clave):
+        return clave in self._entradas
@@ -1,270 +1,364 @@
-"""
-Clase principal que coordina todas las funcionalidades de la aplicación
-"""
-import tkinter as tk
-from tkinter import messagebox, filedialog
-from datetime import datetime
-from sympy import *
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-
-from math_solver import MathSolver
-from ui_manager import UIManager
-from step_renderer import StepRenderer
-from graph_manager import GraphManager
-
-class MainApp:
-    """Clase principal que coordina todas las funcionalidades de la aplicación"""
-    
-    def __init__(self, root):
-        self.root = root
-        
-        # Inicializar componentes
-        self.ui_manager = UIManager(root)
-        self.math_solver = MathSolver()
-        
-        # Crear panel de resultados usando StepRenderer
-        main_container = None
-        for child in root.winfo_children():
-            if isinstance(child, tk.Frame) and child.cget('bg') == '#0d1117':
-                main_container = child
-                break
-        
-        if main_container:
-            self.step_renderer = StepRenderer(root)
-            result_frame = self.step_renderer.crear_panel_resultados(main_container)
-        
-        # Crear GraphManager
-        self.graph_manager = GraphManager(
-            self.ui_manager.graph_frame, 
-            self.ui_manager.btn_cerrar_grafico
-        )
-        
-        # Establecer referencias cruzadas
-        self.ui_manager.set_step_renderer(self.step_renderer)
-        self.ui_manager.set_graph_manager(self.graph_manager)
-        self.ui_manager.set_main_app(self)
-        
-        # Variables de estado
-        self.pasos_actuales = []
-    
-    def resolver_integral(self):
-        """Resolver la integral paso a paso"""
-        try:
-            funcion_str = self.ui_manager.get_funcion_str()
-            if not funcion_str:
-                messagebox.showerror("Error", "Ingresa una función para integrar")
-                return
-            
-            # Parsear la función
-            x = Symbol(self.ui_manager.get_variable_str())
-            try:
-                funcion = parse_expr(funcion_str, transformations='all')
-            except:
-                messagebox.showerror("Error", f"No se puede interpretar la función: {funcion_str}")
-                return
-            
-            # Resolver paso a paso usando MathSolver
-            pasos, resultado = self.math_solver.resolver_integral_general(funcion, x)
-            self.pasos_actuales = pasos
-            
-            # Mostrar resultados usando StepRenderer
-            self.step_renderer.mostrar_pasos_detallados(
-                pasos, resultado, funcion_str, self.ui_manager.get_variable_str()
-            )
-            
-            # Si es definida, calcular valor numérico
-            if self.ui_manager.get_tipo_integral() == "definida" and resultado:
-                self.calcular_integral_definida(funcion, x, resultado)
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
-    
-    def calcular_integral_definida(self, funcion, variable, antiderivada):
-        """Calcular integral definida con pasos"""
-        try:
-            limite_inf_str, limite_sup_str = self.ui_manager.get_limites()
-            limite_inf = parse_expr(limite_inf_str)
-            limite_sup = parse_expr(limite_sup_str)
-            
-            # Evaluar en los límites
-            valor_sup = antiderivada.subs(variable, limite_sup)
-            valor_inf = antiderivada.subs(variable, limite_inf)
-            resultado_def = simplify(valor_sup - valor_inf)
-            
-            # Agregar pasos de la integral definida
-            pasos_definida = [{
-                'titulo': 'Teorema Fundamental del Cálculo',
-                'formula': f'F({limite_sup}) - F({limite_inf})',
-                'formula_latex': f'F\\left({latex(limite_sup)}\\right) - F\\left({latex(limite_inf)}\\right)',
-                'explicacion': 'Evaluamos la antiderivada en los límites de integración.',
-                'tipo': 'metodo'
-            }, {
-                'titulo': 'Evaluación en límite superior',
-                'formula': f'F({limite_sup}) = {valor_sup}',
-                'formula_latex': f'F\\left({latex(limite_sup)}\\right) = {latex(valor_sup)}',
-                'explicacion': f'Sustituimos x = {limite_sup} en la antiderivada.',
-                'tipo': 'aplicacion'
-            }, {
-                'titulo': 'Evaluación en límite inferior',
-                'formula': f'F({limite_inf}) = {valor_inf}',
-                'formula_latex': f'F\\left({latex(limite_inf)}\\right) = {latex(valor_inf)}',
-                'explicacion': f'Sustituimos x = {limite_inf} en la antiderivada.',
-                'tipo': 'aplicacion'
-            }, {
-                'titulo': 'RESULTADO NUMÉRICO',
-                'formula': f'{resultado_def}',
-                'formula_latex': f'{latex(resultado_def)}',
-                'explicacion': 'Resultado de la integral definida.',
-                'tipo': 'resultado'
-            }]
-            
-            # Agregar estos pasos a la visualización
-            for paso in pasos_definida:
-                self.pasos_actuales.append(paso)
-            
-            # Actualizar visualización
-            self.step_renderer.mostrar_pasos_detallados(
-                self.pasos_actuales, None, 
-                self.ui_manager.get_funcion_str(), 
-                self.ui_manager.get_variable_str()
-            )
-                
-        except Exception as e:
-            messagebox.showerror("Error", f"Error en integral definida: {str(e)}")
-    
-    def graficar_funcion(self):
-        """Crear gráfico de la función y su integral"""
-        funcion_str = self.ui_manager.get_funcion_str()
-        self.graph_manager.crear_grafico(funcion_str, self.pasos_actuales)
-    
-    def exportar_solucion(self):
-        """Exportar solución completa a PDF (gráficas + pasos)."""
-        if not self.pasos_actuales:
-            messagebox.showwarning("Advertencia", "Primero resuelve una integral")
-            return
-        try:
-            filename = filedialog.asksaveasfilename(
-                defaultextension=".pdf",
-                filetypes=[("Archivo PDF", "*.pdf")],
-                title="Guardar PDF"
-            )
-            if not filename:
-                return
-
-            funcion_str = self.ui_manager.get_funcion_str()
-            x = Symbol(self.ui_manager.get_variable_str())
-            funcion = parse_expr(funcion_str, transformations='all')
-
-            with PdfPages(filename) as pdf:
-                # Página de gráficas
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(8, 6))
-                fig.patch.set_facecolor('white')
-                fig.subplots_adjust(hspace=0.35, top=0.95, bottom=0.08, left=0.1, right=0.98)
-                x_vals = np.linspace(-5, 5, 1000)
-                func_lamb = lambdify(x, funcion, 'numpy')
-                with np.errstate(all='ignore'):
-                    y_vals = func_lamb(x_vals)
-                    y_vals = np.where(np.isfinite(y_vals), y_vals, np.nan)
-                ax1.plot(x_vals, y_vals, color='#2563eb', linewidth=2, label=f'f(x) = {funcion}')
-                ax1.axhline(0, color='#9ca3af', linewidth=0.8)
-                ax1.axvline(0, color='#9ca3af', linewidth=0.8)
-                ax1.grid(True, alpha=0.3)
-                ax1.set_title('Función Original')
-                ax1.legend()
-
-                try:
-                    F = simplify(integrate(funcion, x))
-                    F_lamb = lambdify(x, F, 'numpy')
-                    with np.errstate(all='ignore'):
-                        yI = F_lamb(x_vals)
-                        yI = np.where(np.isfinite(yI), yI, np.nan)
-                    ax2.plot(x_vals, yI, color='#16a34a', linewidth=2, label=f'∫f(x)dx = {F}')
-                    ax2.axhline(0, color='#9ca3af', linewidth=0.8)
-                    ax2.axvline(0, color='#9ca3af', linewidth=0.8)
-                    ax2.grid(True, alpha=0.3)
-                    ax2.set_title('Función Integral')
-                    ax2.legend()
-                except Exception:
-                    ax2.text(0.5, 0.5, 'Integral no graficable', transform=ax2.transAxes,
-                             ha='center', va='center')
-                pdf.savefig(fig)
-                plt.close(fig)
-
-                # Páginas de pasos
-                def nueva_pagina():
-                    fig_steps = plt.figure(figsize=(8.27, 11.69))
-                    fig_steps.patch.set_facecolor('white')
-                    ax = fig_steps.add_axes([0.06, 0.04, 0.88, 0.92])
-                    ax.axis('off')
-                    return fig_steps, ax
-
-                fig_s, ax_s = nueva_pagina()
-                y = 0.96
-                header = f"Solución Paso a Paso — {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-                ax_s.text(0.5, y, header, ha='center', va='top', fontsize=14, weight='bold')
-                y -= 0.05
-                tipo = self.ui_manager.get_tipo_integral()
-                ax_s.text(0.06, y, f"Función: {funcion_str}  |  Tipo: {tipo}", fontsize=10)
-                y -= 0.03
-
-                for i, paso in enumerate(self.pasos_actuales, 1):
-                    if y < 0.08:
-                        pdf.savefig(fig_s)
-                        plt.close(fig_s)
-                        fig_s, ax_s = nueva_pagina()
-                        y = 0.96
-                    ax_s.text(0.06, y, f"Paso {i}: {paso.get('titulo','')}", fontsize=11, weight='bold')
-                    y -= 0.03
-                    formula_ltx = paso.get('formula_latex')
-                    formula_txt = paso.get('formula')
-                    if formula_ltx:
-                        ax_s.text(0.08, y, f"${formula_ltx}$", fontsize=11)
-                        y -= 0.035
-                    elif formula_txt:
-                        ax_s.text(0.08, y, str(formula_txt), fontsize=10, color='#374151')
-                        y -= 0.03
-                    explic = paso.get('explicacion')
-                    if explic:
-                        ax_s.text(0.08, y, explic, fontsize=9)
-                        y -= 0.03
-                    y -= 0.01
-
-                pdf.savefig(fig_s)
-                plt.close(fig_s)
-
-            messagebox.showinfo("Éxito", f"PDF guardado en: {filename}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Error al exportar PDF: {str(e)}")
-    
-    def limpiar_todo(self):
-        """Limpiar toda la interfaz"""
-        # Limpiar campos de entrada
-        self.ui_manager.funcion_var.set("")
-        self.ui_manager.variable_var.set("x")
-        self.ui_manager.limite_inf_var.set("0")
-        self.ui_manager.limite_sup_var.set("1")
-        self.ui_manager.tipo_integral.set("indefinida")
-        
-        # Limpiar pasos
-        self.step_renderer.limpiar_pasos()
-        self.pasos_actuales = []
-        
-        # Actualizar preview
-        self.ui_manager.actualizar_preview()
-        
-        # Cerrar gráfico si existe
-        self.graph_manager.cerrar_grafico()
-        
-        # Ocultar límites
-        self.ui_manager.limites_frame.pack_forget()
-
-def main():
-    """Función principal para ejecutar la aplicación"""
-    root = tk.Tk()
-    app = MainApp(root)
-    root.mainloop()
-
-if __name__ == "__main__":
-    main()
+"""
+Clase principal que coordina todas las funcionalidades de la aplicación
+"""
+import os
+import threading
+import tkinter as tk
+from tkinter import messagebox, filedialog
+
+from math_solver import MathSolver
+from ui_manager import UIManager
+from step_renderer import StepRenderer
+from graph_manager import GraphManager
+from solution_store import SolutionStore
+from text_exporter import TextExporter
+from metrics import REGISTRO
+from memory_governor import MemoryGovernor
+import solution_serializer
+
+class MainApp:
+    """Clase principal que coordina todas las funcionalidades de la aplicación"""
+    
+    INTERVALO_METRICAS = 15000  # ms entre volcados del archivo de métricas
+    INTERVALO_MEMORIA = 5000    # ms entre revisiones de los presupuestos de memoria
+    
+    def __init__(self, root):
+        self.root = root
+        
+        # Inicializar componentes
+        self.ui_manager = UIManager(root)
+        self.math_solver = MathSolver()
+        
+        # Crear panel de resultados usando StepRenderer
+        main_container = None
+        for child in root.winfo_children():
+            if isinstance(child, tk.Frame) and child.cget('bg') == '#0d1117':
+                main_container = child
+                break
+        
+        if main_container:
+            self.step_renderer = StepRenderer(root)
+            result_frame = self.step_renderer.crear_panel_resultados(main_container)
+        
+        # Crear GraphManager
+        self.graph_manager = GraphManager(
+            self.ui_manager.graph_frame, 
+            self.ui_manager.btn_cerrar_grafico
+        )
+        
+        # Establecer referencias cruzadas
+        self.ui_manager.set_step_renderer(self.step_renderer)
+        self.ui_manager.set_graph_manager(self.graph_manager)
+        self.ui_manager.set_main_app(self)
+        
+        # Variables de estado
+        self.pasos_actuales = []
+        self.solution_store = SolutionStore()  # artefactos compartidos por solución
+        self.artefacto_actual = None
+        self._exportacion = None  # Event de cancelación de la exportación en curso
+        self._ventana_metricas = None
+        
+        # Presupuestos de memoria para las cachés que crecen durante la sesión
+        self.memoria = MemoryGovernor()
+        self.memoria.vigilar(self.step_renderer.latex_cache, self.solution_store)
+        self.step_renderer.memoria = self.memoria
+        self.root.after(self.INTERVALO_MEMORIA, self._revisar_memoria)
+        
+        # Con INTEGRALES_METRICAS=archivo.prom, las métricas se vuelcan periódicamente
+        self.archivo_metricas = os.environ.get('INTEGRALES_METRICAS')
+        if self.archivo_metricas:
+            self.root.after(self.INTERVALO_METRICAS, self._volcar_metricas)
+    
+    def resolver_integral(self):
+        """Resolver la integral paso a paso"""
+        try:
+            funcion_str = self.ui_manager.get_funcion_str()
+            if not funcion_str:
+                messagebox.showerror("Error", "Ingresa una función para integrar")
+                return
+            
+            # Parsear la función (o reutilizar el artefacto de una solución previa)
+            variable_str = self.ui_manager.get_variable_str()
+            try:
+                artefacto = self.solution_store.obtener(funcion_str, variable_str)
+            except:
+                messagebox.showerror("Error", f"No se puede interpretar la función: {funcion_str}")
+                return
+            
+            # Resolver paso a paso usando MathSolver (solo la primera vez)
+            pasos, resultado = artefacto.resolver(self.math_solver)
+            artefacto.tipo_integral = self.ui_manager.get_tipo_integral()
+            self.pasos_actuales = list(pasos)
+            self.artefacto_actual = artefacto
+            self.memoria.revisar(actual=artefacto)
+            
+            # Mostrar resultados usando StepRenderer
+            self.step_renderer.mostrar_pasos_detallados(
+                self.pasos_actuales, resultado, funcion_str, variable_str, artefacto
+            )
+            
+            # Si es definida, calcular valor numérico
+            if self.ui_manager.get_tipo_integral() == "definida" and resultado:
+                self.calcular_integral_definida(artefacto)
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en el cálculo: {str(e)}")
+    
+    def calcular_integral_definida(self, artefacto):
+        """Calcular integral definida con pasos"""
+        try:
+            limite_inf_str, limite_sup_str = self.ui_manager.get_limites()
+            pasos_definida, _ = artefacto.pasos_definida(limite_inf_str, limite_sup_str)
+            
+            # Agregar estos pasos a la visualización
+            for paso in pasos_definida:
+                self.pasos_actuales.append(paso)
+            
+            # Actualizar visualización: solo se crean las tarjetas nuevas
+            self.step_renderer.quitar_resultado()
+            self.step_renderer.agregar_pasos(pasos_definida)
+                
+        except Exception as e:
+            messagebox.showerror("Error", f"Error en integral definida: {str(e)}")
+    
+    def graficar_funcion(self):
+        """Crear gráfico de la función y su integral"""
+        funcion_str = self.ui_manager.get_funcion_str()
+        if not funcion_str:
+            messagebox.showwarning("Advertencia", "Ingresa una función para graficar")
+            return
+        try:
+            artefacto = self.solution_store.obtener(funcion_str, self.ui_manager.get_variable_str())
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al crear el gráfico: {str(e)}")
+            return
+        self.graph_manager.crear_grafico(artefacto)
+    
+    def exportar_solucion(self):
+        """Exportar la solución mostrada (no lo que haya ahora en la entrada): PDF
+        (gráficas + pasos) en segundo plano, o HTML / .tex."""
+        artefacto = self.artefacto_actual
+        if artefacto is None or not self.pasos_actuales:
+            messagebox.showwarning("Advertencia", "Primero resuelve una integral")
+            return
+        if self._exportacion is not None:
+            messagebox.showwarning("Advertencia", "Ya hay una exportación en curso")
+            return
+        try:
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".pdf",
+                filetypes=[("Archivo PDF", "*.pdf"), ("Página HTML", "*.html"),
+                           ("Fuente LaTeX", "*.tex"), ("Solución JSONL", "*.jsonl"),
+                           ("Solución binaria", "*.pkl")],
+                title="Guardar solución"
+            )
+            if not filename:
+                return
+
+            tipo = artefacto.tipo_integral  # el de los pasos mostrados
+
+            # HTML / .tex: sin matplotlib, se escribe al instante paso a paso
+            if filename.lower().endswith(('.html', '.htm', '.tex')):
+                resultado_ltx = None
+                if tipo == "indefinida" and artefacto.resultado is not None:
+                    resultado_ltx = artefacto.latex_resultado()
+                TextExporter(self.pasos_actuales, artefacto.funcion_str, artefacto.variable_str,
+                             tipo, resultado_ltx).exportar(filename)
+                messagebox.showinfo("Éxito", f"Solución guardada en: {filename}")
+                return
+
+            # Solución serializada: se puede volver a abrir sin re-resolver
+            if filename.lower().endswith(('.jsonl', '.pkl')):
+                solution_serializer.guardar([artefacto], filename)
+                messagebox.showinfo("Éxito", f"Solución guardada en: {filename}")
+                return
+
+            from pdf_exporter import PDFExporter  # matplotlib solo al exportar
+            exporter = PDFExporter(artefacto, self.pasos_actuales, tipo)
+        except Exception as e:
+            messagebox.showerror("Error", f"Error al exportar: {str(e)}")
+            return
+
+        self._exportar_en_segundo_plano("Exportando PDF", exporter.exportar, filename, "Página")
+    
+    def abrir_solucion(self):
+        """Cargar soluciones guardadas (.jsonl / .pkl) y mostrar la última sin re-resolver"""
+        filename = filedialog.askopenfilename(
+            filetypes=[("Soluciones", "*.jsonl *.pkl"), ("Solución JSONL", "*.jsonl"),
+                       ("Solución binaria", "*.pkl")],
+            title="Abrir solución"
+        )
+        if not filename:
+            return
+        try:
+            artefactos = solution_serializer.cargar(filename)
+        except Exception as e:
+            messagebox.showerror("Error", f"No se pudo abrir la solución: {str(e)}")
+            return
+        if not artefactos:
+            messagebox.showwarning("Advertencia", "El archivo no contiene soluciones")
+            return
+
+        for artefacto in artefactos:
+            self.solution_store.registrar(artefacto)
+        artefacto = artefactos[-1]
+        self.ui_manager.funcion_var.set(artefacto.funcion_str)
+        self.ui_manager.variable_var.set(artefacto.variable_str)
+        self.ui_manager.tipo_integral.set("indefinida")
+        self.ui_manager.limites_frame.pack_forget()
+        self.ui_manager.actualizar_preview()
+
+        self.pasos_actuales = list(artefacto.pasos or [])
+        self.artefacto_actual = artefacto
+        self.step_renderer.mostrar_pasos_detallados(
+            self.pasos_actuales, artefacto.resultado, artefacto.funcion_str,
+            artefacto.variable_str, artefacto
+        )
+    
+    def exportar_cuaderno(self):
+        """Exportar todas las integrales resueltas en la sesión a un cuaderno PDF con índice."""
+        from pdf_exporter import WorkbookExporter, describir_solucion
+        descripciones = [describir_solucion(a) for a in self.solution_store.resueltas()]
+        if not descripciones:
+            messagebox.showwarning("Advertencia", "Primero resuelve una integral")
+            return
+        if self._exportacion is not None:
+            messagebox.showwarning("Advertencia", "Ya hay una exportación en curso")
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".pdf",
+            filetypes=[("Archivo PDF", "*.pdf")],
+            title="Guardar cuaderno PDF"
+        )
+        if not filename:
+            return
+        exporter = WorkbookExporter(descripciones)
+        self._exportar_en_segundo_plano("Exportando cuaderno", exporter.exportar, filename, "Ejercicio")
+    
+    def _exportar_en_segundo_plano(self, titulo, exportar, filename, unidad):
+        """Ejecutar `exportar(filename, progreso, cancelado)` en un hilo con barra de progreso"""
+        # El hilo solo escribe en `estado`; el hilo de Tk lo consulta con after()
+        cancelado = threading.Event()
+        estado = {'hechas': 0, 'total': 0, 'fin': False, 'error': None}
+
+        def progreso(hechas, total):
+            estado['hechas'], estado['total'] = hechas, total
+
+        def trabajo():
+            try:
+                exportar(filename, progreso, cancelado)
+            except Exception as e:
+                estado['error'] = e
+            finally:
+                estado['fin'] = True
+
+        dialogo, barra, etiqueta = self.ui_manager.crear_dialogo_progreso(titulo, cancelado.set)
+        self._exportacion = cancelado
+        threading.Thread(target=trabajo, daemon=True).start()
+
+        def revisar():
+            from pdf_exporter import ExportacionCancelada
+            if estado['total']:
+                barra.configure(maximum=estado['total'], value=estado['hechas'])
+                etiqueta.configure(text=f"{unidad} {estado['hechas']} de {estado['total']}")
+            if not estado['fin']:
+                self.root.after(100, revisar)
+                return
+            dialogo.destroy()
+            self._exportacion = None
+            if isinstance(estado['error'], ExportacionCancelada):
+                return
+            if estado['error'] is not None:
+                messagebox.showerror("Error", f"Error al exportar PDF: {str(estado['error'])}")
+            else:
+                messagebox.showinfo("Éxito", f"PDF guardado en: {filename}")
+
+        revisar()
+    
+    def mostrar_metricas(self):
+        """Panel de métricas (latencias por rama, cachés, fallos, rasterizado, exportación)"""
+        if self._ventana_metricas is not None and self._ventana_metricas.winfo_exists():
+            self._ventana_metricas.lift()
+            return
+
+        def guardar():
+            filename = filedialog.asksaveasfilename(
+                defaultextension=".prom", filetypes=[("Métricas de Prometheus", "*.prom")],
+                title="Guardar métricas", parent=ventana)
+            if filename:
+                REGISTRO.escribir(filename)
+
+        ventana, texto = self.ui_manager.crear_ventana_metricas(
+            guardar, self.memoria.alternar_tracemalloc)
+        self._ventana_metricas = ventana
+
+        def actualizar():
+            if not ventana.winfo_exists():
+                return
+            cache = self.step_renderer.latex_cache.estadisticas()
+            lineas = REGISTRO.resumen() or ["Aún no hay mediciones"]
+            lineas += ["", f"soluciones en memoria: {len(self.solution_store)}",
+                       f"imágenes en caché: {cache['entradas']} ({cache['bytes'] / 1e6:.1f} MB)",
+                       "", "memoria (uso / presupuesto):"] + self.memoria.resumen()
+            texto.configure(state='normal')
+            texto.delete('1.0', 'end')
+            texto.insert('1.0', '\n'.join(lineas))
+            texto.configure(state='disabled')
+            ventana.after(1000, actualizar)
+
+        actualizar()
+    
+    def _revisar_memoria(self):
+        """Aplicar los presupuestos de memoria periódicamente, sin tocar la solución mostrada"""
+        self.memoria.revisar(actual=self.artefacto_actual)
+        self.root.after(self.INTERVALO_MEMORIA, self._revisar_memoria)
+    
+    def _volcar_metricas(self):
+        """Reescribir el archivo de métricas (lo lee, p. ej., node_exporter)"""
+        try:
+            REGISTRO.escribir(self.archivo_metricas)
+        except OSError as e:
+            print(f"No se pudieron guardar las métricas: {e}")
+        self.root.after(self.INTERVALO_METRICAS, self._volcar_metricas)
+    
+    def cerrar(self):
+        """Liberar recursos al salir y dejar el último volcado de métricas"""
+        self.step_renderer.cerrar()
+        if self.archivo_metricas:
+            try:
+                REGISTRO.escribir(self.archivo_metricas)
+            except OSError:
+                pass
+    
+    def limpiar_todo(self):
+        """Limpiar toda la interfaz"""
+        # Limpiar campos de entrada
+        self.ui_manager.funcion_var.set("")
+        self.ui_manager.variable_var.set("x")
+        self.ui_manager.limite_inf_var.set("0")
+        self.ui_manager.limite_sup_var.set("1")
+        self.ui_manager.tipo_integral.set("indefinida")
+        
+        # Limpiar pasos
+        self.step_renderer.limpiar_pasos()
+        self.pasos_actuales = []
+        self.artefacto_actual = None
+        
+        # Actualizar preview
+        self.ui_manager.actualizar_preview()
+        
+        # Cerrar gráfico si existe
+        self.graph_manager.cerrar_grafico()
+        
+        # Ocultar límites
+        self.ui_manager.limites_frame.pack_forget()
+
+def main():
+    """Función principal para ejecutar la aplicación"""
+    root = tk.Tk()
+    app = MainApp(root)
+    root.mainloop()
+    app.cerrar()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Rasterizador de fórmulas LaTeX directo desde el parser de mathtext
+(sin figuras, sin pyplot y sin ida y vuelta por PNG)
+"""
+import threading
+
+import numpy as np
+from matplotlib.colors import to_rgba
+from matplotlib.font_manager import FontProperties
+from matplotlib.mathtext import MathTextParser
+
+# El parser de mathtext no es seguro entre hilos: uno por hilo
+_local = threading.local()
+
+
+def _parser():
+    """Devolver el parser mathtext del hilo actual"""
+    parser = getattr(_local, 'parser', None)
+    if parser is None:
+        parser = MathTextParser('agg')
+        _local.parser = parser
+    return parser
+
+
+def asegurar_delimitadores(latex_str):
+    """Envolver la fórmula en $...$ si aún no lo está"""
+    latex_str = latex_str.strip()
+    if not (latex_str.startswith("$") and latex_str.endswith("$")):
+        latex_str = f"${latex_str}$"
+    return latex_str
+
+
+def rasterizar_mascara(latex_str, dpi=150, fontsize=14, pad=0.03):
+    """Rasterizar la fórmula a una máscara alfa (alto x ancho, uint8) con margen"""
+    prop = FontProperties(size=fontsize)
+    resultado = _parser().parse(asegurar_delimitadores(latex_str), dpi=dpi, prop=prop)
+    mascara = np.asarray(resultado.image, dtype=np.uint8)
+    margen = int(round(pad * dpi))
+    if margen:
+        mascara = np.pad(mascara, margen)
+    return mascara
+
+
+def colorear_mascara(mascara, color='white'):
+    """Convertir una máscara alfa en un buffer RGBA del color indicado"""
+    r, g, b, a = (int(round(c * 255)) for c in to_rgba(color))
+    alto, ancho = mascara.shape
+    rgba = np.empty((alto, ancho, 4), dtype=np.uint8)
+    rgba[..., 0] = r
+    rgba[..., 1] = g
+    rgba[..., 2] = b
+    rgba[..., 3] = mascara if a == 255 else (mascara.astype(np.uint16) * a // 255)
+    return rgba
+
+
+def rasterizar_rgba(latex_str, dpi=150, fontsize=14, color='white', pad=0.03):
+    """Rasterizar la fórmula y devolver (ancho, alto, bytes RGBA)"""
+    rgba = colorear_mascara(rasterizar_mascara(latex_str, dpi, fontsize, pad), color)
+    alto, ancho = rgba.shape[:2]
+    return ancho, alto, rgba.tobytes()
+
+
+def rgba_a_photoimage(ancho, alto, datos):
+    """Crear un PhotoImage de Tkinter a partir de un buffer RGBA (solo hilo de Tk)"""
+    from PIL import Image, ImageTk
+    img = Image.frombuffer('RGBA', (ancho, alto), datos, 'raw', 'RGBA', 0, 1)
+    return ImageTk.PhotoImage(img)
+
+
+def rgba_a_png(ancho, alto, datos):
+    """Codificar un buffer RGBA como PNG (bytes), p. ej. para incrustarlo en HTML"""
+    import io
+    from PIL import Image
+    salida = io.BytesIO()
+    Image.frombuffer('RGBA', (ancho, alto), datos, 'raw', 'RGBA', 0, 1).save(salida, 'PNG')
+    return salida.getvalue()
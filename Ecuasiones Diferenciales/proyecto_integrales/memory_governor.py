@@ -0,0 +1,222 @@
+"""
+Presupuestos de memoria para sesiones largas de la aplicación
+
+Vigila las cachés que crecen con cada integral (imágenes LaTeX, imágenes y
+muestras guardadas en los artefactos y cachés globales de SymPy) y libera lo
+regenerable cuando alguna supera su presupuesto. El presupuesto general es la
+memoria residente (RSS) del proceso: como casi nunca baja después de liberar,
+se reacciona una vez por cada vez que lo supera y no se vuelve a reaccionar
+hasta que baje de FRACCION_REARME del presupuesto. tracemalloc
+(que hace varias veces más lenta cada resolución de SymPy) solo se enciende a
+pedido, desde el panel de métricas o con INTEGRALES_TRACEMALLOC=1, para ver
+cuánta de esa memoria es de objetos de Python.
+
+Los presupuestos se pueden cambiar con INTEGRALES_PRESUPUESTOS, p. ej.
+    INTEGRALES_PRESUPUESTOS="rss_mb=600,imagenes_mb=16,sympy_entradas=10000"
+"""
+import os
+import sys
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from metrics import REGISTRO
+
+LIBERACIONES = REGISTRO.contador(
+    'integrales_memoria_liberaciones_total',
+    'Veces que el gobernador de memoria liberó una caché por superar su presupuesto', ('cache',))
+
+MB = 1024 * 1024
+
+
+class MemoryGovernor:
+    """Comprueba los presupuestos y libera cachés; pensado para llamarse desde el hilo de Tk"""
+
+    PRESUPUESTOS = {
+        'rss_mb': 1024,            # memoria residente del proceso
+        'imagenes_mb': 32,         # caché LRU de PhotoImage del StepRenderer
+        'artefactos_mb': 64,       # imágenes RGBA y muestras guardadas en los artefactos
+        'sympy_entradas': 20000,   # entradas sumadas de las cachés de @cacheit
+    }
+    FRACCION_REARME = 0.9  # tras liberar por RSS, no se repite hasta bajar de este nivel
+
+    VARIABLE_TRACEMALLOC = 'INTEGRALES_TRACEMALLOC'
+
+    def __init__(self, presupuestos=None, tracemalloc_activo=None):
+        self.presupuestos = dict(self.PRESUPUESTOS)
+        self.presupuestos.update(self.presupuestos_del_entorno())
+        self.presupuestos.update(presupuestos or {})
+        self.cache_imagenes = None
+        self.solution_store = None
+        self.ultimas_acciones = []
+        self._rss_armado = True    # False tras liberar por RSS, hasta bajar de FRACCION_REARME
+        self._pico_revisado = 0.0  # sin RSS actual (solo el pico), último pico ya atendido
+        if tracemalloc_activo is None:
+            tracemalloc_activo = os.environ.get(self.VARIABLE_TRACEMALLOC, '') not in ('', '0')
+        if tracemalloc_activo:
+            self.activar_tracemalloc()
+
+    @classmethod
+    def presupuestos_del_entorno(cls):
+        """Presupuestos de INTEGRALES_PRESUPUESTOS ("clave=valor,..."); se ignoran claves desconocidas"""
+        presupuestos = {}
+        for par in os.environ.get('INTEGRALES_PRESUPUESTOS', '').split(','):
+            clave, _, valor = par.partition('=')
+            if clave.strip() in cls.PRESUPUESTOS and valor.strip():
+                presupuestos[clave.strip()] = float(valor)
+        return presupuestos
+
+    def vigilar(self, cache_imagenes=None, solution_store=None):
+        """Registrar las cachés a controlar; la de imágenes adopta su presupuesto"""
+        if cache_imagenes is not None:
+            self.cache_imagenes = cache_imagenes
+            cache_imagenes.ajustar_limites(max_bytes=int(self.presupuestos['imagenes_mb'] * MB))
+        if solution_store is not None:
+            self.solution_store = solution_store
+
+    # === tracemalloc a pedido ===
+
+    @staticmethod
+    def activar_tracemalloc():
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(1)  # un solo marco: suficiente para el total
+
+    @staticmethod
+    def desactivar_tracemalloc():
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def alternar_tracemalloc(self):
+        """Encender o apagar la medición de Python; devuelve si quedó encendida"""
+        if tracemalloc.is_tracing():
+            self.desactivar_tracemalloc()
+        else:
+            self.activar_tracemalloc()
+        return tracemalloc.is_tracing()
+
+    # === Mediciones ===
+
+    @staticmethod
+    def rss_mb():
+        """(actual, pico) de la memoria residente en MB; actual es None si el
+        sistema solo informa el pico (getrusage) y ambos None sin `resource`"""
+        actual = None
+        try:
+            with open('/proc/self/statm') as f:
+                actual = int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / MB
+        except (OSError, ValueError, IndexError, AttributeError):
+            pass
+        if resource is None:
+            return actual, actual
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        pico = pico / MB if sys.platform == 'darwin' else pico / 1024  # bytes en macOS, KiB en Linux
+        return actual, max(pico, actual or 0.0)
+
+    @staticmethod
+    def entradas_sympy():
+        """Entradas actuales en todas las cachés @cacheit de SymPy (0 si no está cargado)"""
+        cache = sys.modules.get('sympy.core.cache')
+        if cache is None:
+            return 0
+        return sum(f.cache_info().currsize for f in cache.CACHE)
+
+    def uso(self):
+        """Uso actual de cada recurso, en las unidades de su presupuesto"""
+        uso = {'sympy_entradas': self.entradas_sympy()}
+        actual, pico = self.rss_mb()
+        if pico is not None:
+            uso['rss_mb'] = actual if actual is not None else pico
+            uso['rss_pico_mb'] = pico
+        if tracemalloc.is_tracing():
+            actual, pico = tracemalloc.get_traced_memory()
+            uso['python_mb'] = actual / MB
+            uso['python_pico_mb'] = pico / MB
+        if self.cache_imagenes is not None:
+            uso['imagenes_mb'] = self.cache_imagenes.estadisticas()['bytes'] / MB
+        if self.solution_store is not None:
+            uso['artefactos_mb'] = self.solution_store.bytes_en_cache() / MB
+        return uso
+
+    def resumen(self):
+        """Líneas "recurso  uso / presupuesto" para los paneles de diagnóstico"""
+        uso = self.uso()
+        lineas = []
+        for clave, presupuesto in self.presupuestos.items():
+            if clave not in uso:
+                continue
+            unidad = ' MB' if clave.endswith('_mb') else ''
+            valor = f"{uso[clave]:9.1f}" if unidad else f"{uso[clave]:9.0f}"
+            lineas.append(f"{clave[:-3] if unidad else clave:<15}{valor}{unidad} / {presupuesto:g}{unidad}")
+        if 'rss_pico_mb' in uso:
+            lineas.append(f"{'rss (pico)':<15}{uso['rss_pico_mb']:9.1f} MB")
+        if 'python_mb' in uso:
+            lineas.append(f"{'python':<15}{uso['python_mb']:9.1f} MB  (pico {uso['python_pico_mb']:.1f} MB)")
+        else:
+            lineas.append("python: tracemalloc apagado")
+        return lineas
+
+    def _rss_excedido(self, uso):
+        """Si hay que liberar por la memoria residente: una vez cada vez que supera
+        el presupuesto (el RSS rara vez baja al liberar; repetirlo en cada revisión
+        solo vaciaría las cachés una y otra vez). Se vuelve a armar al bajar de
+        FRACCION_REARME del presupuesto; con solo el pico (que nunca baja), una vez
+        por cada nuevo máximo."""
+        if 'rss_mb' not in uso:
+            return False
+        presupuesto = self.presupuestos['rss_mb']
+        if self.rss_mb()[0] is None:
+            if uso['rss_mb'] <= presupuesto or uso['rss_pico_mb'] <= self._pico_revisado:
+                return False
+            self._pico_revisado = uso['rss_pico_mb']
+            return True
+        if uso['rss_mb'] < presupuesto * self.FRACCION_REARME:
+            self._rss_armado = True
+        if uso['rss_mb'] <= presupuesto or not self._rss_armado:
+            return False
+        self._rss_armado = False
+        return True
+
+    # === Aplicar presupuestos ===
+
+    def revisar(self, actual=None):
+        """Liberar lo que exceda su presupuesto; `actual` (el artefacto mostrado) se
+        respeta mientras haya otros que liberar. Devuelve las acciones tomadas."""
+        acciones = []
+        uso = self.uso()
+        presupuestos = self.presupuestos
+        excedido_rss = self._rss_excedido(uso)
+
+        if self.solution_store is not None and (
+                excedido_rss or uso['artefactos_mb'] > presupuestos['artefactos_mb']):
+            limite = 0 if excedido_rss else presupuestos['artefactos_mb'] * MB
+            total = uso['artefactos_mb'] * MB
+            en_uso = getattr(actual, 'compartido', None)  # lo que usa también el artefacto mostrado
+            for artefacto in self.solution_store.artefactos():  # los menos usados primero
+                if total <= limite:
+                    break
+                if artefacto is not actual and artefacto.compartido is not en_uso:
+                    total -= artefacto.liberar_cache()
+            acciones.append('artefactos')
+
+        if self.cache_imagenes is not None and excedido_rss:
+            # La mitad menos usada; las fórmulas visibles se vuelven a pedir al pool
+            estadisticas = self.cache_imagenes.estadisticas()
+            limite = self.cache_imagenes.max_bytes
+            self.cache_imagenes.ajustar_limites(max_bytes=estadisticas['bytes'] // 2)
+            self.cache_imagenes.ajustar_limites(max_bytes=limite)
+            acciones.append('imagenes')
+
+        if excedido_rss or uso['sympy_entradas'] > presupuestos['sympy_entradas']:
+            from sympy.core.cache import clear_cache
+            clear_cache()
+            acciones.append('sympy')
+
+        for accion in acciones:
+            LIBERACIONES.inc(cache=accion)
+        if acciones and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self.ultimas_acciones = acciones
+        return acciones
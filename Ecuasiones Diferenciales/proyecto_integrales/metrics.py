@@ -0,0 +1,233 @@
+"""
+Métricas de la aplicación (contadores e histogramas) en el formato de texto de Prometheus
+
+Cada proceso tiene su REGISTRO. Los procesos del SolverPool envían con cada
+resultado lo acumulado desde el envío anterior (`extraer_delta`) y el pool lo
+suma al registro del proceso principal (`fusionar`), así que /metrics del
+servidor y el panel de la aplicación ven el total.
+"""
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+BUCKETS_RASTERIZADO = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _formatear_etiquetas(nombres, valores, extra=None):
+    pares = list(zip(nombres, valores))
+    if extra:
+        pares.append(extra)
+    if not pares:
+        return ''
+    texto = ','.join('{}="{}"'.format(n, str(v).replace('\\', r'\\').replace('"', r'\"'))
+                     for n, v in pares)
+    return '{' + texto + '}'
+
+
+class Counter:
+    """Contador monótono, con una serie por combinación de etiquetas"""
+
+    tipo = 'counter'
+
+    def __init__(self, nombre, ayuda, etiquetas, cerrojo):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self._valores = {}  # valores de las etiquetas -> total
+        self._cerrojo = cerrojo
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(n, '')) for n in self.etiquetas)
+
+    def inc(self, valor=1, **etiquetas):
+        """Sumar `valor` a la serie de esas etiquetas"""
+        clave = self._clave(etiquetas)
+        with self._cerrojo:
+            self._valores[clave] = self._valores.get(clave, 0) + valor
+
+    def valor(self, **etiquetas):
+        """Total actual de una serie (0 si nunca se incrementó)"""
+        return self._valores.get(self._clave(etiquetas), 0)
+
+    def _lineas(self):
+        for clave, valor in sorted(self._valores.items()):
+            yield f"{self.nombre}{_formatear_etiquetas(self.etiquetas, clave)} {valor:g}"
+
+    def _sumar(self, clave, valor):
+        self._valores[clave] = self._valores.get(clave, 0) + valor
+
+
+class Histogram:
+    """Histograma acumulativo con buckets fijos, suma y número de observaciones"""
+
+    tipo = 'histogram'
+
+    def __init__(self, nombre, ayuda, etiquetas, cerrojo, buckets=BUCKETS_SEGUNDOS):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = tuple(etiquetas)
+        self.buckets = tuple(buckets)
+        self._valores = {}  # valores de las etiquetas -> [conteos por bucket (+Inf al final), suma]
+        self._cerrojo = cerrojo
+
+    def _clave(self, etiquetas):
+        return tuple(str(etiquetas.get(n, '')) for n in self.etiquetas)
+
+    def observar(self, valor, **etiquetas):
+        """Registrar una observación (segundos, por convención)"""
+        clave = self._clave(etiquetas)
+        indice = bisect.bisect_left(self.buckets, valor)
+        with self._cerrojo:
+            serie = self._valores.get(clave)
+            if serie is None:
+                serie = self._valores[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+            serie[0][indice] += 1
+            serie[1] += valor
+
+    @contextmanager
+    def cronometrar(self, **etiquetas):
+        """Observar la duración del bloque si termina sin excepción"""
+        inicio = time.perf_counter()
+        yield
+        self.observar(time.perf_counter() - inicio, **etiquetas)
+
+    def resumen(self, **etiquetas):
+        """(observaciones, media, p50, p95) de una serie; los cuantiles se interpolan
+        dentro del bucket, como histogram_quantile de Prometheus"""
+        serie = self._valores.get(self._clave(etiquetas))
+        return self._resumen_serie(serie)
+
+    def _resumen_serie(self, serie):
+        if serie is None or not sum(serie[0]):
+            return 0, None, None, None
+        conteos, suma = serie
+        total = sum(conteos)
+        return total, suma / total, self._cuantil(conteos, total, 0.5), self._cuantil(conteos, total, 0.95)
+
+    def _cuantil(self, conteos, total, q):
+        objetivo = q * total
+        acumulado = 0
+        for i, n in enumerate(conteos):
+            if acumulado + n >= objetivo and n:
+                if i == len(self.buckets):
+                    return self.buckets[-1]  # más allá del último límite: solo se sabe la cota
+                inferior = self.buckets[i - 1] if i else 0.0
+                return inferior + (self.buckets[i] - inferior) * (objetivo - acumulado) / n
+            acumulado += n
+        return self.buckets[-1]
+
+    def _lineas(self):
+        for clave, (conteos, suma) in sorted(self._valores.items()):
+            acumulado = 0
+            for limite, n in zip(self.buckets + (float('inf'),), conteos):
+                acumulado += n
+                le = '+Inf' if limite == float('inf') else f"{limite:g}"
+                yield f"{self.nombre}_bucket{_formatear_etiquetas(self.etiquetas, clave, ('le', le))} {acumulado}"
+            etiquetas = _formatear_etiquetas(self.etiquetas, clave)
+            yield f"{self.nombre}_sum{etiquetas} {suma:.6g}"
+            yield f"{self.nombre}_count{etiquetas} {acumulado}"
+
+    def _sumar(self, clave, valor):
+        conteos, suma = valor
+        serie = self._valores.get(clave)
+        if serie is None:
+            serie = self._valores[clave] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0] = [a + b for a, b in zip(serie[0], conteos)]
+        serie[1] += suma
+
+
+class MetricsRegistry:
+    """Conjunto de métricas con nombre; un solo cerrojo para todas (son operaciones breves)"""
+
+    def __init__(self):
+        self._metricas = {}
+        self._cerrojo = threading.Lock()
+
+    def contador(self, nombre, ayuda, etiquetas=()):
+        """Counter registrado con ese nombre (se crea la primera vez)"""
+        if nombre not in self._metricas:
+            self._metricas[nombre] = Counter(nombre, ayuda, etiquetas, self._cerrojo)
+        return self._metricas[nombre]
+
+    def histograma(self, nombre, ayuda, etiquetas=(), buckets=BUCKETS_SEGUNDOS):
+        """Histogram registrado con ese nombre (se crea la primera vez)"""
+        if nombre not in self._metricas:
+            self._metricas[nombre] = Histogram(nombre, ayuda, etiquetas, self._cerrojo, buckets)
+        return self._metricas[nombre]
+
+    def texto_prometheus(self):
+        """Todas las métricas en el formato de exposición de texto (versión 0.0.4)"""
+        lineas = []
+        with self._cerrojo:
+            for metrica in self._metricas.values():
+                lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+                lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+                lineas.extend(metrica._lineas())
+        return '\n'.join(lineas) + '\n'
+
+    def escribir(self, ruta):
+        """Guardar el texto de Prometheus de forma atómica (para node_exporter textfile)"""
+        import tempfile  # solo al volcar: no pesa en el arranque del pool
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        descriptor, temporal = tempfile.mkstemp(dir=directorio, suffix='.prom.tmp')
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as f:
+            f.write(self.texto_prometheus())
+        os.replace(temporal, ruta)
+
+    def extraer_delta(self):
+        """Lo acumulado desde la llamada anterior, como datos serializables, y poner a cero"""
+        with self._cerrojo:
+            delta = {nombre: list(m._valores.items())
+                     for nombre, m in self._metricas.items() if m._valores}
+            for metrica in self._metricas.values():
+                metrica._valores = {}
+        return delta
+
+    def fusionar(self, delta):
+        """Sumar un delta de `extraer_delta` (p. ej. de un proceso trabajador)"""
+        if not delta:
+            return
+        with self._cerrojo:
+            for nombre, valores in delta.items():
+                metrica = self._metricas.get(nombre)
+                if metrica is None:
+                    continue  # métrica desconocida en este proceso
+                for clave, valor in valores:
+                    metrica._sumar(tuple(clave), valor)
+
+    def resumen(self):
+        """Líneas legibles para el panel de métricas de la aplicación"""
+        lineas = []
+        with self._cerrojo:
+            for metrica in self._metricas.values():
+                for clave, valor in sorted(metrica._valores.items()):
+                    etiquetas = ', '.join(f"{n}={v}" for n, v in zip(metrica.etiquetas, clave))
+                    nombre = metrica.nombre + (f" [{etiquetas}]" if etiquetas else '')
+                    if metrica.tipo == 'counter':
+                        lineas.append(f"{nombre}: {valor:g}")
+                    else:
+                        n, media, p50, p95 = metrica._resumen_serie(valor)
+                        lineas.append(f"{nombre}: n={n}  media {media * 1000:.1f} ms  "
+                                      f"p50≈{p50 * 1000:.1f} ms  p95≈{p95 * 1000:.1f} ms")
+        return lineas
+
+
+REGISTRO = MetricsRegistry()
+
+RESOLUCIONES = REGISTRO.histograma(
+    'integrales_resolucion_segundos', 'Tiempo de resolución por rama del MathSolver', ('rama',))
+CACHE = REGISTRO.contador(
+    'integrales_cache_total', 'Consultas a cachés (soluciones, imagenes, en_vuelo)',
+    ('cache', 'resultado'))
+TRABAJOS = REGISTRO.contador(
+    'integrales_trabajos_total', 'Trabajos del SolverPool por estado (ok, error, timeout...)',
+    ('estado',))
+RECURSOS = REGISTRO.contador(
+    'integrales_recursos_total', 'Veces que se tomó un camino de respaldo', ('tipo',))
+RASTERIZADO = REGISTRO.histograma(
+    'integrales_rasterizado_segundos', 'Rasterizado de una fórmula LaTeX', buckets=BUCKETS_RASTERIZADO)
+EXPORTACIONES = REGISTRO.histograma(
+    'integrales_exportacion_segundos', 'Exportación de una solución por formato', ('formato',))
@@ -0,0 +1,417 @@
+"""
+Exportación de soluciones a PDF con la API de Figure (sin pyplot),
+apta para ejecutarse en un hilo de fondo
+"""
+import math
+import multiprocessing
+import os
+import shutil
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+
+import numpy as np
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.figure import Figure
+from sympy import Expr, integrate, lambdify, srepr
+
+from image_cache import LatexImageCache
+from metrics import EXPORTACIONES
+from mathtext_raster import colorear_mascara, rasterizar_rgba
+from solution_store import SolutionArtifact
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Sin pypdf el cuaderno se genera en un solo proceso
+    PdfWriter = None
+
+
+class ExportacionCancelada(Exception):
+    """El usuario canceló la exportación"""
+
+
+class PDFExporter:
+    """Genera el PDF de una solución: página de gráficas + páginas de pasos.
+
+    Las fórmulas se dibujan con los buffers ya rasterizados para el panel de
+    pasos (guardados en el artefacto); solo se rasterizan las que faltan.
+    El exportador se crea en el hilo de Tk y se ejecuta en uno de fondo: copia
+    al crearse las imágenes y muestras del artefacto, que el hilo de Tk sigue
+    llenando y liberando, y después no vuelve a leerlas ni a escribirlas.
+    """
+
+    DPI = 150                     # mismo dpi que el panel de pasos
+    FONTSIZE_FORMULA = 12         # mismo tamaño que las tarjetas de pasos
+    PAGINA = (8.27, 11.69)        # A4 en pulgadas
+    AREA = (0.06, 0.04, 0.88, 0.92)  # zona útil de la página (fracción de figura)
+    COLOR_FORMULA = '#111827'
+
+    def __init__(self, artefacto, pasos, tipo_integral):
+        self.artefacto = artefacto
+        self.pasos = list(pasos)
+        self.tipo_integral = tipo_integral
+        # Copias propias: los buffers son (ancho, alto, bytes) y los arrays se duplican
+        self._imagenes = dict(artefacto.imagenes)
+        compartido = artefacto.compartido
+        self._muestras = {clave: (np.array(x), np.array(y))
+                          for clave, (x, y) in compartido.muestras.items()}
+        self._evaluadores = dict(compartido.evaluadores)  # funciones puras, se pueden compartir
+        self._antiderivada = compartido.antiderivada
+        if self._antiderivada is None and isinstance(artefacto.resultado, Expr):
+            self._antiderivada = artefacto.resultado
+        self._formulas = {}  # latex -> RGBA oscuro listo para figimage
+        self._paginas = None
+
+    # === Fórmulas ===
+
+    def _imagen_formula(self, latex_str):
+        """RGBA de la fórmula para fondo blanco, reutilizando el panel de pasos"""
+        if latex_str in self._formulas:
+            return self._formulas[latex_str]
+        clave = LatexImageCache.crear_clave(latex_str, self.DPI, self.FONTSIZE_FORMULA, 'white')
+        try:
+            buffer = self._imagenes.get(clave)
+            if buffer is None:
+                buffer = rasterizar_rgba(latex_str, self.DPI, self.FONTSIZE_FORMULA, 'white')
+                self._imagenes[clave] = buffer
+            ancho, alto, datos = buffer
+            alfa = np.frombuffer(datos, dtype=np.uint8).reshape(alto, ancho, 4)[..., 3]
+            imagen = colorear_mascara(alfa, self.COLOR_FORMULA)
+        except Exception:
+            imagen = None  # Fórmula no rasterizable: se imprime como texto
+        self._formulas[latex_str] = imagen
+        return imagen
+
+    def _alto_relativo(self, alto_px):
+        """Altura en unidades de la zona útil a partir de píxeles"""
+        return alto_px / (self.PAGINA[1] * self.DPI * self.AREA[3])
+
+    # === Maquetación ===
+
+    def _bloque_paso(self, numero, paso):
+        """Elementos (tipo, contenido, alto) de un paso"""
+        elementos = [('titulo', f"Paso {numero}: {paso.get('titulo', '')}", 0.03)]
+        formula_ltx = paso.get('formula_latex')
+        formula_txt = paso.get('formula')
+        imagen = self._imagen_formula(formula_ltx) if formula_ltx else None
+        if imagen is not None:
+            elementos.append(('imagen', imagen, self._alto_relativo(imagen.shape[0]) + 0.008))
+        elif formula_ltx or formula_txt:
+            elementos.append(('formula', str(formula_txt or formula_ltx), 0.03))
+        if paso.get('explicacion'):
+            elementos.append(('explicacion', paso['explicacion'], 0.03))
+        return elementos
+
+    def paginar(self):
+        """Repartir los pasos en páginas; devuelve una lista de listas de bloques"""
+        if self._paginas is not None:
+            return self._paginas
+        paginas = [[]]
+        y = 0.96 - 0.08  # la primera página lleva encabezado
+        for numero, paso in enumerate(self.pasos, 1):
+            bloque = self._bloque_paso(numero, paso)
+            alto = sum(e[2] for e in bloque) + 0.01
+            if y - alto < 0 and paginas[-1]:
+                paginas.append([])
+                y = 0.96
+            paginas[-1].append(bloque)
+            y -= alto
+        self._paginas = paginas
+        return paginas
+
+    # === Gráficas ===
+
+    def antiderivada(self):
+        """Antiderivada del artefacto; si aún no existía, se integra aquí sin guardarla en él"""
+        if self._antiderivada is None:
+            self._antiderivada = integrate(self.artefacto.funcion, self.artefacto.variable)
+        return self._antiderivada
+
+    def muestras(self, nombre='funcion', x_min=-5, x_max=5, n=1000):
+        """(x, y) como SolutionArtifact.muestras, pero sobre las copias del exportador"""
+        clave = (nombre, x_min, x_max, n)
+        if clave not in self._muestras:
+            if nombre not in self._evaluadores:
+                expr = self.artefacto.funcion if nombre == 'funcion' else self.antiderivada()
+                self._evaluadores[nombre] = lambdify(self.artefacto.variable, expr, 'numpy')
+            x_vals = np.linspace(x_min, x_max, n)
+            with np.errstate(all='ignore'):
+                y_vals = np.broadcast_to(self._evaluadores[nombre](x_vals), x_vals.shape)
+                y_vals = np.where(np.isfinite(y_vals), y_vals, np.nan)
+            self._muestras[clave] = (x_vals, y_vals)
+        return self._muestras[clave]
+
+    # === Figuras ===
+
+    def figura_graficas(self):
+        """Página con la función y su antiderivada"""
+        artefacto = self.artefacto
+        fig = Figure(figsize=(8, 6))
+        fig.patch.set_facecolor('white')
+        ax1, ax2 = fig.subplots(2, 1)
+        fig.subplots_adjust(hspace=0.35, top=0.95, bottom=0.08, left=0.1, right=0.98)
+        x_vals, y_vals = self.muestras('funcion')
+        ax1.plot(x_vals, y_vals, color='#2563eb', linewidth=2, label=f'f(x) = {artefacto.funcion}')
+        ax1.axhline(0, color='#9ca3af', linewidth=0.8)
+        ax1.axvline(0, color='#9ca3af', linewidth=0.8)
+        ax1.grid(True, alpha=0.3)
+        ax1.set_title('Función Original')
+        ax1.legend()
+
+        try:
+            _, yI = self.muestras('antiderivada')
+            ax2.plot(x_vals, yI, color='#16a34a', linewidth=2, label=f'∫f(x)dx = {self.antiderivada()}')
+            ax2.axhline(0, color='#9ca3af', linewidth=0.8)
+            ax2.axvline(0, color='#9ca3af', linewidth=0.8)
+            ax2.grid(True, alpha=0.3)
+            ax2.set_title('Función Integral')
+            ax2.legend()
+        except Exception:
+            ax2.text(0.5, 0.5, 'Integral no graficable', transform=ax2.transAxes,
+                     ha='center', va='center')
+        return fig
+
+    def figura_pasos(self, pagina, encabezado=None):
+        """Una página A4 de pasos ya paginados"""
+        fig = Figure(figsize=self.PAGINA, dpi=self.DPI)
+        fig.patch.set_facecolor('white')
+        ax = fig.add_axes(self.AREA)
+        ax.axis('off')
+        ancho_px, alto_px = self.PAGINA[0] * self.DPI, self.PAGINA[1] * self.DPI
+
+        y = 0.96
+        if encabezado:
+            ax.text(0.5, y, encabezado[0], ha='center', va='top', fontsize=14, weight='bold')
+            ax.text(0.06, y - 0.05, encabezado[1], va='top', fontsize=10)
+            y -= 0.08
+
+        for bloque in pagina:
+            for tipo, contenido, alto in bloque:
+                if tipo == 'titulo':
+                    ax.text(0.06, y, contenido, va='top', fontsize=11, weight='bold')
+                elif tipo == 'imagen':
+                    xo = (self.AREA[0] + self.AREA[2] * 0.08) * ancho_px
+                    yo = (self.AREA[1] + self.AREA[3] * y) * alto_px - contenido.shape[0]
+                    fig.figimage(contenido, xo=int(xo), yo=int(yo), origin='upper')
+                elif tipo == 'formula':
+                    ax.text(0.08, y, contenido, va='top', fontsize=10, color='#374151')
+                else:
+                    ax.text(0.08, y, contenido, va='top', fontsize=9)
+                y -= alto
+            y -= 0.01
+        return fig
+
+    def encabezado(self):
+        """Título y línea de datos de la primera página de pasos"""
+        return (f"Solución Paso a Paso — {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+                f"Función: {self.artefacto.funcion_str}  |  Tipo: {self.tipo_integral}")
+
+    def figuras(self, encabezado=None):
+        """Generar una a una las figuras de todas las páginas de la solución"""
+        yield self.figura_graficas()
+        for n, pagina in enumerate(self.paginar()):
+            yield self.figura_pasos(pagina, (encabezado or self.encabezado()) if n == 0 else None)
+
+    def contar_paginas(self):
+        """Número total de páginas (gráficas + pasos)"""
+        return len(self.paginar()) + 1
+
+    def exportar(self, filename, progreso=None, cancelado=None):
+        """Escribir el PDF. `progreso(hechas, total)` se llama tras cada página;
+        si `cancelado` (threading.Event) se activa, se borra el archivo parcial
+        y se lanza ExportacionCancelada."""
+        total = self.contar_paginas()
+        try:
+            with EXPORTACIONES.cronometrar(formato='pdf'), PdfPages(filename) as pdf:
+                for n, fig in enumerate(self.figuras(), 1):
+                    if cancelado is not None and cancelado.is_set():
+                        raise ExportacionCancelada()
+                    pdf.savefig(fig)
+                    if progreso:
+                        progreso(n, total)
+        except ExportacionCancelada:
+            if os.path.exists(filename):
+                os.remove(filename)
+            raise
+        return total
+
+
+# === Cuaderno de varias soluciones ===
+
+def describir_solucion(artefacto, tipo_integral=None):
+    """Descripción picklable de una solución resuelta, para el cuaderno; el tipo
+    es el del artefacto (con el que se resolvió) salvo que se indique otro"""
+    resultado = artefacto.resultado
+    antiderivada = artefacto.compartido.antiderivada
+    return {
+        'funcion': artefacto.funcion_str,
+        'variable': artefacto.variable_str,
+        'expresion': srepr(artefacto.funcion),
+        'pasos': list(artefacto.pasos),
+        'resultado': srepr(resultado) if isinstance(resultado, Expr) else None,
+        'antiderivada': srepr(antiderivada) if antiderivada is not None else None,
+        'tipo': tipo_integral or artefacto.tipo_integral,
+    }
+
+
+def _exporter_desde_descripcion(descripcion):
+    """Reconstruir un PDFExporter a partir de una descripción, sin re-resolver ni
+    volver a parsear el texto: las expresiones se leen de su srepr"""
+    artefacto = SolutionArtifact.desde_dict(descripcion)
+    return PDFExporter(artefacto, descripcion['pasos'], descripcion.get('tipo', 'indefinida'))
+
+
+_cancelacion = None  # en los procesos del cuaderno: Event que el padre activa al cancelar
+
+
+def _iniciar_proceso_cuaderno(cancelacion):
+    global _cancelacion
+    _cancelacion = cancelacion
+
+
+def _encabezado_ejercicio(numero, descripcion):
+    """Encabezado de la primera página de pasos de cada ejercicio"""
+    return (f"Ejercicio {numero}",
+            f"Función: {descripcion['funcion']}  |  Tipo: {descripcion.get('tipo', 'indefinida')}")
+
+
+def _renderizar_bloque(bloque, ruta):
+    """Trabajo de cada proceso: escribir un bloque de ejercicios en un PDF parcial.
+    Devuelve el número de páginas de cada ejercicio. Se detiene en la página
+    siguiente si el padre cancela la exportación."""
+    paginas = []
+    with PdfPages(ruta) as pdf:
+        for numero, descripcion in bloque:
+            exporter = _exporter_desde_descripcion(descripcion)
+            n = 0
+            for fig in exporter.figuras(_encabezado_ejercicio(numero, descripcion)):
+                if _cancelacion is not None and _cancelacion.is_set():
+                    raise ExportacionCancelada()
+                pdf.savefig(fig)
+                n += 1
+            paginas.append(n)
+    return paginas
+
+
+class WorkbookExporter:
+    """Cuaderno PDF con índice para decenas o cientos de soluciones.
+
+    Con pypdf disponible, los ejercicios se reparten en bloques entre un pool
+    de procesos y los PDF parciales se concatenan al final; sin pypdf se
+    generan en un solo proceso.
+    """
+
+    ENTRADAS_POR_PAGINA = 38  # líneas del índice por página
+
+    def __init__(self, descripciones, procesos=None):
+        self.descripciones = list(descripciones)
+        self.procesos = procesos or max(1, (os.cpu_count() or 2) - 1)
+
+    def _paginas_indice(self):
+        """Número de páginas que ocupa el índice"""
+        return max(1, math.ceil(len(self.descripciones) / self.ENTRADAS_POR_PAGINA))
+
+    def figuras_indice(self, paginas_por_ejercicio):
+        """Páginas del índice con la página inicial de cada ejercicio"""
+        pagina = self._paginas_indice() + 1
+        entradas = []
+        for numero, (descripcion, n) in enumerate(zip(self.descripciones, paginas_por_ejercicio), 1):
+            entradas.append((f"{numero}.  ∫ {descripcion['funcion']} d{descripcion['variable']}", pagina))
+            pagina += n
+
+        for inicio in range(0, max(len(entradas), 1), self.ENTRADAS_POR_PAGINA):
+            fig = Figure(figsize=PDFExporter.PAGINA)
+            fig.patch.set_facecolor('white')
+            ax = fig.add_axes(PDFExporter.AREA)
+            ax.axis('off')
+            y = 0.96
+            if inicio == 0:
+                ax.text(0.5, y, "Índice", ha='center', va='top', fontsize=16, weight='bold')
+                y -= 0.06
+            for texto, numero_pagina in entradas[inicio:inicio + self.ENTRADAS_POR_PAGINA]:
+                ax.text(0.04, y, texto[:80], va='top', fontsize=10)
+                ax.text(0.96, y, str(numero_pagina), ha='right', va='top', fontsize=10)
+                y -= 0.023
+            yield fig
+
+    def exportar(self, filename, progreso=None, cancelado=None):
+        """Escribir el cuaderno; `progreso(hechos, total)` cuenta ejercicios"""
+        with EXPORTACIONES.cronometrar(formato='cuaderno'):
+            if PdfWriter is None or self.procesos == 1 or len(self.descripciones) < 2:
+                return self._exportar_secuencial(filename, progreso, cancelado)
+            return self._exportar_paralelo(filename, progreso, cancelado)
+
+    def _exportar_secuencial(self, filename, progreso, cancelado):
+        """Un solo proceso: se pagina todo primero para poder escribir el índice"""
+        total = len(self.descripciones)
+        exporters = [_exporter_desde_descripcion(d) for d in self.descripciones]
+        try:
+            with PdfPages(filename) as pdf:
+                for fig in self.figuras_indice([e.contar_paginas() for e in exporters]):
+                    pdf.savefig(fig)
+                for numero, (exporter, descripcion) in enumerate(zip(exporters, self.descripciones), 1):
+                    if cancelado is not None and cancelado.is_set():
+                        raise ExportacionCancelada()
+                    for fig in exporter.figuras(_encabezado_ejercicio(numero, descripcion)):
+                        pdf.savefig(fig)
+                    if progreso:
+                        progreso(numero, total)
+        except ExportacionCancelada:
+            if os.path.exists(filename):
+                os.remove(filename)
+            raise
+        return total
+
+    def _exportar_paralelo(self, filename, progreso, cancelado):
+        """Bloques de ejercicios en paralelo y concatenación final con pypdf"""
+        total = len(self.descripciones)
+        numerados = list(enumerate(self.descripciones, 1))
+        tam_bloque = max(1, math.ceil(total / (self.procesos * 3)))
+        bloques = [numerados[i:i + tam_bloque] for i in range(0, total, tam_bloque)]
+
+        # Al cancelar, los bloques en curso se detienen en su página siguiente (el
+        # Event se revisa por página) y los que aún no empezaron se descartan
+        tmp = tempfile.mkdtemp()
+        try:
+            rutas = [os.path.join(tmp, f"bloque_{i:05d}.pdf") for i in range(len(bloques))]
+            paginas = [None] * len(bloques)
+            contexto = multiprocessing.get_context('spawn')
+            cancelacion = contexto.Event()
+            executor = ProcessPoolExecutor(max_workers=self.procesos, mp_context=contexto,
+                                           initializer=_iniciar_proceso_cuaderno,
+                                           initargs=(cancelacion,))
+            try:
+                futuros = {executor.submit(_renderizar_bloque, bloque, ruta): i
+                           for i, (bloque, ruta) in enumerate(zip(bloques, rutas))}
+                pendientes = set(futuros)
+                hechos = 0
+                while pendientes:
+                    # Revisar la cancelación aunque ningún bloque termine
+                    listos, pendientes = wait(pendientes, timeout=0.2, return_when=FIRST_COMPLETED)
+                    if cancelado is not None and cancelado.is_set():
+                        raise ExportacionCancelada()
+                    for futuro in listos:
+                        i = futuros[futuro]
+                        paginas[i] = futuro.result()
+                        hechos += len(bloques[i])
+                        if progreso:
+                            progreso(hechos, total)
+            except BaseException:
+                cancelacion.set()
+                executor.shutdown(wait=True, cancel_futures=True)
+                raise
+            executor.shutdown()
+
+            ruta_indice = os.path.join(tmp, "indice.pdf")
+            with PdfPages(ruta_indice) as pdf:
+                for fig in self.figuras_indice([n for bloque in paginas for n in bloque]):
+                    pdf.savefig(fig)
+
+            writer = PdfWriter()
+            for ruta in [ruta_indice] + rutas:
+                writer.append(ruta)
+            with open(filename, 'wb') as f:
+                writer.write(f)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return total
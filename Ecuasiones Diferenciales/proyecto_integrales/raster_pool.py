@@ -0,0 +1,57 @@
+"""
+Pool de procesos para rasterizar fórmulas LaTeX en paralelo
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _calentar():
+    """Tarea vacía para que los procesos carguen matplotlib y sus fuentes"""
+    from mathtext_raster import rasterizar_rgba
+    rasterizar_rgba('x', 72, 10)
+    return os.getpid()
+
+
+def _rasterizar(latex_str, dpi, fontsize, color, pad):
+    """rasterizar_rgba más los segundos que tardó dentro del proceso"""
+    from mathtext_raster import rasterizar_rgba
+    inicio = time.perf_counter()
+    ancho, alto, datos = rasterizar_rgba(latex_str, dpi, fontsize, color, pad)
+    return ancho, alto, datos, time.perf_counter() - inicio
+
+
+class RasterPool:
+    """Envía fórmulas a un pool de procesos que devuelve buffers RGBA crudos.
+
+    Los procesos nunca tocan Tk: solo el hilo de Tk crea los PhotoImage.
+    """
+
+    def __init__(self, procesos=None):
+        self.procesos = procesos or max(1, min(4, (os.cpu_count() or 2) - 1))
+        self._executor = None
+
+    def _obtener_executor(self):
+        """Crear el pool bajo demanda (spawn: no hereda el estado de Tk)"""
+        if self._executor is None:
+            contexto = multiprocessing.get_context('spawn')
+            self._executor = ProcessPoolExecutor(max_workers=self.procesos,
+                                                 mp_context=contexto)
+            for _ in range(self.procesos):
+                self._executor.submit(_calentar)
+        return self._executor
+
+    def calentar(self):
+        """Lanzar ya los procesos (cargan matplotlib y fuentes) en vez de con la primera fórmula"""
+        self._obtener_executor()
+
+    def enviar(self, latex_str, dpi=150, fontsize=14, color='white', pad=0.03):
+        """Encolar una fórmula; devuelve un Future con (ancho, alto, bytes RGBA, segundos)"""
+        return self._obtener_executor().submit(_rasterizar, latex_str, dpi, fontsize, color, pad)
+
+    def cerrar(self):
+        """Detener los procesos sin esperar trabajos pendientes"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
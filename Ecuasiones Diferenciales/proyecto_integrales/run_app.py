@@ -1,16 +1,101 @@
-#!/usr/bin/env python3
-"""
-Solucionador Avanzado de Integrales - Versión Modular
-Archivo principal ejecutable
-"""
-
-import sys
-import os
-
-# Agregar el directorio del proyecto al path
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-from main_app import main
-
-if __name__ == "__main__":
-    main()
+#!/usr/bin/env python3
+"""
+Solucionador Avanzado de Integrales - Versión Modular
+Archivo principal ejecutable
+
+La ventana aparece al instante con una pantalla de carga; SymPy, matplotlib y
+las fuentes de mathtext se importan y calientan en un hilo, y las funciones de
+la biblioteca se pre-resuelven para que el primer "Resolver" no pague el
+arranque en frío.
+"""
+
+import sys
+import os
+import threading
+import tkinter as tk
+from tkinter import messagebox
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+
+def mostrar_splash(root):
+    """Pantalla de carga ligera (solo tkinter)"""
+    root.title("🧮 Solucionador Avanzado de Integrales")
+    root.geometry("1400x900")
+    root.configure(bg='#0d1117')
+
+    splash = tk.Frame(root, bg='#161b22')
+    splash.place(relx=0.5, rely=0.45, anchor='center')
+    tk.Label(splash, text="🧮 Solucionador Avanzado de Integrales",
+             font=("Segoe UI", 20, "bold"), fg='#58a6ff', bg='#161b22').pack(padx=40, pady=(30, 8))
+    tk.Label(splash, text="Cargando motor matemático...",
+             font=("Segoe UI", 10), fg='#7d8590', bg='#161b22').pack(padx=40, pady=(0, 30))
+    return splash
+
+
+def calentar(estado):
+    """Hilo de arranque: importar módulos, calentar fuentes y pre-resolver.
+    Solo escribe en `estado`; el hilo de Tk lo consulta con after(). Las
+    funciones se resuelven en el SolutionStore de la aplicación: si el usuario
+    pide una que se está pre-resolviendo, espera a ese mismo cálculo. Se marcan
+    como calentamiento: no cuentan en las métricas ni van al cuaderno mientras
+    el usuario no las pida."""
+    try:
+        import main_app  # SymPy, MathSolver y el resto de la interfaz
+    except Exception as e:
+        estado['error'] = e
+        return
+    estado['main_app'] = main_app
+
+    # A partir de aquí todo es opcional: si algo falla, se calienta en el primer uso
+    try:
+        from mathtext_raster import rasterizar_rgba
+        rasterizar_rgba(r'\int x^{2} \, dx = \frac{x^{3}}{3} + C', 150, 12)
+    except Exception:
+        pass
+
+    from math_solver import MathSolver
+    from ui_manager import UIManager
+    math_solver = MathSolver()
+    estado['app_lista'].wait()
+    for funcion_str in UIManager.funciones_rapidas():
+        try:
+            artefacto = estado['solution_store'].obtener(funcion_str, 'x', calentamiento=True)
+            artefacto.resolver(math_solver, registrar=False)
+        except Exception:
+            pass
+
+
+def main():
+    """Mostrar la ventana ya y construir MainApp cuando el hilo haya importado los módulos"""
+    root = tk.Tk()
+    splash = mostrar_splash(root)
+    estado = {'main_app': None, 'app_lista': threading.Event(), 'solution_store': None,
+              'error': None}
+    threading.Thread(target=calentar, args=(estado,), daemon=True).start()
+    app = None
+
+    def revisar():
+        nonlocal app
+        if estado['error'] is not None:
+            messagebox.showerror("Error", f"No se pudo iniciar la aplicación: {estado['error']}")
+            root.destroy()
+            return
+        if estado['main_app'] is None:
+            root.after(50, revisar)
+            return
+        splash.destroy()
+        app = estado['main_app'].MainApp(root)
+        app.step_renderer.raster_pool.calentar()
+        estado['solution_store'] = app.solution_store
+        estado['app_lista'].set()
+
+    root.after(50, revisar)
+    root.mainloop()
+    if app is not None:
+        app.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Lectura segura de expresiones que llegan de fuera (alumnos, servidor HTTP,
+archivos por lotes)
+
+parse_expr ejecuta el texto con eval: "__import__('os').system(...)" se
+ejecuta al parsear. Aquí el texto pasa por las mismas transformaciones que
+parse_expr(..., transformations='all') (multiplicación implícita, ^, x!, ...),
+pero el código resultante no se evalúa: se lee como árbol ast y solo se
+construyen los nodos permitidos (operadores aritméticos, números y nombres de
+SymPy). Atributos, subíndices, dunders y llamadas a cualquier otra cosa
+lanzan ValueError, igual que los números o árboles demasiado grandes
+("10**10**10", factorial(factorial(20))), que colgarían a quien parsea.
+
+`desde_srepr` lee con el mismo constructor y los mismos límites las
+expresiones guardadas como srepr (archivos de soluciones, procesos del cuaderno).
+"""
+import ast
+import operator
+import re
+
+import sympy
+from sympy import Basic, exp, log
+from sympy.parsing.sympy_parser import T, stringify_expr
+
+MAX_OPERACIONES = 2000      # llamadas y operadores por expresión
+MAX_NODOS_GUARDADOS = 20000  # llamadas por srepr (cada Symbol('x') e Integer(2) cuenta)
+MAX_ANIDAMIENTO = 100       # paréntesis abiertos a la vez (las transformaciones son recursivas)
+MAX_DIGITOS = 1000          # dígitos de un literal (o exponente de un decimal en texto)
+MAX_BITS_POTENCIA = 100000  # tamaño estimado de una potencia numérica exacta
+LIMITE_ARGUMENTO = 1000     # argumento numérico de funciones que crecen (factorial, gamma, ...)
+
+# Funciones de SymPy que no son clases y se pueden llamar desde una entrada
+FUNCIONES = {'sqrt': sympy.sqrt, 'cbrt': sympy.cbrt, 'root': sympy.root,
+             'real_root': sympy.real_root}
+# Nombres de Python que parse_expr también acepta (abs(x), max(x, 1), ...)
+EQUIVALENTES_PYTHON = {'abs': sympy.Abs, 'max': sympy.Max, 'min': sympy.Min, 'pow': sympy.Pow}
+# Clases que reciben texto (nombres y números): el resto sympifica el texto con eval
+CLASES_CON_TEXTO = (sympy.Symbol, sympy.Dummy, sympy.Wild, sympy.Function,
+                    sympy.Integer, sympy.Rational, sympy.Float)
+OPERADORES = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+              ast.Div: operator.truediv, ast.Pow: operator.pow, ast.Mod: operator.mod}
+UNARIOS = {ast.USub: operator.neg, ast.UAdd: operator.pos}
+_EXPONENTE = re.compile(r'[eE]([-+]?\d+)')
+
+_espacio_nombres = None  # lo que ve stringify_expr: SymPy + EQUIVALENTES_PYTHON
+
+
+def _nombres_globales():
+    global _espacio_nombres
+    if _espacio_nombres is None:
+        nombres = {n: getattr(sympy, n) for n in sympy.__all__ if not n.startswith('_')}
+        nombres.update(EQUIVALENTES_PYTHON)
+        _espacio_nombres = nombres
+    return _espacio_nombres
+
+
+def _resolver_nombre(identificador):
+    """Objeto de SymPy permitido para un nombre: constantes (pi, E, oo, ...),
+    clases (sin, Symbol, Integral, ...) y FUNCIONES"""
+    if identificador.startswith('_'):
+        raise ValueError(f"Nombre no permitido en la expresión: {identificador}")
+    if identificador in FUNCIONES:
+        return FUNCIONES[identificador]
+    valor = _nombres_globales().get(identificador)
+    if isinstance(valor, Basic) or (isinstance(valor, type) and issubclass(valor, Basic)):
+        return valor
+    raise ValueError(f"Nombre no permitido en la expresión: {identificador}")
+
+
+_clases_basic = {}  # nombre -> subclase de Basic ya cargada (srepr usa __name__)
+
+
+def _clase_basic(identificador):
+    if identificador not in _clases_basic:
+        pendientes = [Basic]
+        while pendientes:
+            for subclase in pendientes.pop().__subclasses__():
+                if subclase.__name__ not in _clases_basic:
+                    _clases_basic[subclase.__name__] = subclase
+                    pendientes.append(subclase)
+    return _clases_basic.get(identificador)
+
+
+def _resolver_nombre_guardado(identificador):
+    """Como `_resolver_nombre`, más cualquier subclase de Basic por su nombre
+    (srepr escribe ExprCondPair, AppliedUndef, ... que no están en sympy.__all__)"""
+    try:
+        return _resolver_nombre(identificador)
+    except ValueError:
+        clase = None if identificador.startswith('_') else _clase_basic(identificador)
+        if clase is None:
+            raise
+        return clase
+
+
+def _es_clase_basic(valor):
+    return isinstance(valor, type) and issubclass(valor, Basic)
+
+
+def _comprobar_texto(clase, texto):
+    """Los textos solo nombran símbolos o escriben números de tamaño acotado"""
+    if '__' in texto:
+        raise ValueError(f"Nombre no permitido en la expresión: {texto}")
+    if issubclass(clase, (sympy.Integer, sympy.Rational, sympy.Float)):
+        exponente = _EXPONENTE.search(texto)
+        if len(texto) > MAX_DIGITOS or (exponente and abs(int(exponente.group(1))) > MAX_DIGITOS):
+            raise ValueError("Número demasiado grande en la expresión")
+
+
+def _comprobar_potencia(base, exponente):
+    """Rechazar potencias numéricas exactas cuyo resultado sería enorme"""
+    if not (isinstance(base, Basic) and isinstance(exponente, Basic)):
+        return
+    if not (base.is_number and exponente.is_Number) or base.is_Float or exponente.is_Float:
+        return
+    if base in (sympy.S.Zero, sympy.S.One, sympy.S.NegativeOne):
+        return
+    # sqrt(2)**n también se evalúa: cuentan los racionales que aparecen en la base
+    bits = max((max(r.p.bit_length(), r.q.bit_length()) for r in base.atoms(sympy.Rational)),
+               default=0)
+    if bits * abs(exponente) > MAX_BITS_POTENCIA:
+        raise ValueError("Número demasiado grande en la expresión")
+
+
+def _comprobar_llamada(clase, argumentos):
+    """Funciones que con argumentos numéricos grandes calculan números enormes"""
+    if clase is sympy.Pow and len(argumentos) >= 2:
+        _comprobar_potencia(argumentos[0], argumentos[1])
+        return
+    if clase is sympy.Float:
+        if any(isinstance(a, (int, sympy.Integer)) and abs(a) > LIMITE_ARGUMENTO
+               for a in argumentos[1:]):
+            raise ValueError("Precisión demasiado grande en la expresión")
+        return
+    modulo = getattr(clase, '__module__', None) or ''  # Function('f') no tiene módulo
+    crece = modulo.startswith(('sympy.functions.combinatorial',
+                               'sympy.functions.special.gamma_functions'))
+    if clase is exp:
+        crece = any(isinstance(a, Basic) and a.has(log) for a in argumentos)  # exp(n*log(10))
+    if not crece:
+        return
+    for argumento in argumentos:
+        if isinstance(argumento, Basic) and argumento.is_number:
+            coeficiente = argumento.as_coeff_Mul()[0]
+            if abs(coeficiente) > LIMITE_ARGUMENTO:
+                raise ValueError("Número demasiado grande en la expresión")
+
+
+class _Constructor:
+    """Construye el objeto de SymPy de un árbol ast nodo a nodo, solo con lo permitido"""
+
+    def __init__(self, guardada=False):
+        self.operaciones = 0
+        self.guardada = guardada  # srepr: solo llamadas, y cualquier clase de SymPy
+        self.maximo = MAX_NODOS_GUARDADOS if guardada else MAX_OPERACIONES
+        self.resolver_nombre = _resolver_nombre_guardado if guardada else _resolver_nombre
+
+    def error(self, mensaje):
+        return ValueError(f"{mensaje} en {'una expresión guardada' if self.guardada else 'la expresión'}")
+
+    def contar(self):
+        self.operaciones += 1
+        if self.operaciones > self.maximo:
+            raise self.error("Expresión demasiado grande")
+
+    def construir(self, nodo, texto_permitido=False):
+        if isinstance(nodo, ast.Constant):
+            valor = nodo.value
+            if isinstance(valor, bool) or isinstance(valor, float):
+                return valor
+            if isinstance(valor, int):
+                if valor.bit_length() > MAX_DIGITOS * 10 // 3:
+                    raise self.error("Número demasiado grande")
+                return valor
+            if isinstance(valor, str) and texto_permitido:
+                return valor
+            raise self.error(f"Constante no permitida ({valor!r})")
+        if isinstance(nodo, (ast.Tuple, ast.List)):
+            return tuple(self.construir(elemento) for elemento in nodo.elts)
+        if isinstance(nodo, ast.Name):
+            return self.resolver_nombre(nodo.id)
+        if isinstance(nodo, ast.UnaryOp) and type(nodo.op) in UNARIOS:
+            self.contar()
+            operando = self.construir(nodo.operand)
+            if isinstance(operando, bool) or not isinstance(operando, (Basic, int, float)):
+                raise self.error("Operando no permitido")
+            return UNARIOS[type(nodo.op)](operando)
+        if isinstance(nodo, ast.BinOp) and type(nodo.op) in OPERADORES and not self.guardada:
+            self.contar()
+            izquierda, derecha = self.construir(nodo.left), self.construir(nodo.right)
+            if not (isinstance(izquierda, Basic) and isinstance(derecha, Basic)):
+                raise self.error("Operando no permitido")
+            if isinstance(nodo.op, ast.Pow):
+                _comprobar_potencia(izquierda, derecha)
+            return OPERADORES[type(nodo.op)](izquierda, derecha)
+        if isinstance(nodo, ast.Call):
+            self.contar()
+            funcion = self.construir(nodo.func)  # Function('f')(x): la clase sale de otra llamada
+            if not (_es_clase_basic(funcion) or any(funcion is f for f in FUNCIONES.values())):
+                raise self.error("Llamada no permitida")
+            if any(palabra.arg is None for palabra in nodo.keywords):
+                raise self.error("Argumentos ** no permitidos")
+            con_texto = funcion in CLASES_CON_TEXTO  # exactas: sin('...') sympificaría el texto
+            argumentos = [self.construir(a, texto_permitido=con_texto) for a in nodo.args]
+            palabras = {p.arg: self.construir(p.value) for p in nodo.keywords}
+            for argumento in argumentos:
+                if isinstance(argumento, str):
+                    _comprobar_texto(funcion, argumento)
+            _comprobar_llamada(funcion, argumentos + list(palabras.values()))
+            return funcion(*argumentos, **palabras)
+        raise self.error(f"Sintaxis no permitida ({type(nodo).__name__})")
+
+
+def parsear_expresion(texto):
+    """Expresión de SymPy a partir de lo que escribió un usuario, con la misma
+    sintaxis que parse_expr(texto, transformations='all') pero sin eval.
+    Lanza ValueError si la entrada no es una expresión matemática permitida."""
+    nivel = 0
+    for caracter in texto:
+        nivel += (caracter in '([') - (caracter in ')]')
+        if nivel > MAX_ANIDAMIENTO:
+            raise ValueError("Expresión demasiado anidada")
+    try:
+        codigo = stringify_expr(texto, {}, _nombres_globales(), T[:])
+        arbol = ast.parse(codigo.strip(), mode='eval')
+    except (SyntaxError, TypeError, ValueError) as e:
+        raise ValueError(str(e)) from None
+    except RecursionError:
+        raise ValueError("Expresión demasiado anidada") from None
+    try:
+        return _Constructor().construir(arbol.body)
+    except RecursionError:
+        raise ValueError("Expresión demasiado anidada") from None
+    except (TypeError, AttributeError, ArithmeticError) as e:
+        raise ValueError(str(e)) from None
+
+
+def desde_srepr(texto):
+    """Expresión a partir de su srepr sin eval (a diferencia de sympify), para leer
+    archivos de cualquier origen: solo llamadas a clases de SymPy con literales,
+    sus constantes (pi, oo, ...) u otras expresiones así construidas, con los
+    límites de `parsear_expresion` (Pow(Integer(10), Pow(Integer(10), Integer(10)))
+    no se evalúa). Cualquier otra cosa lanza ValueError."""
+    try:
+        arbol = ast.parse(texto, mode='eval')
+    except SyntaxError as e:
+        raise ValueError(f"Expresión guardada ilegible: {e}") from None
+    except RecursionError:
+        raise ValueError("Expresión guardada demasiado anidada") from None
+    try:
+        return _Constructor(guardada=True).construir(arbol.body)
+    except RecursionError:
+        raise ValueError("Expresión guardada demasiado anidada") from None
+    except (TypeError, AttributeError, ArithmeticError) as e:
+        raise ValueError(str(e)) from None
@@ -0,0 +1,258 @@
+"""
+Registro opcional de resoluciones lentas con perfil de cProfile
+
+Se activa con la variable de entorno INTEGRALES_LOG_LENTAS (directorio) y,
+opcionalmente, INTEGRALES_UMBRAL_LENTAS (segundos, 2 por defecto). Los
+procesos del SolverPool la heredan, así que basta con configurarla antes de
+crear el pool (`configurar` lo hace desde la línea de comandos).
+
+Cada resolución ya se cronometra en SolutionArtifact; si supera el umbral,
+se vuelve a resolver en un intérprete aparte (con prioridad baja y la caché
+de SymPy vacía, como la primera vez), bajo cProfile y con un muestreador de
+pilas, sin competir por el GIL ni por las cachés del proceso que la resolvió.
+Las entradas que superan el tiempo límite del SolverPool se capturan desde
+el pool: el perfil se corta al mismo tiempo límite y queda con lo muestreado
+hasta ahí. En el directorio queda una carpeta por entrada lenta con:
+    entrada.json      función, variable, estado (lenta/timeout), clasificación,
+                      rama y tiempos por etapa
+    perfil.pstats     perfil de cProfile (python -m pstats perfil.pstats)
+    perfil.collapsed  pilas muestreadas en formato "a;b;c N" (flamegraph.pl, speedscope)
+Se conservan las `max_capturas` más recientes. Los procesos del pool terminan
+sus capturas pendientes antes de cerrarse.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+from canonical import clave_de_entrada, normalizar_entrada
+
+VARIABLE_DIRECTORIO = 'INTEGRALES_LOG_LENTAS'
+VARIABLE_UMBRAL = 'INTEGRALES_UMBRAL_LENTAS'
+VARIABLE_MAX = 'INTEGRALES_MAX_LENTAS'
+
+_instancia = None
+_configuracion = None  # (directorio, umbral, max) con la que se creó _instancia
+
+
+class SlowSolveLog:
+    """Guarda un perfil reproducible de cada entrada que tarda más que `umbral`"""
+
+    INTERVALO_MUESTREO = 0.005  # segundos entre muestras de la pila
+    MARGEN_CAPTURA = 30         # segundos de más (arranque, escritura) antes de matar una captura
+
+    def __init__(self, directorio, umbral=2.0, max_capturas=20):
+        self.directorio = directorio
+        self.umbral = umbral
+        self.max_capturas = max_capturas
+        self._en_curso = set()  # entradas que se están perfilando
+        self._hilos = []        # un hilo por captura, que espera a su proceso
+        self._cerrojo = threading.Lock()
+
+    @staticmethod
+    def segundos(artefacto):
+        """Tiempo de la resolución según las etapas ya medidas del artefacto"""
+        return sum(artefacto.tiempos.get(e, 0.0) for e in ('parsear', 'clasificar', 'resolver'))
+
+    def revisar(self, artefacto, esperar=False):
+        """Perfilar el artefacto si fue lento (en otro proceso; con `esperar`, hasta
+        que termine). Devuelve el hilo que espera la captura, o None si no hacía falta."""
+        segundos = self.segundos(artefacto)
+        if segundos < self.umbral:
+            return None
+        if self._ya_capturada(self._nombre(artefacto)):
+            return None
+        datos = {
+            'funcion': artefacto.funcion_str,
+            'variable': artefacto.variable_str,
+            'estado': 'lenta',
+            'clasificacion': artefacto.clasificacion,
+            'segundos': segundos,
+            'tiempos': dict(artefacto.tiempos),
+            'llamadas': dict(artefacto.etapas.llamadas),
+            'version_solver': artefacto.version_solver,
+        }
+        return self._lanzar(datos, limite=max(4 * segundos, 30.0), esperar=esperar)
+
+    def registrar_timeout(self, funcion_str, variable_str, segundos, esperar=False):
+        """Perfilar una entrada que superó el tiempo límite del pool (su proceso ya
+        se mató); el perfil se corta a los mismos `segundos`. No parsea aquí."""
+        datos = {
+            'funcion': funcion_str,
+            'variable': variable_str,
+            'estado': 'timeout',
+            'segundos': segundos,
+        }
+        return self._lanzar(datos, limite=segundos, esperar=esperar)
+
+    def _lanzar(self, datos, limite, esperar):
+        clave = normalizar_entrada(datos['funcion'], datos['variable'])
+        with self._cerrojo:
+            if clave in self._en_curso:
+                return None
+            self._en_curso.add(clave)
+        datos.update({'umbral': self.umbral, 'pid': os.getpid(),
+                      'fecha': time.strftime('%Y-%m-%dT%H:%M:%S')})
+        orden = json.dumps({'directorio': self.directorio, 'max_capturas': self.max_capturas,
+                            'limite': limite, 'datos': datos})
+        hilo = threading.Thread(target=self._capturar, args=(orden, limite, clave), daemon=True)
+        hilo.start()
+        self._hilos = [h for h in self._hilos if h.is_alive()] + [hilo]
+        if esperar:
+            hilo.join()
+        return hilo
+
+    def esperar(self, timeout=None):
+        """Esperar a que terminen las capturas en curso (p. ej. antes de salir)"""
+        limite = None if timeout is None else time.monotonic() + timeout
+        for hilo in list(self._hilos):
+            hilo.join(None if limite is None else max(0.0, limite - time.monotonic()))
+
+    @staticmethod
+    def _nombre(artefacto):
+        """Sufijo estable por entrada: la misma integral lenta (o una equivalente) se
+        captura una sola vez"""
+        return clave_de_entrada(artefacto.funcion_str, artefacto.variable_str,
+                                expr=artefacto.funcion).huella
+
+    def _ya_capturada(self, nombre):
+        if not os.path.isdir(self.directorio):
+            return False
+        return any(d.endswith(nombre) for d in os.listdir(self.directorio))
+
+    def _capturar(self, orden, limite, clave):
+        """Lanzar `python slow_log.py` con la orden por stdin y esperarlo; si no
+        termina con su propio límite, se mata"""
+        import subprocess
+        try:
+            proceso = subprocess.Popen([sys.executable, os.path.abspath(__file__)],
+                                       stdin=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       cwd=os.path.dirname(os.path.abspath(__file__)))
+            try:
+                _, error = proceso.communicate(orden.encode('utf-8'),
+                                               timeout=limite + self.MARGEN_CAPTURA)
+            except subprocess.TimeoutExpired:
+                proceso.kill()
+                _, error = proceso.communicate()
+            if proceso.returncode:
+                mensaje = error.decode('utf-8', 'replace').strip().splitlines()
+                raise RuntimeError(mensaje[-1] if mensaje else f"código {proceso.returncode}")
+        except Exception as e:
+            print(f"No se pudo guardar el perfil de la resolución lenta: {e}", file=sys.stderr)
+        finally:
+            with self._cerrojo:
+                self._en_curso.discard(clave)
+
+    def _rotar(self):
+        """Borrar las capturas más antiguas por encima de `max_capturas`"""
+        import shutil
+        capturas = sorted(d for d in os.listdir(self.directorio)
+                          if os.path.isdir(os.path.join(self.directorio, d)))
+        for antigua in capturas[:max(0, len(capturas) - self.max_capturas)]:
+            shutil.rmtree(os.path.join(self.directorio, antigua), ignore_errors=True)
+
+
+# === Proceso de captura ===
+
+def _perfilar(directorio, max_capturas, limite, datos):
+    """Resolver la entrada bajo cProfile y el muestreador y guardar la captura.
+    Si se llega a `limite`, se guarda lo medido hasta ahí y el proceso termina."""
+    import cProfile
+    from math_solver import MathSolver
+    from solution_store import SolutionArtifact
+
+    registro = SlowSolveLog(directorio, datos.get('umbral', 2.0), max_capturas)
+    math_solver = MathSolver()
+    copia = SolutionArtifact(datos['funcion'], datos['variable'])
+    nombre = registro._nombre(copia)
+    if registro._ya_capturada(nombre):
+        return
+    try:
+        rama = math_solver.identificar_rama(copia.funcion, copia.variable)
+    except Exception:
+        rama = 'error'
+
+    perfil = cProfile.Profile()
+    muestras = {}
+    terminado = threading.Event()
+    inicio = time.perf_counter()
+
+    def guardar(cortado):
+        destino = os.path.join(directorio, f"{time.strftime('%Y%m%d-%H%M%S')}-{nombre}")
+        os.makedirs(destino, exist_ok=True)
+        perfil.dump_stats(os.path.join(destino, 'perfil.pstats'))
+        with open(os.path.join(destino, 'perfil.collapsed'), 'w', encoding='utf-8') as f:
+            for pila, n in sorted(muestras.items(), key=lambda par: -par[1]):
+                f.write(f"{pila} {n}\n")
+        with open(os.path.join(destino, 'entrada.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                **datos,
+                'clasificacion': datos.get('clasificacion') or copia.clasificacion,
+                'rama': rama,
+                'segundos_perfilado': time.perf_counter() - inicio,
+                'perfil_cortado': cortado,
+                'tiempos_perfilado': dict(copia.tiempos),
+            }, f, ensure_ascii=False, indent=2)
+        registro._rotar()
+
+    def muestrear(ident):
+        """Contar pilas del hilo `ident`; al llegar a `limite`, guardar y salir"""
+        while not terminado.wait(registro.INTERVALO_MUESTREO):
+            if time.perf_counter() - inicio >= limite:
+                guardar(cortado=True)
+                os._exit(0)  # la resolución no se puede interrumpir de otro modo
+            frame = sys._current_frames().get(ident)
+            pila = []
+            while frame is not None:
+                codigo = frame.f_code
+                if codigo is _perfilar.__code__:
+                    break  # las pilas empiezan en la resolución
+                pila.append(f"{os.path.basename(codigo.co_filename)}:"
+                            f"{getattr(codigo, 'co_qualname', codigo.co_name)}")
+                frame = frame.f_back
+            if pila:
+                clave = ';'.join(reversed(pila))
+                muestras[clave] = muestras.get(clave, 0) + 1
+
+    muestreador = threading.Thread(target=muestrear, args=(threading.get_ident(),), daemon=True)
+    muestreador.start()
+    perfil.enable()
+    try:
+        copia.resolver(math_solver, registrar=False)
+    finally:
+        perfil.disable()
+        terminado.set()
+        muestreador.join()
+    guardar(cortado=False)
+
+
+def configurar(directorio, umbral=None, max_capturas=None):
+    """Activar el registro en este proceso y en los que se lancen después"""
+    os.environ[VARIABLE_DIRECTORIO] = os.path.abspath(directorio)
+    if umbral is not None:
+        os.environ[VARIABLE_UMBRAL] = str(umbral)
+    if max_capturas is not None:
+        os.environ[VARIABLE_MAX] = str(max_capturas)
+
+
+def activo():
+    """SlowSolveLog configurado por el entorno, o None si el modo está apagado"""
+    global _instancia, _configuracion
+    directorio = os.environ.get(VARIABLE_DIRECTORIO)
+    if not directorio:
+        return None
+    configuracion = (directorio, float(os.environ.get(VARIABLE_UMBRAL, 2.0)),
+                     int(os.environ.get(VARIABLE_MAX, 20)))
+    if configuracion != _configuracion:
+        _instancia, _configuracion = SlowSolveLog(*configuracion), configuracion
+    return _instancia
+
+
+if __name__ == "__main__":
+    # Proceso de captura lanzado por SlowSolveLog: orden JSON por stdin
+    if hasattr(os, 'nice'):
+        os.nice(10)  # no quitarle CPU a la aplicación ni al pool
+    os.environ.pop(VARIABLE_DIRECTORIO, None)  # la copia no vuelve a registrarse
+    orden = json.load(sys.stdin)
+    _perfilar(orden['directorio'], orden['max_capturas'], orden['limite'], orden['datos'])
@@ -0,0 +1,101 @@
+"""
+Serialización de soluciones completas (pasos, antiderivada, clasificación,
+tiempos y versión del solver) en JSON-lines o en binario compacto (pickle 5)
+"""
+import json
+import pickle
+
+import sympy
+
+from metrics import EXPORTACIONES
+from solution_store import SolutionArtifact
+
+FORMATO = 1
+CABECERA_BINARIA = b'INTSOL1\n'
+
+
+def a_registro(artefacto):
+    """Registro autocontenido de un artefacto resuelto"""
+    registro = artefacto.a_dict()
+    registro['formato'] = FORMATO
+    registro['version_sympy'] = sympy.__version__
+    return registro
+
+
+def desde_registro(registro):
+    """Artefacto listo para el panel de pasos a partir de un registro"""
+    if registro.get('formato', FORMATO) > FORMATO:
+        raise ValueError(f"Formato de solución no soportado: {registro['formato']}")
+    return SolutionArtifact.desde_dict(registro)
+
+
+def a_bytes(artefacto):
+    """Un artefacto como bytes (pickle protocolo 5), para pasar entre procesos"""
+    return pickle.dumps(a_registro(artefacto), protocol=5)
+
+
+def desde_bytes(datos):
+    """Inverso de `a_bytes`"""
+    return desde_registro(pickle.loads(datos))
+
+
+def guardar_jsonl(artefactos, filename):
+    """Una solución por línea, en UTF-8 legible"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for artefacto in artefactos:
+            f.write(json.dumps(a_registro(artefacto), ensure_ascii=False))
+            f.write('\n')
+    return filename
+
+
+def cargar_jsonl(filename):
+    """Generador de artefactos desde un archivo JSON-lines. Se ignoran las líneas
+    vacías y los registros sin solución (sin 'expresion', como los de error o
+    timeout de batch_solver). Las expresiones se reconstruyen sin eval, así que
+    se puede abrir un archivo de cualquier origen (a diferencia de los binarios)."""
+    with open(filename, encoding='utf-8') as f:
+        for linea in f:
+            if linea.strip():
+                registro = json.loads(linea)
+                if registro.get('expresion'):
+                    yield desde_registro(registro)
+
+
+def guardar_binario(artefactos, filename):
+    """Cabecera + un pickle (protocolo 5) por solución, escritos uno tras otro"""
+    with open(filename, 'wb') as f:
+        f.write(CABECERA_BINARIA)
+        for artefacto in artefactos:
+            pickle.dump(a_registro(artefacto), f, protocol=5)
+    return filename
+
+
+def cargar_binario(filename):
+    """Generador de artefactos desde un archivo de `guardar_binario`.
+    Solo se contienen dicts de tipos básicos, pero como todo pickle debe
+    abrirse únicamente si procede de una fuente de confianza."""
+    with open(filename, 'rb') as f:
+        if f.read(len(CABECERA_BINARIA)) != CABECERA_BINARIA:
+            raise ValueError(f"{filename} no es un archivo de soluciones")
+        while True:
+            try:
+                registro = pickle.load(f)
+            except EOFError:
+                return
+            yield desde_registro(registro)
+
+
+def guardar(artefactos, filename):
+    """Elegir el formato según la extensión (.jsonl o binario)"""
+    if filename.lower().endswith(('.jsonl', '.json')):
+        with EXPORTACIONES.cronometrar(formato='jsonl'):
+            return guardar_jsonl(artefactos, filename)
+    with EXPORTACIONES.cronometrar(formato='pkl'):
+        return guardar_binario(artefactos, filename)
+
+
+def cargar(filename):
+    """Lista de artefactos del archivo, eligiendo el formato según la extensión"""
+    if filename.lower().endswith(('.jsonl', '.json')):
+        return list(cargar_jsonl(filename))
+    return list(cargar_binario(filename))
@@ -0,0 +1,414 @@
+"""
+Artefactos por solución compartidos entre resolver, graficar y exportar
+"""
+import threading
+from collections import OrderedDict
+
+from sympy import Expr, Symbol, integrate, lambdify, latex, Integral, simplify, srepr
+
+import slow_log
+from safe_parser import desde_srepr, parsear_expresion
+from canonical import clave_de_entrada, normalizar_entrada
+from metrics import CACHE, RECURSOS, RESOLUCIONES
+from stage_timer import StageTimer
+
+
+class CalculoCompartido:
+    """La solución de una clave canónica, compartida por las entradas equivalentes
+    ("(x+1)^2" y "x**2+2*x+1"): se resuelve una sola vez, con la forma escrita que
+    llegó primero (`forma`), y de ella salen los pasos, el resultado, la
+    antiderivada, los evaluadores y las muestras de todas."""
+
+    def __init__(self, funcion, variable, forma):
+        self.funcion = funcion   # expresión de la forma resuelta
+        self.variable = variable
+        self.forma = forma       # texto de la forma resuelta
+        self.pasos = None        # pasos del MathSolver (None = aún no resuelta)
+        self.resultado = None    # resultado tal como lo devuelve el MathSolver
+        self.clasificacion = None
+        self.rama = None         # método elegido por resolver_integral_general
+        self.version_solver = None
+        self.antiderivada = None
+        self.evaluadores = {}   # 'funcion' / 'antiderivada' -> función numpy
+        self.muestras = {}      # (nombre, x_min, x_max, n) -> arrays
+        self.cerrojo = threading.Lock()  # una sola resolución aunque la pidan varios hilos
+
+    @property
+    def resuelta(self):
+        return self.pasos is not None
+
+    def bytes_en_cache(self):
+        return sum(x.nbytes + y.nbytes for x, y in self.muestras.values())
+
+    def liberar_cache(self):
+        liberados = self.bytes_en_cache()
+        self.muestras = {}
+        self.evaluadores = {}
+        return liberados
+
+
+def _del_calculo(nombre, doc):
+    """Atributo del artefacto guardado en su CalculoCompartido"""
+    return property(lambda self: getattr(self.compartido, nombre),
+                    lambda self, valor: setattr(self.compartido, nombre, valor), doc=doc)
+
+
+class SolutionArtifact:
+    """Una entrada tal como se escribió (texto, expresión, tiempos e imágenes de
+    fórmulas ya rasterizadas) y su solución, que está en un CalculoCompartido con
+    las entradas equivalentes"""
+
+    resultado = _del_calculo('resultado', "Resultado tal como lo devuelve el MathSolver")
+    clasificacion = _del_calculo('clasificacion', "Tipo detallado de la función resuelta")
+    rama = _del_calculo('rama', "Método elegido por resolver_integral_general")
+    version_solver = _del_calculo('version_solver', "MathSolver.VERSION con que se resolvió")
+
+    def __init__(self, funcion_str, variable_str):
+        self.funcion_str = funcion_str
+        self.variable_str = variable_str
+        self.variable = Symbol(variable_str)
+        self.etapas = StageTimer()  # segundos y llamadas por etapa del cálculo
+        with self.etapas.etapa('parsear'):
+            self.funcion = parsear_expresion(funcion_str)  # sin eval: ValueError si no es válida
+
+        self.tipo_integral = 'indefinida'  # con el que se resolvió por última vez en la interfaz
+        self.calentamiento = False  # pre-resuelta al arrancar y aún no pedida por el usuario
+        self.compartido = CalculoCompartido(self.funcion, self.variable, funcion_str)
+        self.imagenes = {}       # (latex, dpi, fontsize, color) -> (ancho, alto, bytes RGBA)
+
+    @property
+    def tiempos(self):
+        """Segundos por etapa (parsear, clasificar, resolver, integrate, ...)"""
+        return self.etapas.segundos
+
+    @property
+    def resuelta(self):
+        """True si el MathSolver ya produjo los pasos"""
+        return self.compartido.resuelta
+
+    @property
+    def equivalente(self):
+        """True si la solución es la de otra forma escrita equivalente"""
+        return (normalizar_entrada(self.compartido.forma, self.variable_str)
+                != normalizar_entrada(self.funcion_str, self.variable_str))
+
+    @property
+    def pasos(self):
+        """Pasos del MathSolver (None = aún no resuelta); si se resolvió una forma
+        equivalente, precedidos de un paso que lo dice"""
+        pasos = self.compartido.pasos
+        if pasos is None or not self.equivalente:
+            return pasos
+        return [{
+            'titulo': 'Forma equivalente',
+            'formula': f'{self.funcion} = {self.compartido.funcion}',
+            'formula_latex': f'{latex(self.funcion)} = {latex(self.compartido.funcion)}',
+            'explicacion': (f'La función es equivalente a {self.compartido.forma}, ya resuelta: '
+                            'se reutilizan sus pasos.'),
+            'tipo': 'reescritura',
+        }] + pasos
+
+    @pasos.setter
+    def pasos(self, pasos):
+        self.compartido.pasos = pasos
+
+    def resolver(self, math_solver, registrar=True):
+        """Resolver una sola vez con el MathSolver; devuelve (pasos, resultado).
+        Si otro hilo ya la está resolviendo (esta entrada u otra equivalente), se
+        espera a su resultado. Con registrar=False no cuenta en las métricas ni en
+        el registro de lentas."""
+        with self.compartido.cerrojo:
+            self._resolver(math_solver, registrar)
+        return self.pasos, self.resultado
+
+    def _resolver(self, math_solver, registrar):
+        compartido = self.compartido
+        if not compartido.resuelta:
+            compartido.funcion, compartido.forma = self.funcion, self.funcion_str
+            with self.etapas.activo():
+                with self.etapas.etapa('clasificar'):
+                    compartido.clasificacion = math_solver.identificar_tipo_detallado(self.funcion)
+                    try:
+                        compartido.rama = math_solver.identificar_rama(self.funcion, self.variable)
+                    except Exception:
+                        compartido.rama = 'error'  # resolver_integral_general fallará igual
+                with self.etapas.etapa('resolver'):
+                    compartido.pasos, compartido.resultado = math_solver.resolver_integral_general(
+                        self.funcion, self.variable)
+            compartido.version_solver = math_solver.VERSION
+            if not registrar:
+                return
+            RESOLUCIONES.observar(self.tiempos['resolver'], rama=self.rama)
+            if self.resultado is None:
+                RECURSOS.inc(tipo='sin_resultado')
+
+            registro_lentas = slow_log.activo()
+            if registro_lentas is not None:
+                registro_lentas.revisar(self)
+
+    @property
+    def antiderivada(self):
+        """Antiderivada simbólica (la primera calculada entre las entradas equivalentes);
+        se integra solo si el solver no dejó una expresión"""
+        compartido = self.compartido
+        if compartido.antiderivada is None:
+            if isinstance(self.resultado, Expr):
+                compartido.antiderivada = self.resultado
+            else:
+                RECURSOS.inc(tipo='antiderivada_sympy')  # el solver no dejó una expresión
+                compartido.antiderivada = integrate(self.funcion, self.variable)
+        return compartido.antiderivada
+
+    def a_dict(self):
+        """Registro serializable (solo tipos JSON): las expresiones van como srepr.
+        No incluye evaluadores, muestras ni imágenes, que se regeneran bajo demanda."""
+        resultado = self.resultado
+        antiderivada = self.compartido.antiderivada
+        if antiderivada is None and isinstance(resultado, Expr):
+            antiderivada = resultado
+        return {
+            'funcion': self.funcion_str,
+            'variable': self.variable_str,
+            'expresion': srepr(self.funcion),
+            'clasificacion': self.clasificacion,
+            'rama': self.rama,
+            'resuelta_como': self.compartido.forma if self.equivalente else None,
+            'pasos': list(self.pasos) if self.pasos is not None else None,
+            'resultado': srepr(resultado) if isinstance(resultado, Expr) else None,
+            'resultado_texto': None if resultado is None or isinstance(resultado, Expr) else str(resultado),
+            'antiderivada': srepr(antiderivada) if antiderivada is not None else None,
+            'tiempos': dict(self.etapas.segundos),
+            'llamadas': dict(self.etapas.llamadas),
+            'version_solver': self.version_solver,
+            'tipo_integral': self.tipo_integral,
+        }
+
+    @classmethod
+    def desde_dict(cls, datos):
+        """Reconstruir un artefacto desde `a_dict` sin volver a resolver. Las
+        expresiones se leen con `desde_srepr` (sin eval); el texto de la función
+        no se vuelve a parsear."""
+        if not datos.get('expresion'):
+            raise ValueError("El registro no incluye la expresión ('expresion')")
+        artefacto = cls.__new__(cls)
+        artefacto.funcion_str = datos['funcion']
+        artefacto.variable_str = datos['variable']
+        artefacto.variable = Symbol(datos['variable'])
+        artefacto.funcion = desde_srepr(datos['expresion'])
+        artefacto.etapas = StageTimer(dict(datos.get('tiempos') or {}),
+                                      dict(datos.get('llamadas') or {}))
+        artefacto.tipo_integral = datos.get('tipo_integral') or 'indefinida'
+        artefacto.calentamiento = False
+        artefacto.compartido = CalculoCompartido(artefacto.funcion, artefacto.variable,
+                                                 artefacto.funcion_str)
+        artefacto.imagenes = {}
+
+        pasos = datos.get('pasos')
+        if datos.get('resuelta_como') and pasos:
+            # Resuelta como otra forma: el primer paso guardado es el que lo dice
+            artefacto.compartido.forma = datos['resuelta_como']
+            artefacto.compartido.funcion = parsear_expresion(datos['resuelta_como'])
+            pasos = pasos[1:]
+        artefacto.pasos = pasos
+        if datos.get('resultado'):
+            artefacto.resultado = desde_srepr(datos['resultado'])
+        else:
+            artefacto.resultado = datos.get('resultado_texto')
+        artefacto.clasificacion = datos.get('clasificacion')
+        artefacto.rama = datos.get('rama')
+        artefacto.version_solver = datos.get('version_solver')
+        if datos.get('antiderivada'):
+            artefacto.compartido.antiderivada = desde_srepr(datos['antiderivada'])
+        return artefacto
+
+    def pasos_definida(self, limite_inf_str, limite_sup_str):
+        """Pasos del Teorema Fundamental del Cálculo; devuelve (pasos, valor)"""
+        antiderivada = self.antiderivada
+        limite_inf = parsear_expresion(limite_inf_str)
+        limite_sup = parsear_expresion(limite_sup_str)
+
+        # Evaluar en los límites
+        valor_sup = antiderivada.subs(self.variable, limite_sup)
+        valor_inf = antiderivada.subs(self.variable, limite_inf)
+        resultado_def = simplify(valor_sup - valor_inf)
+
+        pasos = [{
+            'titulo': 'Teorema Fundamental del Cálculo',
+            'formula': f'F({limite_sup}) - F({limite_inf})',
+            'formula_latex': f'F\\left({latex(limite_sup)}\\right) - F\\left({latex(limite_inf)}\\right)',
+            'explicacion': 'Evaluamos la antiderivada en los límites de integración.',
+            'tipo': 'metodo'
+        }, {
+            'titulo': 'Evaluación en límite superior',
+            'formula': f'F({limite_sup}) = {valor_sup}',
+            'formula_latex': f'F\\left({latex(limite_sup)}\\right) = {latex(valor_sup)}',
+            'explicacion': f'Sustituimos x = {limite_sup} en la antiderivada.',
+            'tipo': 'aplicacion'
+        }, {
+            'titulo': 'Evaluación en límite inferior',
+            'formula': f'F({limite_inf}) = {valor_inf}',
+            'formula_latex': f'F\\left({latex(limite_inf)}\\right) = {latex(valor_inf)}',
+            'explicacion': f'Sustituimos x = {limite_inf} en la antiderivada.',
+            'tipo': 'aplicacion'
+        }, {
+            'titulo': 'RESULTADO NUMÉRICO',
+            'formula': f'{resultado_def}',
+            'formula_latex': f'{latex(resultado_def)}',
+            'explicacion': 'Resultado de la integral definida.',
+            'tipo': 'resultado'
+        }]
+        return pasos, resultado_def
+
+    def bytes_en_cache(self):
+        """Memoria aproximada de lo regenerable: imágenes RGBA y muestras numéricas"""
+        imagenes = sum(len(datos) for _, _, datos in self.imagenes.values())
+        return imagenes + self.compartido.bytes_en_cache()
+
+    def liberar_cache(self):
+        """Descartar imágenes, muestras y evaluadores (se regeneran bajo demanda).
+        Devuelve los bytes liberados."""
+        liberados = sum(len(datos) for _, _, datos in self.imagenes.values())
+        self.imagenes = {}
+        return liberados + self.compartido.liberar_cache()
+
+    def latex_resultado(self):
+        """LaTeX de la tarjeta de resultado final"""
+        return latex(Integral(self.funcion, self.variable)) + "=" + latex(self.resultado) + "+C"
+
+    def evaluador(self, nombre):
+        """Función numpy compilada para 'funcion' o 'antiderivada'"""
+        evaluadores = self.compartido.evaluadores
+        if nombre not in evaluadores:
+            expr = self.compartido.funcion if nombre == 'funcion' else self.antiderivada
+            evaluadores[nombre] = lambdify(self.variable, expr, 'numpy')
+        return evaluadores[nombre]
+
+    def muestras(self, nombre='funcion', x_min=-5, x_max=5, n=1000):
+        """(x, y) muestreados; los valores no finitos se sustituyen por NaN"""
+        muestras = self.compartido.muestras
+        clave = (nombre, x_min, x_max, n)
+        if clave not in muestras:
+            import numpy as np
+            x_vals = np.linspace(x_min, x_max, n)
+            with np.errstate(all='ignore'):
+                y_vals = np.broadcast_to(self.evaluador(nombre)(x_vals), x_vals.shape)
+                y_vals = np.where(np.isfinite(y_vals), y_vals, np.nan)
+            muestras[clave] = (x_vals, y_vals)
+        return muestras[clave]
+
+
+class SolutionStore:
+    """Almacén acotado de soluciones, indexado por la clave canónica: las entradas
+    equivalentes ("(x+1)^2" y "x**2 + 2*x + 1") se resuelven una sola vez y
+    comparten pasos, resultado, antiderivada y muestras (CalculoCompartido). Cada
+    forma escrita tiene además su artefacto, con su expresión y sus imágenes.
+    Se puede usar desde varios hilos (p. ej. el calentamiento de arranque)."""
+
+    def __init__(self, max_soluciones=64):
+        self.max_soluciones = max_soluciones
+        self._artefactos = OrderedDict()  # entrada normalizada -> SolutionArtifact
+        self._soluciones = OrderedDict()  # ClaveCanonica -> CalculoCompartido
+        self._cerrojo = threading.Lock()
+
+    @staticmethod
+    def crear_clave(funcion_str, variable_str, expr=None):
+        """Clave de la solución de una entrada: su ClaveCanonica (`expr` evita
+        volver a parsear). Lanza ValueError si la entrada no es válida."""
+        return clave_de_entrada(funcion_str, variable_str, expr=expr)
+
+    def obtener(self, funcion_str, variable_str, calentamiento=False):
+        """Devolver el artefacto de la entrada, creándolo (y parseando) si no existe;
+        si ya se resolvió una entrada equivalente, el nuevo usa esa solución.
+        Con `calentamiento` (pre-resolución de arranque) no cuenta en las métricas
+        y el artefacto no aparece en `resueltas` hasta que el usuario lo pida."""
+        texto = normalizar_entrada(funcion_str, variable_str)
+        with self._cerrojo:
+            artefacto = self._artefactos.get(texto)
+            if artefacto is not None:
+                if not calentamiento:
+                    artefacto.calentamiento = False
+                    self._artefactos.move_to_end(texto)
+                    CACHE.inc(cache='soluciones', resultado='acierto')
+                return artefacto
+        artefacto = SolutionArtifact(funcion_str.strip(), variable_str.strip())
+        artefacto.calentamiento = calentamiento
+        clave = self.crear_clave(funcion_str, variable_str, expr=artefacto.funcion)
+        with self._cerrojo:
+            # Otro hilo pudo crearlo mientras se parseaba: se conserva el primero
+            existente = self._artefactos.get(texto)
+            if existente is not None:
+                artefacto = existente
+                if not calentamiento:
+                    artefacto.calentamiento = False
+            else:
+                equivalente = self._compartir(clave, artefacto)
+                if not calentamiento:
+                    CACHE.inc(cache='soluciones',
+                              resultado='equivalente' if equivalente else 'fallo')
+                self._artefactos[texto] = artefacto
+            self._artefactos.move_to_end(texto)
+            self._recortar()
+        return artefacto
+
+    def registrar(self, artefacto):
+        """Añadir un artefacto ya construido (p. ej. cargado de disco)"""
+        texto = normalizar_entrada(artefacto.funcion_str, artefacto.variable_str)
+        clave = self.crear_clave(artefacto.funcion_str, artefacto.variable_str,
+                                 expr=artefacto.funcion)
+        with self._cerrojo:
+            self._compartir(clave, artefacto)
+            self._artefactos[texto] = artefacto
+            self._artefactos.move_to_end(texto)
+            self._recortar()
+        return artefacto
+
+    def _compartir(self, clave, artefacto):
+        """Usar para el artefacto la solución de su clave, si la hay; True si la había.
+        Un artefacto ya resuelto (cargado de disco) conserva la suya si la del
+        almacén aún no se resolvió."""
+        compartido = self._soluciones.get(clave)
+        if (compartido is None or compartido is artefacto.compartido
+                or (artefacto.resuelta and not compartido.resuelta)):
+            self._soluciones[clave] = artefacto.compartido
+            self._soluciones.move_to_end(clave)
+            return False
+        artefacto.compartido = compartido
+        self._soluciones.move_to_end(clave)
+        return True
+
+    def _recortar(self):
+        while len(self._artefactos) > self.max_soluciones:
+            self._artefactos.popitem(last=False)
+        while len(self._soluciones) > self.max_soluciones:
+            self._soluciones.popitem(last=False)
+
+    def bytes_en_cache(self):
+        """Memoria regenerable de todos los artefactos (cada solución una vez)"""
+        with self._cerrojo:
+            artefactos = list(self._artefactos.values())
+        imagenes = sum(len(datos) for a in artefactos for _, _, datos in a.imagenes.values())
+        compartidos = {id(a.compartido): a.compartido for a in artefactos}
+        return imagenes + sum(c.bytes_en_cache() for c in compartidos.values())
+
+    def artefactos(self):
+        """Todos los artefactos, del menos al más recientemente usado"""
+        with self._cerrojo:
+            return list(self._artefactos.values())
+
+    def resueltas(self):
+        """Artefactos ya resueltos a pedido del usuario, del más antiguo al más reciente
+        (sin los pre-resueltos al arrancar que nadie pidió)"""
+        with self._cerrojo:
+            return [a for a in self._artefactos.values() if a.resuelta and not a.calentamiento]
+
+    def limpiar(self):
+        """Descartar todos los artefactos"""
+        with self._cerrojo:
+            self._artefactos.clear()
+            self._soluciones.clear()
+
+    def __len__(self):
+        return len(self._artefactos)
+
+    def __contains__(self, clave):
+        return clave in self._artefactos
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Servicio HTTP/JSON local que comparte un MathSolver caliente entre varios clientes
+
+Solo usa la biblioteca estándar. Las peticiones se resuelven en un SolverPool
+de procesos ya calentados, con tiempo límite por petición y una cola acotada:
+cuando está llena el servidor responde 503 con Retry-After en vez de encolar.
+
+    python solve_server.py --puerto 8765 --procesos 3
+
+Endpoints (cuerpo JSON; `variable` es 'x' por defecto y `timeout` opcional):
+    GET  /salud                                   estado del pool y de la cola
+    GET  /metrics                                 métricas en formato de texto de Prometheus
+    POST /resolver   {funcion}                    registro de la solución
+    POST /definida   {funcion, inferior, superior} pasos y valor de la integral definida
+    POST /grafico    {funcion, formato: png|json, x_min, x_max, n}
+    POST /exportar   {funcion, formato: pdf|html|tex|jsonl|pkl, tipo}
+"""
+import argparse
+import base64
+import json
+import math
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Agregar el directorio del proyecto al path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import slow_log
+from metrics import REGISTRO
+from solver_pool import SolverPool, resolver
+
+TIPOS_CONTENIDO = {
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+    'html': 'text/html; charset=utf-8',
+    'tex': 'application/x-tex; charset=utf-8',
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'pkl': 'application/octet-stream',
+}
+
+# estado del registro -> código HTTP
+CODIGOS = {'ok': 200, 'sin_resultado': 200, 'error': 422, 'timeout': 504, 'cancelado': 503}
+
+# Límites de /grafico: una sola petición no debe poder reservar memoria sin tope
+MAX_MUESTRAS = 10000
+MAX_ABS_X = 1e6
+
+PETICIONES = REGISTRO.contador('integrales_http_total', 'Peticiones HTTP por ruta y código',
+                               ('ruta', 'codigo'))
+
+
+# === Tareas que se ejecutan en los procesos del pool ===
+
+def definida(contexto, funcion, inferior, superior, variable='x'):
+    """Pasos y valor de la integral definida entre `inferior` y `superior`"""
+    artefacto = contexto.artefacto(funcion, variable)
+    pasos, valor = artefacto.pasos_definida(str(inferior), str(superior))
+    try:
+        numerico = float(valor)
+    except (TypeError, ValueError):
+        numerico = None  # simbólico, complejo o infinito
+    return {'estado': 'ok', 'pasos': pasos, 'valor': str(valor), 'valor_numerico': numerico}
+
+
+def grafico(contexto, funcion, variable='x', formato='png', x_min=-5, x_max=5, n=1000):
+    """PNG de la función y su antiderivada, o las muestras como listas"""
+    artefacto = contexto.artefacto(funcion, variable)
+    if formato == 'json':
+        import numpy as np
+
+        def listas(nombre):
+            x_vals, y_vals = artefacto.muestras(nombre, x_min, x_max, n)
+            return x_vals.tolist(), [None if np.isnan(y) else y for y in y_vals.tolist()]
+
+        x_vals, y_funcion = listas('funcion')
+        try:
+            _, y_antiderivada = listas('antiderivada')
+        except Exception:
+            y_antiderivada = None
+        return {'estado': 'ok', 'x': x_vals, 'funcion': y_funcion, 'antiderivada': y_antiderivada}
+
+    from io import BytesIO
+    from pdf_exporter import PDFExporter
+
+    buffer = BytesIO()
+    PDFExporter(artefacto, artefacto.pasos, 'indefinida').figura_graficas().savefig(
+        buffer, format='png', dpi=100)
+    return {'estado': 'ok', 'formato': 'png', 'contenido': buffer.getvalue()}
+
+
+def exportar(contexto, funcion, variable='x', formato='pdf', tipo='indefinida'):
+    """Bytes del documento exportado (pdf, html, tex, jsonl o pkl)"""
+    artefacto = contexto.artefacto(funcion, variable)
+    descriptor, ruta = tempfile.mkstemp(suffix=f'.{formato}')
+    os.close(descriptor)
+    try:
+        if formato == 'pdf':
+            from pdf_exporter import PDFExporter
+            PDFExporter(artefacto, artefacto.pasos, tipo).exportar(ruta)
+        elif formato in ('html', 'tex'):
+            from text_exporter import TextExporter
+            resultado_ltx = artefacto.latex_resultado() if artefacto.resultado is not None else None
+            TextExporter(artefacto.pasos, funcion, variable, tipo, resultado_ltx).exportar(ruta)
+        elif formato in ('jsonl', 'pkl'):
+            import solution_serializer
+            solution_serializer.guardar([artefacto], ruta)
+        else:
+            return {'estado': 'error', 'error': f"Formato no soportado: {formato}"}
+        with open(ruta, 'rb') as f:
+            return {'estado': 'ok', 'formato': formato, 'contenido': f.read()}
+    finally:
+        os.remove(ruta)
+
+
+TAREAS = {'/resolver': resolver, '/definida': definida, '/grafico': grafico, '/exportar': exportar}
+PARAMETROS = {
+    '/resolver': ('funcion', 'variable'),
+    '/definida': ('funcion', 'variable', 'inferior', 'superior'),
+    '/grafico': ('funcion', 'variable', 'formato', 'x_min', 'x_max', 'n'),
+    '/exportar': ('funcion', 'variable', 'formato', 'tipo'),
+}
+
+
+def validar(ruta, argumentos):
+    """Comprobar tipos y rangos antes de encolar (ValueError -> 400). Las
+    expresiones se parsean en el proceso del pool, sin eval (safe_parser)."""
+    for campo in ('funcion', 'variable'):
+        if not isinstance(argumentos.get(campo), str):
+            raise ValueError(f"El campo '{campo}' debe ser texto")
+    if ruta == '/definida':
+        for campo in ('inferior', 'superior'):
+            valor = argumentos.get(campo)
+            if isinstance(valor, bool) or not isinstance(valor, (str, int, float)):
+                raise ValueError(f"El campo '{campo}' debe ser un número o una expresión")
+    if ruta == '/grafico':
+        n = argumentos.setdefault('n', 1000)
+        if isinstance(n, bool) or not isinstance(n, int) or not 2 <= n <= MAX_MUESTRAS:
+            raise ValueError(f"'n' debe ser un entero entre 2 y {MAX_MUESTRAS}")
+        x_min, x_max = argumentos.setdefault('x_min', -5), argumentos.setdefault('x_max', 5)
+        for valor in (x_min, x_max):
+            if (isinstance(valor, bool) or not isinstance(valor, (int, float))
+                    or not math.isfinite(valor) or abs(valor) > MAX_ABS_X):
+                raise ValueError(f"'x_min' y 'x_max' deben ser números entre ±{MAX_ABS_X:g}")
+        if not x_min < x_max:
+            raise ValueError("'x_min' debe ser menor que 'x_max'")
+        if argumentos.setdefault('formato', 'png') not in ('png', 'json'):
+            raise ValueError("'formato' debe ser png o json")
+
+
+# === Servidor ===
+
+class SolveServer(ThreadingHTTPServer):
+    """Servidor HTTP con un SolverPool compartido y una cola acotada"""
+
+    daemon_threads = True
+
+    def __init__(self, direccion, pool, max_cola=None, timeout_maximo=120.0):
+        super().__init__(direccion, SolveHandler)
+        self.pool = pool
+        self.max_cola = max_cola or pool.procesos * 8
+        self.timeout_maximo = timeout_maximo
+        self.en_curso = 0
+        self._cerrojo = threading.Lock()
+
+    def reservar(self):
+        """Ocupar un hueco de la cola; False si está llena (contrapresión)"""
+        with self._cerrojo:
+            if self.en_curso >= self.max_cola:
+                return False
+            self.en_curso += 1
+            return True
+
+    def liberar(self):
+        """Devolver el hueco de una petición terminada"""
+        with self._cerrojo:
+            self.en_curso -= 1
+
+
+class SolveHandler(BaseHTTPRequestHandler):
+    """Traduce peticiones JSON en tareas del pool"""
+
+    server_version = "IntegralesSolveServer/1.0"
+
+    def log_message(self, formato, *args):
+        sys.stderr.write(f"{self.address_string()} {formato % args}\n")
+
+    def _responder_json(self, codigo, datos, cabeceras=None):
+        cuerpo = json.dumps(datos, ensure_ascii=False).encode('utf-8')
+        self._responder(codigo, cuerpo, 'application/json; charset=utf-8', cabeceras)
+
+    def _responder(self, codigo, cuerpo, tipo_contenido, cabeceras=None):
+        ruta = self.path.split('?')[0].rstrip('/')
+        PETICIONES.inc(ruta=ruta if ruta in TAREAS or ruta in ('/salud', '/metrics') else 'otra',
+                       codigo=codigo)
+        self.send_response(codigo)
+        self.send_header('Content-Type', tipo_contenido)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        for nombre, valor in (cabeceras or {}).items():
+            self.send_header(nombre, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def do_GET(self):
+        ruta = self.path.split('?')[0].rstrip('/')
+        if ruta == '/metrics':
+            self._responder(200, REGISTRO.texto_prometheus().encode('utf-8'),
+                            'text/plain; version=0.0.4; charset=utf-8')
+            return
+        if ruta != '/salud':
+            self._responder_json(404, {'error': 'Ruta no encontrada'})
+            return
+        servidor = self.server
+        self._responder_json(200, {
+            'estado': 'ok', 'procesos': servidor.pool.procesos, 'listos': servidor.pool.listos(),
+            'en_curso': servidor.en_curso,
+            'en_cola': servidor.pool.pendientes(), 'max_cola': servidor.max_cola,
+            'agrupadas': servidor.pool.agrupadas,
+        })
+
+    def do_POST(self):
+        ruta = self.path.split('?')[0].rstrip('/')
+        if ruta not in TAREAS:
+            self._responder_json(404, {'error': 'Ruta no encontrada'})
+            return
+        try:
+            largo = int(self.headers.get('Content-Length') or 0)
+            peticion = json.loads(self.rfile.read(largo) or b'{}')
+            if not isinstance(peticion, dict) or not peticion.get('funcion'):
+                raise ValueError("Falta el campo 'funcion'")
+        except ValueError as e:
+            self._responder_json(400, {'error': str(e)})
+            return
+
+        servidor = self.server
+        if not servidor.reservar():
+            self._responder_json(503, {'error': 'Servidor ocupado, reintenta más tarde'},
+                                 {'Retry-After': '1'})
+            return
+        try:
+            argumentos = {'variable': 'x'}
+            argumentos.update((k, peticion[k]) for k in PARAMETROS[ruta] if k in peticion)
+            validar(ruta, argumentos)
+            timeout = min(float(peticion.get('timeout', servidor.pool.timeout)),
+                          servidor.timeout_maximo)
+            if not timeout > 0:  # también rechaza NaN, que nunca vencería
+                raise ValueError("'timeout' debe ser un número positivo")
+            registro = servidor.pool.enviar_tarea(TAREAS[ruta], argumentos, timeout).result()
+        except (TypeError, ValueError) as e:
+            self._responder_json(400, {'error': str(e)})
+            return
+        finally:
+            servidor.liberar()
+
+        codigo = CODIGOS.get(registro.get('estado'), 500)
+        if 'contenido' in registro and peticion.get('base64'):
+            registro['contenido'] = base64.b64encode(registro['contenido']).decode('ascii')
+        elif 'contenido' in registro:
+            self._responder(codigo, registro['contenido'], TIPOS_CONTENIDO[registro['formato']])
+            return
+        self._responder_json(codigo, registro)
+
+
+def main(argv=None):
+    """Punto de entrada de la línea de comandos"""
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON local del solucionador")
+    parser.add_argument('--host', default='127.0.0.1', help="dirección de escucha (solo local por defecto)")
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('-p', '--procesos', type=int, default=None,
+                        help="procesos del pool (por defecto, núcleos - 1)")
+    parser.add_argument('-t', '--timeout', type=float, default=30.0,
+                        help="segundos por petición si el cliente no indica otro")
+    parser.add_argument('--timeout-maximo', type=float, default=120.0,
+                        help="tope para el `timeout` pedido por los clientes")
+    parser.add_argument('--log-lentas', metavar='DIRECTORIO',
+                        help="guardar entrada, tiempos y perfil de cProfile de las integrales lentas")
+    parser.add_argument('--umbral-lento', type=float, default=2.0,
+                        help="segundos a partir de los cuales una integral cuenta como lenta")
+    parser.add_argument('--max-cola', type=int, default=None,
+                        help="peticiones admitidas a la vez (por defecto, 8 por proceso)")
+    args = parser.parse_args(argv)
+    if args.log_lentas:
+        slow_log.configurar(args.log_lentas, args.umbral_lento)  # lo heredan los procesos del pool
+
+    with SolverPool(args.procesos, args.timeout) as pool:
+        servidor = SolveServer((args.host, args.puerto), pool, args.max_cola, args.timeout_maximo)
+        print(f"Escuchando en http://{args.host}:{args.puerto} "
+              f"({pool.procesos} procesos, cola de {servidor.max_cola})", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            servidor.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,368 @@
+"""
+Pool de procesos para resolver integrales sin interfaz, con tiempo límite por trabajo
+"""
+import collections
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import wait
+
+import slow_log
+from canonical import clave_de_entrada, normalizar_entrada
+from metrics import CACHE, REGISTRO, TRABAJOS
+
+
+class ContextoTrabajador:
+    """Estado que cada proceso conserva entre trabajos: solver y artefactos recientes"""
+
+    def __init__(self, max_soluciones=32):
+        from math_solver import MathSolver
+        from solution_store import SolutionStore
+
+        self.math_solver = MathSolver()
+        self.solution_store = SolutionStore(max_soluciones=max_soluciones)
+
+    def artefacto(self, funcion, variable='x'):
+        """Artefacto resuelto de la entrada (reutilizado si el proceso ya lo resolvió)"""
+        artefacto = self.solution_store.obtener(funcion, variable)
+        artefacto.resolver(self.math_solver)
+        return artefacto
+
+
+def resolver(contexto, funcion, variable='x'):
+    """Tarea por defecto: registro serializable de la solución"""
+    from solution_serializer import a_registro
+
+    try:
+        artefacto = contexto.solution_store.obtener(funcion, variable)
+    except Exception as e:
+        return {'estado': 'error', 'error': f"No se puede interpretar la función: {e}"}
+    artefacto.resolver(contexto.math_solver)
+    registro = a_registro(artefacto)
+    sin_resultado = registro['resultado'] is None and registro['resultado_texto'] is None
+    registro['estado'] = 'sin_resultado' if sin_resultado else 'ok'
+    return registro
+
+
+# Segundos que un proceso que se cierra espera a sus perfiles de entradas lentas
+ESPERA_CAPTURAS = 60
+
+
+def _trabajador(conexion, max_soluciones=32):
+    """Bucle de un proceso: recibe (tarea, argumentos), responde con un dict.
+    Solo importa SymPy y el MathSolver (nada de Tk ni matplotlib)."""
+    contexto = ContextoTrabajador(max_soluciones)
+    resolver(contexto, 'x')  # calentar cachés de SymPy
+    REGISTRO.extraer_delta()  # el calentamiento no cuenta en las métricas
+    conexion.send(('listo', os.getpid()))
+    while True:
+        try:
+            trabajo = conexion.recv()
+        except EOFError:
+            return
+        if trabajo is None:
+            registro_lentas = slow_log.activo()
+            if registro_lentas is not None:
+                registro_lentas.esperar(ESPERA_CAPTURAS)
+            return
+        tarea, argumentos = trabajo
+        cpu_inicio = time.process_time()
+        try:
+            registro = tarea(contexto, **argumentos)
+        except Exception as e:
+            registro = {'estado': 'error', 'error': str(e)}
+        registro['cpu_segundos'] = time.process_time() - cpu_inicio
+        registro['pid'] = os.getpid()
+        registro['metricas'] = REGISTRO.extraer_delta()  # el pool lo quita y lo acumula
+        conexion.send(('hecho', registro))
+
+
+class _Proceso:
+    """Un proceso trabajador y el trabajo que tiene asignado"""
+
+    def __init__(self, contexto, max_soluciones):
+        self.conexion, extremo = contexto.Pipe()
+        self.proceso = contexto.Process(target=_trabajador, args=(extremo, max_soluciones),
+                                        daemon=True)
+        self.proceso.start()
+        extremo.close()
+        self.listo = False
+        self.trabajo = None   # (futuro, argumentos, inicio, limite)
+
+    def detener(self, forzar=False):
+        """Terminar el proceso (forzar: matar aunque esté resolviendo)"""
+        if forzar:
+            self.proceso.kill()
+        else:
+            try:
+                self.conexion.send(None)
+            except (OSError, ValueError):
+                pass
+        espera = ESPERA_CAPTURAS + 1 if slow_log.activo() is not None else 1
+        self.proceso.join(timeout=espera if not forzar else None)
+        if self.proceso.is_alive():
+            self.proceso.kill()
+            self.proceso.join()
+        self.conexion.close()
+
+
+class SolverPool:
+    """Reparte integrales entre procesos y devuelve Futures con un registro por entrada.
+
+    Cada trabajo tiene un tiempo límite: si se supera, el proceso se mata y se
+    reemplaza, y el Future recibe un registro con estado 'timeout'. Los fallos
+    nunca se propagan como excepción; siempre llegan como registro.
+
+    Además de resolver, `enviar_tarea` ejecuta cualquier función de módulo
+    `tarea(contexto, **argumentos) -> dict` en un proceso del pool.
+
+    Las peticiones idénticas (misma tarea, argumentos en forma canónica y tiempo
+    límite) que llegan mientras otra igual está en curso no se encolan: esperan al mismo
+    cálculo y reciben una copia de su registro, marcada con 'agrupada'. Las funciones
+    equivalentes ("x*(x+1)" y "x**2+x") cuentan como idénticas; el registro es el de
+    la forma que se resolvió y 'entrada' guarda la que escribió el cliente.
+
+    Cada proceso conserva hasta `soluciones_por_proceso` artefactos resueltos
+    (0: ninguno, cada petición se resuelve de nuevo).
+    """
+
+    def __init__(self, procesos=None, timeout=30.0, soluciones_por_proceso=32):
+        self.procesos = procesos or max(1, (os.cpu_count() or 2) - 1)
+        self.timeout = timeout
+        self.soluciones_por_proceso = soluciones_por_proceso
+        self._contexto = multiprocessing.get_context('spawn')
+        self._cola = collections.deque()
+        self._cerrojo = threading.Lock()
+        self._despertar_r, self._despertar_w = self._contexto.Pipe(duplex=False)
+        self._trabajadores = []
+        self._hilo = None
+        self._cerrado = False
+        self._error_inicio = None  # un proceso murió antes de estar listo
+        self._en_vuelo = {}        # clave canónica -> Future del cálculo en curso
+        self.agrupadas = 0         # peticiones atendidas por un cálculo ya en curso
+
+    def iniciar(self):
+        """Lanzar los procesos (ya calentados al responder 'listo') y el despachador"""
+        if self._hilo is None:
+            self._trabajadores = [_Proceso(self._contexto, self.soluciones_por_proceso)
+                                  for _ in range(self.procesos)]
+            self._hilo = threading.Thread(target=self._despachar, daemon=True)
+            self._hilo.start()
+        return self
+
+    def enviar(self, funcion_str, variable_str='x', timeout=None):
+        """Encolar una integral; devuelve un Future con el registro resultante"""
+        return self.enviar_tarea(resolver, {'funcion': funcion_str, 'variable': variable_str},
+                                 timeout)
+
+    def enviar_tarea(self, tarea, argumentos, timeout=None):
+        """Encolar `tarea(contexto, **argumentos)`; devuelve un Future con su dict"""
+        if self._cerrado:
+            raise RuntimeError("El pool está cerrado")
+        self.iniciar()
+        timeout = self.timeout if timeout is None else timeout
+        # Con el tiempo límite en la clave cada interesado recibe el de su propia petición
+        clave = self.crear_clave(tarea, argumentos) + (timeout,)
+        with self._cerrojo:
+            principal = self._en_vuelo.get(clave)
+            if principal is None:
+                principal = Future()
+                principal.set_running_or_notify_cancel()
+                self._en_vuelo[clave] = principal
+                self._cola.append((principal, tarea, argumentos, timeout))
+                agrupada = False
+            else:
+                self.agrupadas += 1
+                agrupada = True
+        CACHE.inc(cache='en_vuelo', resultado='acierto' if agrupada else 'fallo')
+
+        if not agrupada:
+            principal.add_done_callback(lambda _, c=clave: self._fin_en_vuelo(c))
+            principal.add_done_callback(lambda f: TRABAJOS.inc(estado=f.result().get('estado')))
+            self._despertar_w.send_bytes(b'')
+
+        # Cada interesado recibe su propio Future (y su propia copia del registro)
+        futuro = Future()
+        futuro.set_running_or_notify_cancel()
+
+        def copiar(terminado):
+            registro = dict(terminado.result())
+            if self._misma_forma(argumentos, registro):
+                for campo in ('funcion', 'variable'):
+                    # El texto tal como lo escribió este cliente; otras tareas pueden usar
+                    # esos nombres para sus datos (las muestras de /grafico), que no se tocan
+                    if campo in argumentos and isinstance(registro.get(campo, ''), str):
+                        registro[campo] = argumentos[campo]
+            else:
+                # Agrupada con una forma equivalente: el registro (pasos, expresión) es
+                # el de esa forma, y 'entrada' dice lo que escribió este cliente
+                registro['entrada'] = argumentos['funcion']
+            if agrupada:
+                registro['agrupada'] = True
+            futuro.set_result(registro)
+
+        principal.add_done_callback(copiar)
+        return futuro
+
+    @staticmethod
+    def crear_clave(tarea, argumentos):
+        """Clave de una petición: tarea + argumentos, con la función por su clave
+        canónica, de modo que "x*(x+1)" y "x**2+x" esperan al mismo cálculo. El
+        parser seguro tiene límites de tamaño, así que parsear aquí no cuelga al
+        que envía; si la función no se puede interpretar, cuenta su texto
+        normalizado (el proceso responderá con el error)."""
+        argumentos = dict(argumentos)
+        funcion = None
+        if isinstance(argumentos.get('funcion'), str):
+            texto = normalizar_entrada(argumentos.pop('funcion'), argumentos.get('variable', 'x'))
+            argumentos['variable'] = texto[1]
+            try:
+                funcion = clave_de_entrada(*texto)
+            except Exception:
+                funcion = texto
+        return (tarea.__module__, tarea.__qualname__, funcion,
+                json.dumps(argumentos, sort_keys=True, default=str))
+
+    @staticmethod
+    def _misma_forma(argumentos, registro):
+        """True si el registro es de la forma que escribió este cliente (o no es de
+        una función escrita)"""
+        funcion = registro.get('funcion')
+        if not isinstance(argumentos.get('funcion'), str) or not isinstance(funcion, str):
+            return True
+        variable = argumentos.get('variable', 'x')
+        return normalizar_entrada(argumentos['funcion'], variable) == normalizar_entrada(funcion, variable)
+
+    def _fin_en_vuelo(self, clave):
+        """Olvidar el cálculo terminado: la siguiente petición igual vuelve a encolarse"""
+        with self._cerrojo:
+            self._en_vuelo.pop(clave, None)
+
+    def pendientes(self):
+        """Trabajos encolados que aún no tienen proceso asignado"""
+        return len(self._cola)
+
+    def listos(self):
+        """Procesos que ya terminaron de calentarse y aceptan trabajos"""
+        return sum(t.listo for t in self._trabajadores)
+
+    def cerrar(self):
+        """Detener el despachador y los procesos; los trabajos pendientes se descartan"""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        if self._hilo is not None:
+            self._despertar_w.send_bytes(b'')
+            self._hilo.join()
+        for futuro, _, argumentos, _ in self._cola:
+            futuro.set_result(self._registro_fallo(argumentos, 'cancelado', 'El pool se cerró'))
+        self._cola.clear()
+        for trabajador in self._trabajadores:
+            if trabajador.trabajo is not None:
+                futuro, argumentos, _, _ = trabajador.trabajo
+                futuro.set_result(self._registro_fallo(argumentos, 'cancelado', 'El pool se cerró'))
+            trabajador.detener(forzar=trabajador.trabajo is not None)
+        self._trabajadores = []
+        registro_lentas = slow_log.activo()
+        if registro_lentas is not None:
+            registro_lentas.esperar(ESPERA_CAPTURAS)  # las de timeouts, lanzadas desde aquí
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    @staticmethod
+    def _registro_fallo(argumentos, estado, error):
+        """Registro para una entrada que no produjo solución"""
+        return {'funcion': argumentos.get('funcion'), 'variable': argumentos.get('variable'),
+                'estado': estado, 'error': error}
+
+    def _asignar(self):
+        """Dar un trabajo de la cola a cada proceso listo y libre"""
+        if self._error_inicio is not None:
+            with self._cerrojo:
+                fallidos, self._cola = list(self._cola), collections.deque()
+            for futuro, _, argumentos, _ in fallidos:
+                futuro.set_result(self._registro_fallo(argumentos, 'error', self._error_inicio))
+            return
+        for trabajador in self._trabajadores:
+            if not trabajador.listo or trabajador.trabajo is not None:
+                continue
+            with self._cerrojo:
+                if not self._cola:
+                    return
+                futuro, tarea, argumentos, timeout = self._cola.popleft()
+            inicio = time.perf_counter()
+            trabajador.trabajo = (futuro, argumentos, inicio, inicio + timeout)
+            trabajador.conexion.send((tarea, argumentos))
+
+    def _reemplazar(self, trabajador):
+        """Matar un proceso colgado o caído y lanzar otro en su lugar"""
+        trabajador.detener(forzar=True)
+        nuevo = _Proceso(self._contexto, self.soluciones_por_proceso)
+        self._trabajadores[self._trabajadores.index(trabajador)] = nuevo
+
+    def _despachar(self):
+        """Hilo despachador: asigna trabajos, recoge resultados y aplica los tiempos límite"""
+        while not self._cerrado:
+            self._asignar()
+            ahora = time.perf_counter()
+            limites = [t.trabajo[3] for t in self._trabajadores if t.trabajo is not None]
+            espera = max(0.0, min(limites) - ahora) if limites else None
+
+            conexiones = [t.conexion for t in self._trabajadores] + [self._despertar_r]
+            for conexion in wait(conexiones, timeout=espera):
+                if conexion is self._despertar_r:
+                    self._despertar_r.recv_bytes()
+                    continue
+                trabajador = next((t for t in self._trabajadores if t.conexion is conexion), None)
+                if trabajador is None:
+                    continue
+                try:
+                    mensaje, dato = conexion.recv()
+                except (EOFError, OSError):
+                    if not trabajador.listo:
+                        # Falla al importar/calentar: reintentar solo repetiría el error
+                        self._error_inicio = 'No se pudo iniciar el proceso trabajador'
+                        trabajador.detener(forzar=True)
+                        self._trabajadores.remove(trabajador)
+                        continue
+                    if trabajador.trabajo is not None:
+                        futuro, argumentos, _, _ = trabajador.trabajo
+                        futuro.set_result(self._registro_fallo(
+                            argumentos, 'error', 'El proceso trabajador terminó'))
+                    self._reemplazar(trabajador)
+                    continue
+                if mensaje == 'listo':
+                    trabajador.listo = True
+                    continue
+                futuro, argumentos, inicio, _ = trabajador.trabajo
+                trabajador.trabajo = None
+                REGISTRO.fusionar(dato.pop('metricas', None))
+                for clave in ('funcion', 'variable'):
+                    if clave in argumentos:
+                        dato.setdefault(clave, argumentos[clave])
+                dato['segundos'] = time.perf_counter() - inicio
+                futuro.set_result(dato)
+
+            ahora = time.perf_counter()
+            for trabajador in list(self._trabajadores):
+                if trabajador.trabajo is not None and ahora >= trabajador.trabajo[3]:
+                    futuro, argumentos, inicio, _ = trabajador.trabajo
+                    registro = self._registro_fallo(
+                        argumentos, 'timeout',
+                        f"Se superó el tiempo límite ({ahora - inicio:.1f} s)")
+                    registro['segundos'] = ahora - inicio
+                    trabajador.trabajo = None
+                    self._reemplazar(trabajador)
+                    futuro.set_result(registro)
+                    registro_lentas = slow_log.activo()
+                    if registro_lentas is not None and 'funcion' in argumentos:
+                        # El proceso ya no existe: la captura la lanza el pool
+                        registro_lentas.registrar_timeout(
+                            argumentos['funcion'], argumentos.get('variable', 'x'), ahora - inicio)
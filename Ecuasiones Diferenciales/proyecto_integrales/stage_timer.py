@@ -0,0 +1,96 @@
+"""
+Tiempos por etapa de una resolución: parseo, clasificación, llamadas a SymPy,
+LaTeX, rasterizado y creación de widgets
+"""
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+
+_activo = contextvars.ContextVar('stage_timer_activo', default=None)
+
+# Orden de presentación; 'resolver' incluye factor, integrate, diff y latex
+ETAPAS = ('parsear', 'clasificar', 'resolver', 'factor', 'integrate', 'diff', 'latex',
+          'rasterizar', 'widgets')
+SUBETAPAS_RESOLVER = ('factor', 'integrate', 'diff', 'latex')
+
+
+class StageTimer:
+    """Segundos y número de llamadas acumulados por etapa.
+
+    Mientras está activo (`with timer.activo():`) en un hilo, las funciones
+    envueltas con `cronometrada` y los bloques `medir(...)` de ese hilo suman
+    a él; sin timer activo no miden nada.
+    """
+
+    def __init__(self, segundos=None, llamadas=None):
+        self.segundos = segundos if segundos is not None else {}
+        self.llamadas = llamadas if llamadas is not None else {}
+
+    def sumar(self, etapa, segundos):
+        """Acumular una medición de `etapa`"""
+        self.segundos[etapa] = self.segundos.get(etapa, 0.0) + segundos
+        self.llamadas[etapa] = self.llamadas.get(etapa, 0) + 1
+
+    def acumular(self, segundos, llamadas=None):
+        """Sumar mediciones ya hechas (p. ej. las de un registro serializado)"""
+        llamadas = llamadas or {}
+        for etapa, valor in segundos.items():
+            self.segundos[etapa] = self.segundos.get(etapa, 0.0) + valor
+            self.llamadas[etapa] = self.llamadas.get(etapa, 0) + llamadas.get(etapa, 1)
+
+    @contextmanager
+    def etapa(self, nombre):
+        """Medir el bloque como `nombre` en este timer, esté activo o no"""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.sumar(nombre, time.perf_counter() - inicio)
+
+    @contextmanager
+    def activo(self):
+        """Hacer de este timer el destino de las mediciones del hilo actual"""
+        token = _activo.set(self)
+        try:
+            yield self
+        finally:
+            _activo.reset(token)
+
+    def limpiar(self):
+        """Olvidar todas las mediciones"""
+        self.segundos.clear()
+        self.llamadas.clear()
+
+    def registros(self, **contexto):
+        """Una fila por etapa, en orden de presentación, para salidas estructuradas"""
+        orden = [e for e in ETAPAS if e in self.segundos]
+        orden += sorted(e for e in self.segundos if e not in ETAPAS)
+        return [dict(contexto, etapa=e, segundos=self.segundos[e], llamadas=self.llamadas.get(e, 0))
+                for e in orden]
+
+
+@contextmanager
+def medir(etapa):
+    """Medir el bloque en el timer activo del hilo (sin timer, no hace nada)"""
+    timer = _activo.get()
+    if timer is None:
+        yield
+        return
+    with timer.etapa(etapa):
+        yield
+
+
+def cronometrada(etapa, funcion):
+    """Envolver `funcion` para que cada llamada sume su tiempo a `etapa`"""
+    @functools.wraps(funcion)
+    def envoltura(*args, **kwargs):
+        timer = _activo.get()
+        if timer is None:
+            return funcion(*args, **kwargs)
+        inicio = time.perf_counter()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            timer.sumar(etapa, time.perf_counter() - inicio)
+    return envoltura
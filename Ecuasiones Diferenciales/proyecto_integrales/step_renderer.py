@@ -1,231 +1,515 @@
-"""
-Clase especializada para renderizar pasos matemáticos con LaTeX
-"""
-import tkinter as tk
-from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-from io import BytesIO
-from PIL import Image, ImageTk
-from sympy import *
-
-class StepRenderer:
-    """Clase especializada para renderizar pasos matemáticos con LaTeX"""
-    
-    def __init__(self, root):
-        self.root = root
-        self._img_cache = []  # cache para imágenes LaTeX
-    
-    def _latex_to_photoimage(self, latex_str, dpi=150, fontsize=14, pad=0.03):
-        """Convierte LaTeX a imagen PhotoImage para Tkinter"""
-        try:
-            fig = plt.figure(figsize=(0.01, 0.01), dpi=dpi)
-            fig.patch.set_alpha(0)
-            if not (latex_str.strip().startswith("$") and latex_str.strip().endswith("$")):
-                latex_str = f"${latex_str}$"
-            txt = fig.text(0, 0, latex_str, fontsize=fontsize, color='white')
-            fig.canvas.draw()
-            bbox = txt.get_window_extent()
-            w, h = bbox.width / dpi, bbox.height / dpi
-            fig.set_size_inches(w + 2*pad, h + 2*pad)
-            txt.set_position((pad, pad))
-            buf = BytesIO()
-            fig.savefig(buf, format="png", dpi=dpi, transparent=True,
-                        bbox_inches='tight', pad_inches=0.0, facecolor='none')
-            plt.close(fig)
-            buf.seek(0)
-            img = Image.open(buf)
-            return ImageTk.PhotoImage(img)
-        except Exception as e:
-            print(f"Error renderizando LaTeX: {e}")
-            return None
-    
-    def crear_panel_resultados(self, parent):
-        """Panel de resultados paso a paso con LaTeX y scroll horizontal"""
-        result_frame = tk.Frame(parent, bg='#21262d', relief='solid', bd=1)
-        result_frame.pack(side='right', fill='both', expand=True)
-        result_frame.configure(width=450)
-
-        tk.Label(result_frame, text="📋 Solución Paso a Paso",
-                 font=("Segoe UI", 14, "bold"),
-                 fg='#f0f6fc', bg='#21262d').pack(pady=8)
-
-        # Crear un frame para el canvas y scrollbars
-        canvas_container = tk.Frame(result_frame, bg='#21262d')
-        canvas_container.pack(fill='both', expand=True, padx=10, pady=(0, 10))
-
-        # Canvas principal
-        self.steps_canvas = tk.Canvas(canvas_container, bg='#0d1117', highlightthickness=0)
-        
-        # Scrollbars - vertical a la derecha, horizontal abajo
-        v_scrollbar = ttk.Scrollbar(canvas_container, orient='vertical', command=self.steps_canvas.yview)
-        h_scrollbar = ttk.Scrollbar(result_frame, orient='horizontal', command=self.steps_canvas.xview)
-        
-        # Frame interno
-        self.steps_inner = tk.Frame(self.steps_canvas, bg='#0d1117')
-
-        # Configurar scroll
-        def configure_scroll_region(event):
-            # Actualizar la región de scroll para incluir todo el contenido
-            self.steps_canvas.update_idletasks()
-            bbox = self.steps_canvas.bbox("all")
-            if bbox:
-                self.steps_canvas.configure(scrollregion=bbox)
-                # Asegurar que el contenido interno tenga el ancho correcto
-                content_width = bbox[2] - bbox[0]
-                canvas_width = self.steps_canvas.winfo_width()
-                if content_width > canvas_width:
-                    self.steps_canvas.itemconfig(self.canvas_window, width=content_width)
-                else:
-                    self.steps_canvas.itemconfig(self.canvas_window, width=canvas_width)
-
-        self.steps_inner.bind("<Configure>", configure_scroll_region)
-        
-        # Crear ventana en canvas
-        self.canvas_window = self.steps_canvas.create_window((0, 0), window=self.steps_inner, anchor="nw")
-        
-        # Configurar scrollbars
-        self.steps_canvas.configure(yscrollcommand=v_scrollbar.set, xscrollcommand=h_scrollbar.set)
-        
-        # Configurar redimensionado
-        def configure_canvas_width(event):
-            canvas_width = self.steps_canvas.winfo_width()
-            if canvas_width > 1:  # Evitar division por cero
-                # Obtener el ancho del contenido
-                bbox = self.steps_canvas.bbox("all")
-                if bbox:
-                    content_width = bbox[2] - bbox[0]
-                    # Usar el mayor entre el ancho del canvas y el contenido
-                    final_width = max(canvas_width, content_width)
-                    self.steps_canvas.itemconfig(self.canvas_window, width=final_width)
-                else:
-                    self.steps_canvas.itemconfig(self.canvas_window, width=canvas_width)
-                # Actualizar la región de scroll
-                self.steps_canvas.configure(scrollregion=self.steps_canvas.bbox("all"))
-
-        self.steps_canvas.bind("<Configure>", configure_canvas_width)
-        
-        # Empaquetar widgets correctamente
-        # Canvas y scrollbar vertical en su contenedor
-        self.steps_canvas.pack(side='left', fill='both', expand=True)
-        v_scrollbar.pack(side='right', fill='y')
-        
-        # Scrollbar horizontal en el frame principal (abajo)
-        h_scrollbar.pack(side='bottom', fill='x')
-        
-        # Empaquetar el contenedor del canvas
-        canvas_container.pack(fill='both', expand=True)
-        
-        # Configurar el scroll horizontal para que funcione correctamente
-        def on_mousewheel(event):
-            # Scroll horizontal con Shift + rueda del mouse
-            if event.state & 0x1:  # Shift key
-                self.steps_canvas.xview_scroll(int(-1*(event.delta/120)), "units")
-            else:
-                self.steps_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
-        
-        # Bind mousewheel para scroll
-        self.steps_canvas.bind("<MouseWheel>", on_mousewheel)
-        self.steps_inner.bind("<MouseWheel>", on_mousewheel)
-        
-        # Función para actualizar scroll después de agregar contenido
-        def update_scroll():
-            self.steps_canvas.update_idletasks()
-            bbox = self.steps_canvas.bbox("all")
-            if bbox:
-                self.steps_canvas.configure(scrollregion=bbox)
-                # Asegurar que el contenido tenga el ancho correcto
-                content_width = bbox[2] - bbox[0]
-                canvas_width = self.steps_canvas.winfo_width()
-                if content_width > canvas_width:
-                    self.steps_canvas.itemconfig(self.canvas_window, width=content_width)
-                else:
-                    self.steps_canvas.itemconfig(self.canvas_window, width=canvas_width)
-        
-        self.update_scroll = update_scroll
-        
-        return result_frame
-    
-    def mostrar_pasos_detallados(self, pasos, resultado, funcion_str, variable_str):
-        """Mostrar los pasos con formato profesional y LaTeX con fuentes más pequeñas"""
-        # Limpia pasos previos
-        for w in self.steps_inner.winfo_children():
-            w.destroy()
-        self._img_cache.clear()
-
-        header = tk.Label(self.steps_inner, text="SOLUCIÓN PASO A PASO",
-                          font=("Segoe UI", 12, "bold"), fg='#58a6ff', bg='#0d1117')
-        header.pack(anchor='w', pady=(0, 6))
-
-        for paso in pasos:
-            card = tk.Frame(self.steps_inner, bg='#0d1117',
-                            highlightbackground='#30363d', highlightthickness=1)
-            card.pack(fill='x', padx=2, pady=4)
-
-            tk.Label(card, text=paso.get('titulo', ''), font=("Segoe UI", 9, "bold"),
-                     fg='#f0f6fc', bg='#0d1117').pack(anchor='w', padx=6, pady=(6, 2))
-
-            # Fórmula - Priorizar LaTeX si está disponible
-            formula_latex = paso.get('formula_latex')
-            formula_text = paso.get('formula')
-            if formula_latex:
-                img = self._latex_to_photoimage(formula_latex, fontsize=12)
-                if img:
-                    label_img = tk.Label(card, image=img, bg='#0d1117')
-                    label_img.pack(anchor='w', padx=8, pady=3)
-                    self._img_cache.append(img)
-                else:
-                    # Fallback a texto si LaTeX falla
-                    tk.Label(card, text=formula_text or formula_latex, font=("Consolas", 9),
-                             fg='#fbbf24', bg='#0d1117', wraplength=400).pack(anchor='w', padx=8, pady=3)
-            elif formula_text:
-                tk.Label(card, text=formula_text, font=("Consolas", 9),
-                         fg='#fbbf24', bg='#0d1117', wraplength=400).pack(anchor='w', padx=8, pady=3)
-
-            # Explicación
-            if paso.get('explicacion'):
-                tk.Label(card, text="💡 " + paso['explicacion'],
-                         font=("Segoe UI", 8), fg='#9ca3af', bg='#0d1117',
-                         wraplength=400, justify='left').pack(anchor='w', padx=8, pady=(0, 6))
-
-        # Resultado final
-        if resultado is not None:
-            try:
-                x = Symbol(variable_str)
-                f = parse_expr(funcion_str)
-                res_ltx = latex(Integral(f, x)) + "=" + latex(resultado) + "+C"
-            except Exception:
-                res_ltx = None
-
-            card = tk.Frame(self.steps_inner, bg='#0d1117',
-                            highlightbackground='#10b981', highlightthickness=2)
-            card.pack(fill='x', padx=2, pady=8)
-            tk.Label(card, text="🏆 RESULTADO FINAL",
-                     font=("Segoe UI", 10, "bold"),
-                     fg='#10b981', bg='#0d1117').pack(anchor='w', padx=6, pady=(6, 2))
-
-            if res_ltx:
-                img = self._latex_to_photoimage(res_ltx, fontsize=11)
-                if img:
-                    label_img = tk.Label(card, image=img, bg='#0d1117')
-                    label_img.pack(anchor='w', padx=8, pady=6)
-                    self._img_cache.append(img)
-                else:
-                    # Fallback a texto
-                    tk.Label(card, text=f"∫ {funcion_str} dx = {resultado} + C",
-                             font=("Consolas", 9), fg='#10b981', bg='#0d1117', 
-                             wraplength=400).pack(anchor='w', padx=8, pady=6)
-            else:
-                tk.Label(card, text=f"∫ {funcion_str} dx = {resultado} + C",
-                         font=("Consolas", 9), fg='#10b981', bg='#0d1117',
-                         wraplength=400).pack(anchor='w', padx=8, pady=6)
-        
-        # Actualizar el scroll después de mostrar todos los pasos
-        self.root.after(100, self.update_scroll)
-    
-    def limpiar_pasos(self):
-        """Limpiar todos los pasos mostrados"""
-        for w in self.steps_inner.winfo_children():
-            w.destroy()
-        self._img_cache.clear()
+"""
+Clase especializada para renderizar pasos matemáticos con LaTeX
+"""
+import bisect
+import tkinter as tk
+from tkinter import ttk
+from sympy import Integral, Symbol, latex
+
+from image_cache import LatexImageCache
+from metrics import RASTERIZADO, RECURSOS
+from raster_pool import RasterPool
+from safe_parser import parsear_expresion
+from stage_timer import SUBETAPAS_RESOLVER, StageTimer
+
+class StepRenderer:
+    """Clase especializada para renderizar pasos matemáticos con LaTeX.
+
+    La lista de pasos está virtualizada: solo existen los widgets de las
+    tarjetas que intersectan la zona visible del canvas (más un margen).
+    """
+
+    OVERSCAN = 400  # píxeles materializados por encima y por debajo de la vista
+
+    def __init__(self, root):
+        self.root = root
+        self.latex_cache = LatexImageCache()  # LRU de imágenes ya rasterizadas
+        self.raster_pool = RasterPool()  # procesos que rasterizan las fórmulas
+        self._pendientes = []  # (futuro, label provisional, clave de caché)
+        self._sondeo_id = None
+        self.artefacto = None  # SolutionArtifact de la solución mostrada
+        self.etapas = StageTimer()  # tiempos de presentación de la solución mostrada
+        self._diagnostico_abierto = False
+        self.memoria = None  # MemoryGovernor de la aplicación, si lo hay
+
+        # Estado de la lista virtualizada
+        self._items = []       # descripción de cada tarjeta (encabezado, paso, resultado)
+        self._alturas = []     # altura (estimada o medida) de cada tarjeta
+        self._offsets = [0]    # posición vertical acumulada de cada tarjeta
+        self._visibles = {}    # índice -> (frame, id de ventana en el canvas)
+        self._ancho_contenido = 0
+        self._actualizacion_id = None
+
+    def _latex_to_photoimage(self, latex_str, dpi=150, fontsize=14, pad=0.03, color='white'):
+        """Convierte LaTeX a imagen PhotoImage para Tkinter (con caché LRU)"""
+        clave = LatexImageCache.crear_clave(latex_str, dpi, fontsize, color)
+        img = self.latex_cache.obtener(clave)
+        if img is not None:
+            return img
+        try:
+            # matplotlib y PIL se cargan con la primera fórmula, no al abrir la ventana
+            from mathtext_raster import rasterizar_rgba, rgba_a_photoimage
+            with self.etapas.etapa('rasterizar'), RASTERIZADO.cronometrar():
+                ancho, alto, datos = rasterizar_rgba(latex_str, dpi, fontsize, color, pad)
+                img = rgba_a_photoimage(ancho, alto, datos)
+            self.latex_cache.guardar(clave, img, len(datos))
+            return img
+        except Exception as e:
+            print(f"Error renderizando LaTeX: {e}")
+            RECURSOS.inc(tipo='formula_como_texto')
+            return None
+
+    def crear_panel_resultados(self, parent):
+        """Panel de resultados paso a paso con LaTeX y scroll horizontal"""
+        result_frame = tk.Frame(parent, bg='#21262d', relief='solid', bd=1)
+        result_frame.pack(side='right', fill='both', expand=True)
+        result_frame.configure(width=450)
+
+        tk.Label(result_frame, text="📋 Solución Paso a Paso",
+                 font=("Segoe UI", 14, "bold"),
+                 fg='#f0f6fc', bg='#21262d').pack(pady=8)
+
+        # Crear un frame para el canvas y scrollbars
+        canvas_container = tk.Frame(result_frame, bg='#21262d')
+        canvas_container.pack(fill='both', expand=True, padx=10, pady=(0, 10))
+
+        # Canvas principal: cada tarjeta visible es una ventana propia del canvas
+        self.steps_canvas = tk.Canvas(canvas_container, bg='#0d1117', highlightthickness=0)
+
+        # Scrollbars - vertical a la derecha, horizontal abajo
+        v_scrollbar = ttk.Scrollbar(canvas_container, orient='vertical', command=self.steps_canvas.yview)
+        h_scrollbar = ttk.Scrollbar(result_frame, orient='horizontal', command=self.steps_canvas.xview)
+
+        # Cada desplazamiento vertical recalcula qué tarjetas deben existir
+        def on_yscroll(first, last):
+            v_scrollbar.set(first, last)
+            self._programar_actualizacion()
+
+        self.steps_canvas.configure(yscrollcommand=on_yscroll, xscrollcommand=h_scrollbar.set)
+        self.steps_canvas.bind("<Configure>", lambda event: self._programar_actualizacion())
+
+        # Empaquetar widgets correctamente
+        # Canvas y scrollbar vertical en su contenedor
+        self.steps_canvas.pack(side='left', fill='both', expand=True)
+        v_scrollbar.pack(side='right', fill='y')
+
+        # Scrollbar horizontal en el frame principal (abajo)
+        h_scrollbar.pack(side='bottom', fill='x')
+
+        # Empaquetar el contenedor del canvas
+        canvas_container.pack(fill='both', expand=True)
+
+        # Bind mousewheel para scroll
+        self.steps_canvas.bind("<MouseWheel>", self._on_mousewheel)
+
+        return result_frame
+
+    def _on_mousewheel(self, event):
+        """Scroll vertical con la rueda; horizontal con Shift + rueda"""
+        if event.state & 0x1:  # Shift key
+            self.steps_canvas.xview_scroll(int(-1*(event.delta/120)), "units")
+        else:
+            self.steps_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+
+    # === Lista virtualizada ===
+
+    def _estimar_altura(self, item):
+        """Altura aproximada de una tarjeta antes de materializarla"""
+        if item['clase'] == 'encabezado':
+            return 30
+        if item['clase'] == 'resultado':
+            return 80
+        paso = item['paso']
+        altura = 34  # título + bordes + márgenes
+        if paso.get('formula_latex'):
+            altura += 40
+        elif paso.get('formula'):
+            altura += 20 * (1 + len(str(paso['formula'])) // 60)
+        if paso.get('explicacion'):
+            altura += 18 * (1 + len(paso['explicacion']) // 70)
+        return altura
+
+    def _margen(self, item):
+        """Margen vertical (arriba, abajo) de cada clase de tarjeta"""
+        return {'encabezado': (0, 6), 'resultado': (8, 8)}.get(item['clase'], (4, 4))
+
+    def _recalcular_offsets(self):
+        """Recalcular posiciones acumuladas y la región de scroll"""
+        self._offsets = [0]
+        for altura in self._alturas:
+            self._offsets.append(self._offsets[-1] + altura)
+        ancho = max(self._ancho_contenido, self.steps_canvas.winfo_width())
+        self.steps_canvas.configure(scrollregion=(0, 0, ancho, self._offsets[-1]))
+
+    def _programar_actualizacion(self):
+        """Agrupar varias peticiones de actualización en una sola"""
+        if self._actualizacion_id is None:
+            self._actualizacion_id = self.root.after_idle(self._actualizar_visibles)
+
+    def _actualizar_visibles(self):
+        """Materializar las tarjetas en la zona visible y destruir las demás"""
+        # _actualizacion_id sigue ocupado durante la pasada: update_idletasks()
+        # no debe volver a entrar aquí
+        try:
+            cambio = self._actualizar_visibles_una_pasada()
+        finally:
+            self._actualizacion_id = None
+        if cambio:
+            self._programar_actualizacion()
+
+    def _actualizar_visibles_una_pasada(self):
+        """Una pasada de virtualización; devuelve True si cambió alguna altura"""
+        if not self._items:
+            return False
+        canvas = self.steps_canvas
+        arriba = canvas.canvasy(0) - self.OVERSCAN
+        abajo = canvas.canvasy(0) + canvas.winfo_height() + self.OVERSCAN
+        primero = max(0, bisect.bisect_right(self._offsets, arriba) - 1)
+        ultimo = min(len(self._items), bisect.bisect_left(self._offsets, abajo))
+        rango = set(range(primero, ultimo))
+
+        for indice in list(self._visibles):
+            if indice not in rango:
+                self._destruir_tarjeta(indice)
+
+        nuevas = [i for i in sorted(rango) if i not in self._visibles]
+        for indice in nuevas:
+            self._materializar_tarjeta(indice)
+
+        if self._visibles:
+            canvas.update_idletasks()
+        if self._medir_visibles():
+            self._recalcular_offsets()
+            self._reposicionar_visibles()
+            return True
+        return False
+
+    def _materializar_tarjeta(self, indice):
+        """Crear los widgets de una tarjeta y colocarla en el canvas"""
+        item = self._items[indice]
+        with self.etapas.etapa('widgets'):
+            frame = tk.Frame(self.steps_canvas, bg='#0d1117')
+            if item['clase'] == 'encabezado':
+                self._construir_encabezado(frame)
+            elif item['clase'] == 'resultado':
+                self._construir_resultado(frame, item)
+            else:
+                self._construir_paso(frame, item['paso'])
+
+            for widget in [frame] + frame.winfo_children():
+                widget.bind("<MouseWheel>", self._on_mousewheel)
+
+        margen_sup = self._margen(item)[0]
+        ventana = self.steps_canvas.create_window(
+            2, self._offsets[indice] + margen_sup, window=frame, anchor='nw',
+            width=max(self.steps_canvas.winfo_width() - 4, 1))
+        self._visibles[indice] = (frame, ventana)
+
+    def _destruir_tarjeta(self, indice):
+        """Eliminar los widgets de una tarjeta fuera de la vista"""
+        frame, ventana = self._visibles.pop(indice)
+        self.steps_canvas.delete(ventana)
+        frame.destroy()
+
+    def _medir_visibles(self):
+        """Sustituir alturas estimadas por las reales; devuelve True si alguna cambió"""
+        cambio = False
+        ancho_canvas = max(self.steps_canvas.winfo_width() - 4, 1)
+        for indice, (frame, ventana) in self._visibles.items():
+            margen_sup, margen_inf = self._margen(self._items[indice])
+            altura = frame.winfo_reqheight() + margen_sup + margen_inf
+            if altura != self._alturas[indice]:
+                self._alturas[indice] = altura
+                cambio = True
+            ancho = frame.winfo_reqwidth()
+            if ancho > self._ancho_contenido:
+                self._ancho_contenido = ancho
+                cambio = True
+            self.steps_canvas.itemconfig(ventana, width=max(ancho_canvas, self._ancho_contenido))
+        return cambio
+
+    def _reposicionar_visibles(self):
+        """Mover las ventanas visibles a sus posiciones actualizadas"""
+        for indice, (_, ventana) in self._visibles.items():
+            margen_sup = self._margen(self._items[indice])[0]
+            self.steps_canvas.coords(ventana, 2, self._offsets[indice] + margen_sup)
+
+    def _reiniciar_lista(self, items):
+        """Reemplazar el contenido completo de la lista virtualizada"""
+        self._cancelar_pendientes()
+        for indice in list(self._visibles):
+            self._destruir_tarjeta(indice)
+        self._items = items
+        self._alturas = [self._estimar_altura(item) for item in items]
+        self._ancho_contenido = 0
+        self._recalcular_offsets()
+        self.steps_canvas.xview_moveto(0)
+        self.steps_canvas.yview_moveto(0)
+        self._programar_actualizacion()
+
+    def _insertar_items(self, posicion, items):
+        """Insertar tarjetas sin tocar las existentes (solo se desplazan)"""
+        n = len(items)
+        self._visibles = {(i + n if i >= posicion else i): v for i, v in self._visibles.items()}
+        self._items[posicion:posicion] = items
+        self._alturas[posicion:posicion] = [self._estimar_altura(item) for item in items]
+        self._recalcular_offsets()
+        self._reposicionar_visibles()
+        self._programar_actualizacion()
+
+    def _eliminar_items(self, posicion, n=1):
+        """Eliminar tarjetas; solo se destruyen los widgets de las afectadas"""
+        for indice in range(posicion, posicion + n):
+            if indice in self._visibles:
+                self._destruir_tarjeta(indice)
+        self._visibles = {(i - n if i >= posicion else i): v for i, v in self._visibles.items()}
+        del self._items[posicion:posicion + n]
+        del self._alturas[posicion:posicion + n]
+        self._recalcular_offsets()
+        self._reposicionar_visibles()
+        self._programar_actualizacion()
+
+    def _tiene_resultado(self):
+        """True si la última tarjeta es la del resultado final"""
+        return bool(self._items) and self._items[-1]['clase'] == 'resultado'
+
+    # === Actualizaciones incrementales ===
+
+    def agregar_pasos(self, pasos):
+        """Añadir pasos al final de la solución (antes del resultado final, si lo hay)"""
+        items = [{'clase': 'paso', 'paso': paso} for paso in pasos]
+        if not self._items:
+            items.insert(0, {'clase': 'encabezado'})
+        posicion = len(self._items) - 1 if self._tiene_resultado() else len(self._items)
+        self._insertar_items(posicion, items)
+
+    def reemplazar_paso(self, indice, paso):
+        """Reemplazar el paso número `indice` (desde 0); solo se rehace su tarjeta"""
+        posicion = indice + 1  # La tarjeta 0 es el encabezado
+        if posicion in self._visibles:
+            self._destruir_tarjeta(posicion)
+        self._items[posicion] = {'clase': 'paso', 'paso': paso}
+        self._alturas[posicion] = self._estimar_altura(self._items[posicion])
+        self._recalcular_offsets()
+        self._reposicionar_visibles()
+        self._programar_actualizacion()
+
+    def eliminar_paso(self, indice):
+        """Eliminar el paso número `indice` (desde 0)"""
+        self._eliminar_items(indice + 1)
+
+    def quitar_resultado(self):
+        """Quitar la tarjeta de resultado final, si existe"""
+        if self._tiene_resultado():
+            self._eliminar_items(len(self._items) - 1)
+
+    # === Construcción de tarjetas ===
+
+    def _construir_encabezado(self, frame):
+        """Encabezado de la solución, con el diagnóstico de tiempos plegable"""
+        tk.Label(frame, text="SOLUCIÓN PASO A PASO",
+                 font=("Segoe UI", 12, "bold"), fg='#58a6ff', bg='#0d1117').pack(anchor='w')
+        if self.artefacto is None or not self.artefacto.tiempos:
+            return
+
+        total = self._total_diagnostico()
+        flecha = '▾' if self._diagnostico_abierto else '▸'
+        boton = tk.Label(frame, text=f"{flecha} ⏱ Diagnóstico: {total * 1000:.0f} ms",
+                         font=("Segoe UI", 8), fg='#8b949e', bg='#0d1117', cursor='hand2')
+        boton.pack(anchor='w', pady=(2, 0))
+        boton.bind("<Button-1>", lambda e: self._alternar_diagnostico())
+        if self._diagnostico_abierto:
+            tk.Label(frame, text=self._texto_diagnostico(), font=("Consolas", 8),
+                     fg='#9ca3af', bg='#161b22', justify='left',
+                     padx=8, pady=4).pack(anchor='w', fill='x', pady=(2, 0))
+
+    def _total_diagnostico(self):
+        """Segundos de cálculo y de presentación de la solución mostrada"""
+        calculo = self.artefacto.tiempos
+        presentacion = self.etapas.segundos
+        return (sum(calculo.get(e, 0.0) for e in ('parsear', 'clasificar', 'resolver'))
+                + sum(presentacion.values()))
+
+    def _texto_diagnostico(self):
+        """Tabla de tiempos: etapas del cálculo (con las llamadas a SymPy) y de la presentación"""
+        calculo, llamadas = self.artefacto.tiempos, self.artefacto.etapas.llamadas
+
+        def fila(nombre, segundos, n=None, sangria=''):
+            veces = f" ×{n}" if n and n > 1 else ''
+            return f"{sangria}{nombre:<{16 - len(sangria)}}{segundos * 1000:9.1f} ms{veces}"
+
+        filas = ['CÁLCULO']
+        for etapa in ('parsear', 'clasificar', 'resolver'):
+            if etapa in calculo:
+                filas.append(fila(etapa, calculo[etapa]))
+        if 'resolver' in calculo:
+            medido = 0.0
+            for etapa in SUBETAPAS_RESOLVER:
+                if etapa in calculo:
+                    medido += calculo[etapa]
+                    filas.append(fila(etapa, calculo[etapa], llamadas.get(etapa), '  · '))
+            filas.append(fila('resto', max(0.0, calculo['resolver'] - medido), sangria='  · '))
+        filas.append('PRESENTACIÓN')
+        for etapa, segundos in self.etapas.segundos.items():
+            filas.append(fila(etapa, segundos, self.etapas.llamadas.get(etapa)))
+        if self.memoria is not None:
+            filas.append('MEMORIA')
+            filas.extend(self.memoria.resumen())
+        return '\n'.join(filas)
+
+    def _alternar_diagnostico(self):
+        """Abrir o plegar el diagnóstico (se rehace solo la tarjeta del encabezado)"""
+        self._diagnostico_abierto = not self._diagnostico_abierto
+        if 0 in self._visibles:
+            self._destruir_tarjeta(0)
+        self._programar_actualizacion()
+
+    def _construir_paso(self, frame, paso):
+        """Tarjeta de un paso: título, fórmula y explicación"""
+        frame.configure(highlightbackground='#30363d', highlightthickness=1)
+
+        tk.Label(frame, text=paso.get('titulo', ''), font=("Segoe UI", 9, "bold"),
+                 fg='#f0f6fc', bg='#0d1117').pack(anchor='w', padx=6, pady=(6, 2))
+
+        # Fórmula - Priorizar LaTeX si está disponible
+        formula_latex = paso.get('formula_latex')
+        formula_text = paso.get('formula')
+        if formula_latex:
+            self._mostrar_formula(frame, formula_latex, formula_text or formula_latex)
+        elif formula_text:
+            tk.Label(frame, text=formula_text, font=("Consolas", 9),
+                     fg='#fbbf24', bg='#0d1117', wraplength=400).pack(anchor='w', padx=8, pady=3)
+
+        # Explicación
+        if paso.get('explicacion'):
+            tk.Label(frame, text="💡 " + paso['explicacion'],
+                     font=("Segoe UI", 8), fg='#9ca3af', bg='#0d1117',
+                     wraplength=400, justify='left').pack(anchor='w', padx=8, pady=(0, 6))
+
+    def _construir_resultado(self, frame, item):
+        """Tarjeta del resultado final"""
+        frame.configure(highlightbackground='#10b981', highlightthickness=2)
+        tk.Label(frame, text="🏆 RESULTADO FINAL",
+                 font=("Segoe UI", 10, "bold"),
+                 fg='#10b981', bg='#0d1117').pack(anchor='w', padx=6, pady=(6, 2))
+
+        if item['latex']:
+            self._mostrar_formula(frame, item['latex'], item['texto'], fontsize=11,
+                                  fg='#10b981', pady=6)
+        else:
+            tk.Label(frame, text=item['texto'],
+                     font=("Consolas", 9), fg='#10b981', bg='#0d1117',
+                     wraplength=400).pack(anchor='w', padx=8, pady=6)
+
+    def _mostrar_formula(self, card, formula_latex, texto_fallback, fontsize=12,
+                         fg='#fbbf24', pady=3):
+        """Mostrar una fórmula: imagen si está cacheada, si no un texto provisional
+        que se reemplaza cuando el pool de procesos devuelve la imagen"""
+        clave = LatexImageCache.crear_clave(formula_latex, 150, fontsize, 'white')
+        img = self.latex_cache.obtener(clave)
+        if img is not None:
+            label = tk.Label(card, image=img, bg='#0d1117')
+            label.pack(anchor='w', padx=8, pady=pady)
+            label.image = img  # Mantener la referencia mientras exista el label
+            return
+
+        label = tk.Label(card, text=texto_fallback, font=("Consolas", 9),
+                         fg=fg, bg='#0d1117', wraplength=400, justify='left')
+        label.pack(anchor='w', padx=8, pady=pady)
+        try:
+            futuro = self.raster_pool.enviar(formula_latex, 150, fontsize, 'white')
+        except Exception:
+            # Sin pool disponible: rasterizar en el hilo de Tk
+            RECURSOS.inc(tipo='rasterizado_en_hilo_tk')
+            img = self._latex_to_photoimage(formula_latex, fontsize=fontsize)
+            if img:
+                label.configure(image=img, text='')
+                label.image = img
+            return
+        self._pendientes.append((futuro, label, clave))
+        if self._sondeo_id is None:
+            self._sondeo_id = self.root.after(30, self._revisar_pendientes)
+
+    def _revisar_pendientes(self):
+        """Crear en el hilo de Tk los PhotoImage de las fórmulas ya rasterizadas"""
+        self._sondeo_id = None
+        restantes = []
+        listos = False
+        for futuro, label, clave in self._pendientes:
+            if not futuro.done():
+                if label.winfo_exists():
+                    restantes.append((futuro, label, clave))
+                else:
+                    futuro.cancel()  # La tarjeta salió de la vista antes de rasterizarse
+                continue
+            try:
+                from mathtext_raster import rgba_a_photoimage
+                ancho, alto, datos, segundos = futuro.result()
+                with self.etapas.etapa('rasterizar'):
+                    img = rgba_a_photoimage(ancho, alto, datos)
+                self.etapas.segundos['rasterizar'] += segundos  # tiempo dentro del proceso
+                RASTERIZADO.observar(segundos)
+            except Exception as e:
+                print(f"Error renderizando LaTeX: {e}")
+                RECURSOS.inc(tipo='formula_como_texto')
+                continue  # Se conserva el texto provisional
+            self.latex_cache.guardar(clave, img, len(datos))
+            if self.artefacto is not None:
+                self.artefacto.imagenes[clave] = (ancho, alto, datos)
+            if label.winfo_exists():
+                label.configure(image=img, text='')
+                label.image = img
+                listos = True
+        self._pendientes = restantes
+        if restantes:
+            self._sondeo_id = self.root.after(30, self._revisar_pendientes)
+        elif listos and 0 in self._visibles:
+            self._destruir_tarjeta(0)  # rehacer el encabezado con el rasterizado completo
+        if listos:
+            self._programar_actualizacion()
+
+    def _cancelar_pendientes(self):
+        """Descartar rasterizaciones en curso de una solución anterior"""
+        for futuro, _, _ in self._pendientes:
+            futuro.cancel()
+        self._pendientes = []
+        if self._sondeo_id is not None:
+            self.root.after_cancel(self._sondeo_id)
+            self._sondeo_id = None
+
+    def mostrar_pasos_detallados(self, pasos, resultado, funcion_str, variable_str, artefacto=None):
+        """Mostrar los pasos con formato profesional y LaTeX con fuentes más pequeñas.
+        Con `artefacto`, se reutiliza la expresión ya parseada y se guardan en él
+        las imágenes rasterizadas."""
+        self.artefacto = artefacto
+        self.etapas = StageTimer()
+        items = [{'clase': 'encabezado'}]
+        items.extend({'clase': 'paso', 'paso': paso} for paso in pasos)
+
+        # Resultado final
+        if resultado is not None:
+            try:
+                if artefacto is not None:
+                    with self.etapas.etapa('latex'):
+                        res_ltx = artefacto.latex_resultado()
+                else:
+                    x = Symbol(variable_str)
+                    f = parsear_expresion(funcion_str)
+                    res_ltx = latex(Integral(f, x)) + "=" + latex(resultado) + "+C"
+            except Exception:
+                res_ltx = None
+            items.append({'clase': 'resultado', 'latex': res_ltx,
+                          'texto': f"∫ {funcion_str} dx = {resultado} + C"})
+
+        self._reiniciar_lista(items)
+
+    def limpiar_pasos(self):
+        """Limpiar todos los pasos mostrados"""
+        self.artefacto = None
+        self.etapas = StageTimer()
+        self._reiniciar_lista([])
+
+    def cerrar(self):
+        """Liberar el pool de rasterizado al cerrar la aplicación"""
+        self._cancelar_pendientes()
+        self.raster_pool.cerrar()
@@ -0,0 +1,155 @@
+"""
+Exportación ligera de soluciones a HTML o a fuente LaTeX (.tex) a partir de las
+cadenas `formula_latex` de cada paso, sin figuras de matplotlib
+"""
+import base64
+import html
+import unicodedata
+from datetime import datetime
+
+from metrics import EXPORTACIONES
+
+
+def _sin_emojis(texto):
+    """Quitar pictogramas que LaTeX no sabe componer"""
+    return ''.join(c for c in texto
+                   if ord(c) <= 0xFFFF and unicodedata.category(c) != 'So').strip()
+
+
+def _escapar_tex(texto):
+    """Escapar caracteres especiales de LaTeX en texto normal"""
+    reemplazos = {
+        '\\': r'\textbackslash{}', '&': r'\&', '%': r'\%', '$': r'\$', '#': r'\#',
+        '_': r'\_', '{': r'\{', '}': r'\}', '~': r'\textasciitilde{}', '^': r'\textasciicircum{}',
+    }
+    return ''.join(reemplazos.get(c, c) for c in _sin_emojis(texto))
+
+
+class TextExporter:
+    """Escribe la lista de pasos como HTML autónomo o como documento .tex.
+
+    El HTML lleva cada fórmula rasterizada con mathtext como PNG incrustado
+    (data URI, con el LaTeX como texto alternativo): se ve en cualquier
+    navegador, sin conexión y sin MathJax. Con `script_matematicas` (una copia
+    local de MathJax/KaTeX) las fórmulas se escriben en cambio como LaTeX entre
+    \\[ \\], para que las renderice ese script. Ambos formatos se escriben paso a paso.
+    """
+
+    DPI = 200           # las imágenes se muestran a 96 ppp: nítidas en pantallas densas
+    FONTSIZE = 12
+    COLOR = '#111827'   # el del texto de la página
+
+    def __init__(self, pasos, funcion_str, variable_str='x', tipo_integral='indefinida',
+                 resultado_latex=None):
+        self.pasos = pasos
+        self.funcion_str = funcion_str
+        self.variable_str = variable_str
+        self.tipo_integral = tipo_integral
+        self.resultado_latex = resultado_latex
+
+    def _titulo(self):
+        """Título común a ambos formatos"""
+        return f"Solución Paso a Paso — {datetime.now().strftime('%Y-%m-%d %H:%M')}"
+
+    def exportar(self, filename, **opciones):
+        """Elegir el formato según la extensión (.html/.htm o .tex)"""
+        if filename.lower().endswith('.tex'):
+            with EXPORTACIONES.cronometrar(formato='tex'):
+                return self.exportar_tex(filename)
+        with EXPORTACIONES.cronometrar(formato='html'):
+            return self.exportar_html(filename, **opciones)
+
+    def _formula_html(self, latex_str, alternativa, imagenes):
+        """<img> con la fórmula rasterizada; si mathtext no sabe componerla, el texto
+        `alternativa` (la fórmula en texto plano del paso) o el propio LaTeX"""
+        from mathtext_raster import rasterizar_rgba, rgba_a_png  # matplotlib solo al exportar
+
+        if latex_str not in imagenes:
+            try:
+                ancho, alto, datos = rasterizar_rgba(latex_str, self.DPI, self.FONTSIZE, self.COLOR)
+            except Exception:
+                imagenes[latex_str] = None
+            else:
+                png = base64.b64encode(rgba_a_png(ancho, alto, datos)).decode('ascii')
+                escala = 96 / self.DPI
+                imagenes[latex_str] = (f'<img alt="{html.escape(latex_str)}" '
+                                       f'width="{round(ancho * escala)}" height="{round(alto * escala)}" '
+                                       f'src="data:image/png;base64,{png}">')
+        if imagenes[latex_str] is None:
+            return f'<div class="texto">{html.escape(str(alternativa or latex_str))}</div>\n'
+        return f'<div class="formula">{imagenes[latex_str]}</div>\n'
+
+    def exportar_html(self, filename, script_matematicas=None):
+        """Escribir un HTML autónomo con las fórmulas como imágenes incrustadas
+        (o en LaTeX para `script_matematicas`)"""
+        imagenes = {}  # latex -> <img> (fórmulas repetidas se rasterizan una vez)
+
+        def formula(latex_str, alternativa=None):
+            if script_matematicas:
+                return f'<div class="formula">\\[{html.escape(latex_str)}\\]</div>\n'
+            return self._formula_html(latex_str, alternativa, imagenes)
+
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('<!DOCTYPE html>\n<html lang="es">\n<head>\n<meta charset="utf-8">\n')
+            f.write(f'<title>{html.escape(self._titulo())}</title>\n')
+            f.write('<style>\n'
+                    'body{font-family:"Segoe UI",sans-serif;max-width:860px;margin:2em auto;color:#111827}\n'
+                    '.paso{border:1px solid #d1d5db;border-radius:6px;padding:.6em 1em;margin:.8em 0}\n'
+                    '.paso h2{font-size:1em;margin:.2em 0}\n'
+                    '.formula{overflow-x:auto;margin:.4em 0}\n'
+                    '.texto{font-family:Consolas,monospace;color:#92400e}\n'
+                    '.explicacion{color:#4b5563;font-size:.9em}\n'
+                    '.resultado{border:2px solid #10b981}\n'
+                    '</style>\n')
+            if script_matematicas:
+                f.write(f'<script src="{html.escape(script_matematicas)}" defer></script>\n')
+            f.write('</head>\n<body>\n')
+            f.write(f'<h1>{html.escape(self._titulo())}</h1>\n')
+            f.write(f'<p>Función: <code>{html.escape(self.funcion_str)}</code> | '
+                    f'Tipo: {html.escape(self.tipo_integral)}</p>\n')
+
+            for i, paso in enumerate(self.pasos, 1):
+                f.write('<section class="paso">\n')
+                f.write(f'<h2>Paso {i}: {html.escape(paso.get("titulo", ""))}</h2>\n')
+                if paso.get('formula_latex'):
+                    f.write(formula(paso['formula_latex'], paso.get('formula')))
+                elif paso.get('formula'):
+                    f.write(f'<div class="texto">{html.escape(str(paso["formula"]))}</div>\n')
+                if paso.get('explicacion'):
+                    f.write(f'<p class="explicacion">💡 {html.escape(paso["explicacion"])}</p>\n')
+                f.write('</section>\n')
+
+            if self.resultado_latex:
+                f.write('<section class="paso resultado">\n<h2>🏆 RESULTADO FINAL</h2>\n')
+                f.write(formula(self.resultado_latex))
+                f.write('</section>\n')
+            f.write('</body>\n</html>\n')
+        return filename
+
+    def exportar_tex(self, filename):
+        """Escribir un documento LaTeX (mejor con xelatex o lualatex por el texto Unicode)"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('\\documentclass[11pt,a4paper]{article}\n'
+                    '\\usepackage{iftex}\n'
+                    '\\ifPDFTeX\\usepackage[utf8]{inputenc}\\usepackage[T1]{fontenc}\\fi\n'
+                    '\\usepackage{amsmath,amssymb}\n'
+                    '\\usepackage[margin=2cm]{geometry}\n'
+                    '\\begin{document}\n')
+            f.write(f'\\section*{{{_escapar_tex(self._titulo())}}}\n')
+            f.write(f'Función: \\texttt{{{_escapar_tex(self.funcion_str)}}} \\quad '
+                    f'Tipo: {_escapar_tex(self.tipo_integral)}\n\n')
+
+            for i, paso in enumerate(self.pasos, 1):
+                f.write(f'\\subsection*{{Paso {i}: {_escapar_tex(paso.get("titulo", ""))}}}\n')
+                if paso.get('formula_latex'):
+                    f.write(f'\\[ {paso["formula_latex"]} \\]\n')
+                elif paso.get('formula'):
+                    f.write(f'\\texttt{{{_escapar_tex(str(paso["formula"]))}}}\n\n')
+                if paso.get('explicacion'):
+                    f.write(f'{_escapar_tex(paso["explicacion"])}\n\n')
+
+            if self.resultado_latex:
+                f.write('\\subsection*{Resultado final}\n')
+                f.write(f'\\[ \\boxed{{{self.resultado_latex}}} \\]\n')
+            f.write('\\end{document}\n')
+        return filename